@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# Compara dois resultados de run_benchmarks.py rota a rota.
+#
+#   python benchmarks/compare.py benchmarks/results/antes.json benchmarks/results/depois.json --threshold 0.10
+#
+# Para cada rota (nome do endpoint do blueprint, ex.: reports.generate_report[financeiro]) calcula
+# a variação relativa de p50 e p95 com intervalo de confiança por bootstrap sobre as amostras brutas.
+# Uma rota regrediu quando o limite inferior do intervalo passa do limiar: a lentidão é real e não
+# apenas ruído. Uma rota cujo mix de status mudou (ex.: 200 -> 500) também falha: os tempos
+# deixam de medir o mesmo trabalho. Nos dois casos o script termina com código 1 (útil antes do deploy).
+import argparse
+import json
+import random
+import sys
+
+METRICS = (('p50', 0.50), ('p95', 0.95))
+# Diferença de proporção de um status (0.01 = 1 ponto percentual) a partir da qual o mix mudou;
+# as contagens absolutas dependem do número de iterações
+STATUS_SHARE_TOLERANCE = 0.01
+
+def percentile(sorted_values, fraction):
+    """Percentil com interpolação linear sobre uma lista ordenada"""
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def bootstrap_change(baseline, candidate, fraction, resamples, confidence, rng):
+    """Variação relativa do percentil (candidato / base - 1) e o seu intervalo de confiança"""
+    estimate = percentile(sorted(candidate), fraction) / percentile(sorted(baseline), fraction) - 1
+    
+    changes = []
+    for _ in range(resamples):
+        base_value = percentile(sorted(rng.choices(baseline, k=len(baseline))), fraction)
+        candidate_value = percentile(sorted(rng.choices(candidate, k=len(candidate))), fraction)
+        changes.append(candidate_value / base_value - 1)
+    changes.sort()
+    
+    tail = (1 - confidence) / 2
+    return estimate, percentile(changes, tail), percentile(changes, 1 - tail)
+
+def status_mix_changed(before, after, tolerance=STATUS_SHARE_TOLERANCE):
+    """Se a proporção de algum status (ou o conjunto de status) mudou entre os dois resultados"""
+    before, after = before or {}, after or {}
+    if set(before) != set(after):
+        return True
+    before_total, after_total = sum(before.values()) or 1, sum(after.values()) or 1
+    return any(abs(before[status] / before_total - after[status] / after_total) > tolerance for status in before)
+
+def load_results(path):
+    with open(path) as f:
+        data = json.load(f)
+    if 'routes' not in data:
+        sys.exit(f'{path} não é um resultado de run_benchmarks.py')
+    return data
+
+def compare(baseline, candidate, threshold, resamples, confidence, seed):
+    """Compara as rotas presentes nos dois resultados; devolve as linhas do relatório"""
+    rng = random.Random(seed)
+    rows = []
+    for name in sorted(set(baseline['routes']) | set(candidate['routes'])):
+        before = baseline['routes'].get(name)
+        after = candidate['routes'].get(name)
+        if before is None or after is None:
+            rows.append({'route': name, 'missing': 'base' if before is None else 'candidato'})
+            continue
+        
+        row = {'route': name, 'regressed': False, 'improved': False}
+        if not before.get('samples') or not after.get('samples') or min(before['samples']) <= 0:
+            row['missing'] = 'amostras'
+            rows.append(row)
+            continue
+        
+        for metric, fraction in METRICS:
+            change, low, high = bootstrap_change(before['samples'], after['samples'], fraction,
+                                                 resamples, confidence, rng)
+            row[metric] = {
+                'before': percentile(sorted(before['samples']), fraction),
+                'after': percentile(sorted(after['samples']), fraction),
+                'change': change,
+                'low': low,
+                'high': high,
+            }
+            if low > threshold:
+                row['regressed'] = True
+            if high < -threshold:
+                row['improved'] = True
+        
+        # Uma mudança no mix de status (ex.: 200 -> 500) invalida a comparação de tempos
+        if status_mix_changed(before.get('statuses'), after.get('statuses')):
+            row['statusChange'] = (before.get('statuses'), after.get('statuses'))
+        rows.append(row)
+    return rows
+
+def format_metric(values):
+    return (f'{values["before"] * 1000:8.2f} -> {values["after"] * 1000:8.2f}ms '
+            f'{values["change"] * 100:+7.1f}% [{values["low"] * 100:+6.1f}%, {values["high"] * 100:+6.1f}%]')
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara dois resultados de benchmark')
+    parser.add_argument('baseline', help='Resultado de referência (antes)')
+    parser.add_argument('candidate', help='Resultado a avaliar (depois)')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Regressão relativa tolerada (0.10 = 10%%)')
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--resamples', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--routes', help='Compara apenas as rotas cujo nome contém este texto')
+    parser.add_argument('--json', action='store_true', help='Imprime o relatório em JSON')
+    args = parser.parse_args()
+    
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+    if args.routes:
+        for data in (baseline, candidate):
+            data['routes'] = {name: route for name, route in data['routes'].items() if args.routes in name}
+    
+    rows = compare(baseline, candidate, args.threshold, args.resamples, args.confidence, args.seed)
+    regressions = [row['route'] for row in rows if row.get('regressed')]
+    status_changes = [row['route'] for row in rows if 'statusChange' in row]
+    
+    if args.json:
+        print(json.dumps({'threshold': args.threshold, 'confidence': args.confidence,
+                          'regressions': regressions, 'statusChanges': status_changes, 'routes': rows}, indent=2))
+    else:
+        if baseline.get('mode') != candidate.get('mode') or baseline.get('tableCounts') != candidate.get('tableCounts'):
+            print('Aviso: os resultados foram gerados em modos ou com volumes de dados diferentes')
+        print(f'Base: {baseline.get("commit")}  Candidato: {candidate.get("commit")}  '
+              f'(IC {args.confidence:.0%}, limiar {args.threshold:.0%})')
+        for row in rows:
+            if 'missing' in row:
+                print(f'  {row["route"]:<50} sem dados ({row["missing"]})')
+                continue
+            flag = 'REGRESSÃO' if row['regressed'] else 'STATUS' if 'statusChange' in row else 'melhoria' if row['improved'] else ''
+            print(f'  {row["route"]:<50} p50 {format_metric(row["p50"])}  p95 {format_metric(row["p95"])}  {flag}')
+            if 'statusChange' in row:
+                print(f'  {"":<50} status mudou: {row["statusChange"][0]} -> {row["statusChange"][1]}')
+        print(f'{len(regressions)} rota(s) com regressão acima de {args.threshold:.0%}, '
+              f'{len(status_changes)} com mix de status diferente')
+    
+    sys.exit(1 if regressions or status_changes else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# Gera dados sintéticos em volume para benchmarks.
+#
+#   DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/generate_data.py --scale 0.1
+#
+# Com --scale 1 são gerados 200 mil clientes, 1 milhão de vendas, 500 mil compromissos,
+# 300 mil cotações e 100 mil leads. As inserções são feitas em lotes (executemany).
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import app
+from src.extensions import db
+from src.models.user import User
+from src.models.customer import Customer
+from src.models.sale import Sale
+from src.models.lead import Lead
+from src.models.quote import Quote
+from src.models.appointment import Appointment
+from src.models.company import Company
+from src.models.report import Report
+from src.services.leaderboard import backfill_leaderboard, reconcile_leaderboard
+from src.services.lead_assignment import sync_rep_counters
+
+# Quantidades para --scale 1
+BASE_COUNTS = {
+    'representatives': 50,
+    'companies': 2000,
+    'customers': 200000,
+    'sales': 1000000,
+    'quotes': 300000,
+    'appointments': 500000,
+    'leads': 100000,
+}
+
+# Distribuições de status representativas da operação real
+SALE_STATUSES = (('Concluída', 0.70), ('Pendente', 0.20), ('Cancelada', 0.10))
+QUOTE_STATUSES = (('Pendente', 0.35), ('Aprovada', 0.30), ('Rejeitada', 0.20), ('Expirada', 0.15))
+APPOINTMENT_STATUSES = (('Concluído', 0.55), ('Agendado', 0.30), ('Cancelado', 0.10), ('Reagendado', 0.05))
+APPOINTMENT_TYPES = (('Reunião', 0.40), ('Ligação', 0.30), ('Visita', 0.20), ('Apresentação', 0.10))
+LEAD_STATUSES = (('Novo', 0.35), ('Contato', 0.30), ('Qualificado', 0.20), ('Perdido', 0.15))
+LEAD_SOURCES = (('Website', 0.35), ('LinkedIn', 0.25), ('Indicação', 0.20), ('Google Ads', 0.15), ('Evento', 0.05))
+COMPANY_STATUSES = (('Ativa', 0.80), ('Inativa', 0.15), ('Suspensa', 0.05))
+SEGMENTS = ('Tecnologia da Informação', 'Transformação Digital', 'Automação Industrial',
+            'Saúde', 'Varejo', 'Logística', 'Educação', 'Agronegócio')
+PRODUCTS = ('Sistema de Gestão', 'Consultoria em TI', 'Software Personalizado', 'Manutenção Anual',
+            'Licença Anual', 'Treinamento', 'Integração de Sistemas', 'Suporte Premium')
+FIRST_NAMES = ('Ana', 'Bruno', 'Carla', 'Carlos', 'Daniel', 'Fernanda', 'Gabriel', 'Helena', 'João',
+               'Juliana', 'Lucas', 'Maria', 'Pedro', 'Rafaela', 'Roberto', 'Sofia', 'Tiago', 'Vanessa')
+LAST_NAMES = ('Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Ferreira',
+              'Almeida', 'Mendes', 'Ribeiro', 'Martins', 'Rocha', 'Gomes', 'Barbosa')
+DOMAINS = ('empresa.com', 'techsolutions.com', 'inovacao.com', 'startup.com', 'industria.com.br',
+           'comercial.com.br', 'grupo.com.br', 'servicos.com')
+
+def weighted_choice(rng, options):
+    """Escolhe um valor de uma lista de (valor, peso)"""
+    values, weights = zip(*options)
+    return rng.choices(values, weights=weights)[0]
+
+def skewed_index(rng, size, alpha=1.2):
+    """Índice em [0, size) com cauda longa: poucos clientes concentram muitas vendas"""
+    return min(int(rng.paretovariate(alpha)) - 1, size - 1) if rng.random() < 0.3 else rng.randrange(size)
+
+def random_date(rng, start, end):
+    """Data no intervalo com sazonalidade (mais movimento no fim de cada trimestre)"""
+    span = (end - start).total_seconds()
+    while True:
+        moment = start + timedelta(seconds=rng.random() * span)
+        weight = 1.0 + 0.5 * math.sin((moment.month % 3) / 3 * math.pi)
+        if rng.random() * 1.5 < weight:
+            return moment
+
+def person_name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+def bulk_insert(model, rows_iter, total, batch_size):
+    """Insere as linhas em lotes com executemany e confirma cada lote"""
+    started = time.perf_counter()
+    batch = []
+    inserted = 0
+    for row in rows_iter:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(model.__table__.insert(), batch)
+            db.session.commit()
+            inserted += len(batch)
+            batch = []
+            print(f'\r  {model.__tablename__}: {inserted}/{total}', end='', flush=True)
+    if batch:
+        db.session.execute(model.__table__.insert(), batch)
+        db.session.commit()
+        inserted += len(batch)
+    elapsed = time.perf_counter() - started
+    print(f'\r  {model.__tablename__}: {inserted} linhas em {elapsed:.1f}s ({inserted / max(elapsed, 1e-9):.0f}/s)')
+
+def next_id(model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+def generate(counts, batch_size, seed, years):
+    rng = random.Random(seed)
+    end = datetime.utcnow()
+    start = end - timedelta(days=365 * years)
+    
+    # Representantes (o hash bcrypt é calculado uma única vez e reaproveitado)
+    User.create_default_users()
+    password_hash = User.query.filter_by(email='admin@proreps.com').first().password_hash
+    first_user_id = next_id(User)
+    bulk_insert(User, (
+        {
+            'name': f'{person_name(rng)} {index}',
+            'email': f'rep{first_user_id + index}@proreps.com',
+            'password_hash': password_hash,
+            'role': 'representante',
+            'department': 'Vendas',
+            'is_active': rng.random() > 0.1,
+            'status': 'active',
+            'created_at': random_date(rng, start, end),
+            'updated_at': end,
+        }
+        for index in range(counts['representatives'])
+    ), counts['representatives'], batch_size)
+    representatives = [name for (name,) in db.session.query(User.name).filter_by(role='representante')]
+    
+    def company_rows():
+        for index in range(counts['companies']):
+            contract_start = random_date(rng, start, end)
+            yield {
+                'name': f'Empresa {index} {rng.choice(LAST_NAMES)} Ltda',
+                'cnpj': f'{rng.randrange(10**13, 10**14)}',
+                'email': f'contato@empresa{index}.com.br',
+                'website': f'https://www.empresa{index}.com.br',
+                'city': rng.choice(('São Paulo', 'Rio de Janeiro', 'Belo Horizonte', 'Curitiba', 'Recife')),
+                'state': rng.choice(('SP', 'RJ', 'MG', 'PR', 'PE')),
+                'segment': rng.choice(SEGMENTS),
+                'contact_person': person_name(rng),
+                'commission_rate': round(rng.uniform(3, 15), 1),
+                'status': weighted_choice(rng, COMPANY_STATUSES),
+                'contract_start': contract_start,
+                'contract_end': contract_start + timedelta(days=rng.choice((180, 365, 730))),
+                'created_at': contract_start,
+                'updated_at': end,
+            }
+    first_company_id = next_id(Company)
+    bulk_insert(Company, company_rows(), counts['companies'], batch_size)
+    
+    first_customer_id = next_id(Customer)
+    customer_names = [person_name(rng) for _ in range(counts['customers'])]
+    customer_emails = [f'cliente{first_customer_id + index}@{rng.choice(DOMAINS)}' for index in range(counts['customers'])]
+    bulk_insert(Customer, (
+        {
+            'name': customer_names[index],
+            'email': customer_emails[index],
+            'phone': f'(11) 9{rng.randrange(10**7, 10**8)}',
+            'company': f'Cliente {index} {rng.choice(LAST_NAMES)}',
+            'created_at': random_date(rng, start, end),
+        }
+        for index in range(counts['customers'])
+    ), counts['customers'], batch_size)
+    
+    def customer(rng):
+        index = skewed_index(rng, counts['customers'])
+        return first_customer_id + index, customer_names[index]
+    
+    def sale_rows():
+        for _ in range(counts['sales']):
+            client_id, client_name = customer(rng)
+            yield {
+                'client_id': client_id,
+                'client_name': client_name,
+                'product': rng.choice(PRODUCTS),
+                'value': round(rng.lognormvariate(9, 0.8), 2),
+                'status': weighted_choice(rng, SALE_STATUSES),
+                'representative': rng.choice(representatives),
+                'date': random_date(rng, start, end),
+                'company_id': first_company_id + skewed_index(rng, counts['companies']),
+            }
+    bulk_insert(Sale, sale_rows(), counts['sales'], batch_size)
+    
+    def quote_rows():
+        for _ in range(counts['quotes']):
+            client_id, client_name = customer(rng)
+            created_at = random_date(rng, start, end)
+            row = {
+                'client_id': client_id,
+                'client_name': client_name,
+                'title': rng.choice(PRODUCTS),
+                'description': 'Cotação gerada para benchmark',
+                'value': round(rng.lognormvariate(9.2, 0.8), 2),
+                'status': weighted_choice(rng, QUOTE_STATUSES),
+                'representative': rng.choice(representatives),
+                'valid_until': created_at + timedelta(days=rng.choice((15, 30, 60))),
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+            # Aprovada uma semana depois de criada (sem sortear: a sequência de rng não muda)
+            row['approved_at'] = min(created_at + timedelta(days=7), end) if row['status'] == 'Aprovada' else None
+            yield row
+    bulk_insert(Quote, quote_rows(), counts['quotes'], batch_size)
+    
+    def appointment_rows():
+        for _ in range(counts['appointments']):
+            client_id, client_name = customer(rng)
+            yield {
+                'title': f'{weighted_choice(rng, APPOINTMENT_TYPES)} com {client_name}',
+                'client_id': client_id,
+                'client_name': client_name,
+                'representative': rng.choice(representatives),
+                # Inclui compromissos futuros (até 60 dias)
+                'appointment_date': random_date(rng, start, end + timedelta(days=60)),
+                'duration': rng.choice((30, 60, 90, 120)),
+                'location': rng.choice(('Videoconferência', 'Escritório do cliente', 'Escritório Pró Reps')),
+                'type': weighted_choice(rng, APPOINTMENT_TYPES),
+                'status': weighted_choice(rng, APPOINTMENT_STATUSES),
+                'created_at': end,
+                'updated_at': end,
+            }
+    bulk_insert(Appointment, appointment_rows(), counts['appointments'], batch_size)
+    
+    # Relatórios de exemplo para as rotas /reports/<id>
+    Report.create_default_reports()
+    
+    def lead_email(index):
+        # Parte dos leads virou cliente (mesmo e-mail, outra capitalização): alimenta o funil
+        if rng.random() < 0.3:
+            return customer_emails[rng.randrange(counts['customers'])].upper()
+        return f'lead{index}@{rng.choice(DOMAINS)}'
+    
+    bulk_insert(Lead, (
+        {
+            'name': person_name(rng),
+            'email': lead_email(index),
+            'status': weighted_choice(rng, LEAD_STATUSES),
+            'source': weighted_choice(rng, LEAD_SOURCES),
+            'assigned_to': rng.choice(representatives),
+            'created_at': random_date(rng, start, end),
+        }
+        for index in range(counts['leads'])
+    ), counts['leads'], batch_size)
+    
+    # As inserções em lote não disparam os eventos de flush: ranking e contadores de leads
+    # calculados de uma vez a partir das linhas geradas
+    started = time.perf_counter()
+    if backfill_leaderboard() is None:
+        reconcile_leaderboard(since=start)
+    counters = sync_rep_counters()
+    print(f'  ranking e {counters} contadores de leads em {time.perf_counter() - started:.1f}s')
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera dados sintéticos para benchmarks')
+    parser.add_argument('--scale', type=float, default=0.01, help='Multiplicador das quantidades base (1 = 1M vendas)')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--years', type=int, default=3, help='Anos de histórico')
+    for name in BASE_COUNTS:
+        parser.add_argument(f'--{name}', type=int, help=f'Quantidade de {name} (ignora --scale)')
+    args = parser.parse_args()
+    
+    counts = {
+        name: getattr(args, name) if getattr(args, name) is not None else max(min(base, 5), int(base * args.scale))
+        for name, base in BASE_COUNTS.items()
+    }
+    
+    with app.app_context():
+        db.create_all()
+        print(f'Gerando dados em {db.engine.url.render_as_string(hide_password=True)}: {counts}')
+        generate(counts, args.batch_size, args.seed, args.years)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# Mede o arranque a frio de um worker: importação de src.main (python -X importtime),
+# criação da aplicação e o primeiro pedido.
+#
+#   python benchmarks/import_time.py --runs 5 --top 15
+#
+# Cada execução usa um processo novo; o resultado é gravado em
+# benchmarks/results/<data>-importtime.json junto com os resultados de run_benchmarks.py.
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+# Executado no processo filho: importa, cria a aplicação e faz o primeiro pedido
+CHILD_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+import src.main
+imported = time.perf_counter()
+app = src.main.app
+created = time.perf_counter()
+app.test_client().get('/api/health')
+first_request = time.perf_counter()
+sys.stdout.write(json.dumps({
+    'import': imported - started,
+    'createApp': created - imported,
+    'firstRequest': first_request - created,
+    'total': first_request - started,
+}))
+'''
+
+# Linha do -X importtime: "import time:   self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def run_once():
+    """Uma execução a frio; devolve (tempos em segundos, módulos por tempo acumulado)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE='')
+    )
+    if result.returncode != 0:
+        sys.exit(f'Falha ao importar a aplicação:\n{result.stderr[-2000:]}')
+    
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = {'self': int(self_us) / 1e6, 'cumulative': int(cumulative_us) / 1e6,
+                             'depth': len(indent) // 2}
+    return json.loads(result.stdout.strip().splitlines()[-1]), modules
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de arranque a frio da aplicação')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='Módulos mais lentos a mostrar')
+    parser.add_argument('--output', help='Arquivo JSON de saída')
+    args = parser.parse_args()
+    
+    # A primeira execução compila os .pyc e não entra nas medições
+    run_once()
+    runs = []
+    modules = {}
+    for _ in range(args.runs):
+        timings, run_modules = run_once()
+        runs.append(timings)
+        for name, values in run_modules.items():
+            modules.setdefault(name, []).append(values)
+    
+    summary = {
+        key: sorted(run[key] for run in runs)[len(runs) // 2]
+        for key in ('import', 'createApp', 'firstRequest', 'total')
+    }
+    # Mediana do tempo acumulado dos pacotes de primeiro nível e dos módulos da aplicação
+    top_level = sorted(
+        ((name, sorted(v['cumulative'] for v in values)[len(values) // 2])
+         for name, values in modules.items() if '.' not in name or name.startswith('src.')),
+        key=lambda item: item[1], reverse=True
+    )[:args.top]
+    
+    print(f'Mediana de {args.runs} execuções: ' + ', '.join(f'{key}={value * 1000:.1f}ms' for key, value in summary.items()))
+    for name, cumulative in top_level:
+        print(f'  {name:<40} {cumulative * 1000:8.1f}ms')
+    
+    output = args.output or os.path.join(RESULTS_DIR, f'{datetime.utcnow().strftime("%Y%m%dT%H%M%S")}-importtime.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'createdAt': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': runs,
+            'median': summary,
+            'topModules': dict(top_level),
+        }, f, indent=2)
+    print(f'Resultados gravados em {output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# Benchmark das rotas GET da API.
+#
+#   DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/run_benchmarks.py --mode client
+#   DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/run_benchmarks.py --mode wsgi --concurrency 8
+#   python benchmarks/run_benchmarks.py --mode http --url http://127.0.0.1:8000   (servidor externo, ex.: gunicorn)
+#
+# Cada rota é aquecida e depois medida; o resultado (p50/p95/p99, vazão e as amostras brutas)
+# é gravado em benchmarks/results/<data>-<modo>.json para comparação com compare.py.
+import argparse
+import http.client
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from werkzeug.serving import make_server, WSGIRequestHandler
+from src.main import app
+from src.extensions import db
+from src.models.user import User
+from src.models.customer import Customer
+from src.models.quote import Quote
+from src.models.appointment import Appointment
+from src.models.company import Company
+from src.models.report import Report
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Rotas fora do benchmark (não são API ou dependem de arquivos gravados)
+SKIPPED_ENDPOINTS = ('static', 'serve', 'metrics', 'profiles.download_profile')
+
+# Pedidos não-GET que apenas leem dados e podem ser repetidos sem efeitos colaterais
+READ_ONLY_POSTS = {
+    'reports.generate_report': [
+        {'path': f'/api/reports/generate/{report_type}',
+         'json': {'periodStart': '2000-01-01T00:00:00', 'periodEnd': '2100-01-01T00:00:00'},
+         'name': f'reports.generate_report[{report_type}]'}
+        for report_type in ('vendas', 'clientes', 'leads', 'financeiro')
+    ],
+}
+
+def percentile(sorted_values, fraction):
+    """Percentil com interpolação linear sobre uma lista ordenada"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def summarize(samples, elapsed):
+    ordered = sorted(samples)
+    return {
+        'count': len(samples),
+        'mean': sum(samples) / len(samples) if samples else None,
+        'p50': percentile(ordered, 0.50),
+        'p95': percentile(ordered, 0.95),
+        'p99': percentile(ordered, 0.99),
+        'max': ordered[-1] if ordered else None,
+        'throughput': len(samples) / elapsed if elapsed else None,
+    }
+
+def sample_values():
+    """Valores reais do banco para preencher os parâmetros das rotas"""
+    def first(query):
+        value = query.first()
+        return value[0] if value else 1
+    
+    return {
+        'customer_id': first(db.session.query(Customer.id).order_by(Customer.id)),
+        'client_id': first(db.session.query(Customer.id).order_by(Customer.id)),
+        'quote_id': first(db.session.query(Quote.id).order_by(Quote.id)),
+        'appointment_id': first(db.session.query(Appointment.id).order_by(Appointment.id)),
+        'company_id': first(db.session.query(Company.id).order_by(Company.id)),
+        'report_id': first(db.session.query(Report.id).order_by(Report.id)),
+        'user_id': first(db.session.query(User.id).order_by(User.id)),
+        'representative': first(db.session.query(Appointment.representative)),
+        'segment': first(db.session.query(Company.segment)),
+        'status': 'Pendente',
+    }
+
+def discover_requests(selected=None):
+    """Lista de pedidos a medir a partir do url_map da aplicação"""
+    values = sample_values()
+    requests = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if rule.endpoint in SKIPPED_ENDPOINTS or not rule.rule.startswith('/api/'):
+            continue
+        if rule.endpoint in READ_ONLY_POSTS:
+            requests.extend(dict(item, method='POST') for item in READ_ONLY_POSTS[rule.endpoint])
+            continue
+        if 'GET' not in rule.methods:
+            continue
+        try:
+            path = rule.build({name: values[name] for name in rule.arguments}, append_unknown=False)[1]
+        except KeyError:
+            print(f'  (ignorada: sem valor de exemplo para {rule.rule})')
+            continue
+        requests.append({'name': rule.endpoint, 'method': 'GET', 'path': path, 'json': None})
+    
+    if selected:
+        pattern = re.compile(selected)
+        requests = [item for item in requests if pattern.search(item['name'])]
+    return requests
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Servidor WSGI de benchmark sem log por pedido"""
+    
+    def log_request(self, *args, **kwargs):
+        pass
+
+class ClientRunner:
+    """Executa os pedidos pelo test client do Flask (sem rede)"""
+    
+    def __init__(self, token):
+        self.client = app.test_client()
+        self.headers = {'Authorization': f'Bearer {token}'}
+    
+    def __call__(self, item):
+        response = self.client.open(item['path'], method=item['method'], json=item['json'], headers=self.headers)
+        response.close()
+        return response.status_code
+
+class HttpRunner:
+    """Executa os pedidos por HTTP (keep-alive, uma conexão por thread)"""
+    
+    def __init__(self, base_url, token):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+        self.local = threading.local()
+    
+    def __call__(self, item):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        body = json.dumps(item['json']) if item['json'] is not None else None
+        try:
+            connection.request(item['method'], item['path'], body=body, headers=self.headers)
+            response = connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self.local.connection = None
+            raise
+        return response.status
+
+def measure(runner, item, iterations, warmup, concurrency):
+    """Aquece e mede uma rota; devolve o resumo com as amostras brutas (segundos)"""
+    for _ in range(warmup):
+        runner(item)
+    
+    statuses = {}
+    
+    def timed(_):
+        start = time.perf_counter()
+        status = runner(item)
+        return time.perf_counter() - start, status
+    
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(timed, range(iterations)))
+    else:
+        results = [timed(i) for i in range(iterations)]
+    elapsed = time.perf_counter() - started
+    
+    samples = []
+    for duration, status in results:
+        samples.append(duration)
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    
+    result = summarize(samples, elapsed)
+    result.update({'method': item['method'], 'path': item['path'], 'statuses': statuses, 'samples': samples})
+    return result
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def table_counts():
+    return {
+        table.name: db.session.execute(db.select(db.func.count()).select_from(table)).scalar()
+        for table in db.metadata.sorted_tables
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark das rotas da API')
+    parser.add_argument('--mode', choices=('client', 'wsgi', 'http'), default='client')
+    parser.add_argument('--url', help='URL base do servidor externo (modo http)')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=1, help='Pedidos simultâneos (modos wsgi/http)')
+    parser.add_argument('--routes', help='Expressão regular para filtrar rotas pelo nome')
+    parser.add_argument('--output', help='Arquivo JSON de saída')
+    args = parser.parse_args()
+    
+    server = None
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').first()
+        if admin is None:
+            sys.exit('Nenhum administrador no banco: rode benchmarks/generate_data.py antes')
+        token = create_access_token(identity=str(admin.id))
+        requests = discover_requests(args.routes)
+        counts = table_counts()
+        database_url = db.engine.url.render_as_string(hide_password=True)
+    
+    if args.mode == 'client':
+        runner = ClientRunner(token)
+        concurrency = 1
+    else:
+        base_url = args.url
+        if args.mode == 'wsgi':
+            server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietRequestHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f'http://127.0.0.1:{server.server_port}'
+        elif not base_url:
+            sys.exit('--url é obrigatório no modo http')
+        runner = HttpRunner(base_url, token)
+        concurrency = args.concurrency
+    
+    print(f'{len(requests)} rotas, modo {args.mode}, {args.iterations} iterações, concorrência {concurrency}')
+    routes = {}
+    try:
+        for item in requests:
+            result = measure(runner, item, args.iterations, args.warmup, concurrency)
+            routes[item['name']] = result
+            print(f'  {item["name"]:<50} p50={result["p50"] * 1000:8.2f}ms p95={result["p95"] * 1000:8.2f}ms '
+                  f'p99={result["p99"] * 1000:8.2f}ms {result["throughput"]:8.1f} req/s {result["statuses"]}')
+    finally:
+        if server is not None:
+            server.shutdown()
+    
+    output = args.output or os.path.join(RESULTS_DIR, f'{datetime.utcnow().strftime("%Y%m%dT%H%M%S")}-{args.mode}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'createdAt': datetime.utcnow().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'mode': args.mode,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'concurrency': concurrency,
+            'database': database_url,
+            'tableCounts': counts,
+            'routes': routes,
+        }, f, indent=2)
+    print(f'Resultados gravados em {output}')
+
+if __name__ == '__main__':
+    main()
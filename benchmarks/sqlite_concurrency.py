@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Vazão de leituras e escritas misturadas no SQLite com vários processos (como workers do gunicorn).
+#
+#   python benchmarks/sqlite_concurrency.py --processes 4 --seconds 10 --write-ratio 0.2
+#
+# Compara o SQLite padrão (journal de rollback, sem busy_timeout) com o perfil de
+# src/sqlite_profile.py (WAL, synchronous=NORMAL, cache, mmap, busy_timeout e repetição das
+# escritas). Cada modo usa um banco novo em /tmp; os pedidos passam pela aplicação completa.
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+READ_PATHS = ('/api/reports/dashboard', '/api/quotes/stats', '/api/leads')
+
+def prepare_database(path, tuning):
+    """Cria o esquema e os dados padrão num banco novo"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ['SQLITE_TUNING'] = '1' if tuning else '0'
+    from src.main import create_app
+    from src.commands import seed_default_data, sync_schema
+    from src.extensions import db
+    
+    app = create_app()
+    with app.app_context():
+        sync_schema(db.engine)
+        seed_default_data()
+        db.engine.dispose()
+
+def worker(args):
+    """Executa pedidos durante `seconds` segundos; devolve as contagens e latências de escrita"""
+    path, tuning, seconds, write_ratio, seed = args
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ['SQLITE_TUNING'] = '1' if tuning else '0'
+    from flask_jwt_extended import create_access_token
+    from src.main import create_app
+    
+    app = create_app()
+    app.logger.disabled = True
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+    client = app.test_client()
+    rng = random.Random(seed)
+    
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    write_latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if rng.random() < write_ratio:
+            started = time.perf_counter()
+            response = client.post('/api/leads', headers=headers, json={
+                'name': f'Lead {seed}-{counts["writes"]}', 'email': f'lead{seed}-{counts["writes"]}@bench.com',
+                'source': 'Website', 'status': 'Novo',
+            })
+            write_latencies.append(time.perf_counter() - started)
+            kind = 'writes'
+        else:
+            response = client.get(rng.choice(READ_PATHS), headers=headers)
+            kind = 'reads'
+        if response.status_code >= 500:
+            counts['errors'] += 1
+        else:
+            counts[kind] += 1
+        response.close()
+    return counts, write_latencies
+
+def run_mode(tuning, processes, seconds, write_ratio):
+    path = os.path.join(tempfile.mkdtemp(prefix='sqlite-bench-'), 'bench.db')
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        pool.apply(prepare_database, (path, tuning))
+    
+    with context.Pool(processes) as pool:
+        results = pool.map(worker, [(path, tuning, seconds, write_ratio, index) for index in range(processes)])
+    
+    totals = {'reads': 0, 'writes': 0, 'errors': 0}
+    latencies = []
+    for counts, write_latencies in results:
+        for key in totals:
+            totals[key] += counts[key]
+        latencies.extend(write_latencies)
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0
+    return totals, p95
+
+def main():
+    parser = argparse.ArgumentParser(description='Leituras e escritas concorrentes no SQLite')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+    
+    print(f'{args.processes} processos, {args.seconds:.0f}s, {args.write_ratio:.0%} escritas')
+    for tuning in (False, True):
+        totals, p95 = run_mode(tuning, args.processes, args.seconds, args.write_ratio)
+        print(f'  {"perfil WAL" if tuning else "padrão":<12} leituras {totals["reads"] / args.seconds:8.1f}/s  '
+              f'escritas {totals["writes"] / args.seconds:7.1f}/s  erros {totals["errors"]:5d}  '
+              f'p95 escrita {p95:7.1f}ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Memória por worker do gunicorn com e sem preload_app (Linux: lê /proc/<pid>/smaps_rollup).
+#
+#   DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/worker_memory.py --workers 4
+#
+# Para cada modo arranca o gunicorn com gunicorn.conf.py, faz alguns pedidos a cada worker
+# e mede RSS (inclui páginas partilhadas), PSS (partilhadas divididas entre processos) e
+# memória privada (USS). O ganho do preload aparece no PSS e na memória privada.
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ('/api/health', '/', '/api/health/pool')
+
+def smaps_rollup(pid):
+    """Valores em kB de /proc/<pid>/smaps_rollup"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'private': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+    }
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+def wait_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=2).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn não respondeu a tempo')
+
+def measure(preload, workers, port, requests):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), GUNICORN_PRELOAD='1' if preload else '0',
+               PORT=str(port), GUNICORN_MAX_REQUESTS='0')
+    master = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'src.main:app'],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port)
+        # Aguarda todos os workers e distribui pedidos para que cada um carregue a aplicação
+        deadline = time.monotonic() + 30
+        while len(children(master.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.2)
+        for _ in range(requests):
+            for path in PATHS:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=10).read()
+        time.sleep(0.5)
+        
+        worker_stats = [smaps_rollup(pid) for pid in children(master.pid)]
+        master_stats = smaps_rollup(master.pid)
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+    
+    count = len(worker_stats)
+    return {
+        'workers': count,
+        'master': master_stats,
+        'perWorker': {key: sum(stats[key] for stats in worker_stats) / count for key in ('rss', 'pss', 'private')},
+        'totalPss': master_stats['pss'] + sum(stats['pss'] for stats in worker_stats),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Memória por worker com e sem preload_app')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--requests', type=int, default=50, help='Rodadas de pedidos antes de medir')
+    args = parser.parse_args()
+    
+    for preload in (False, True):
+        result = measure(preload, args.workers, args.port, args.requests)
+        per_worker = result['perWorker']
+        print(f'preload={"sim" if preload else "não"}: {result["workers"]} workers, '
+              f'por worker RSS={per_worker["rss"] / 1024:.1f}MB PSS={per_worker["pss"] / 1024:.1f}MB '
+              f'privada={per_worker["private"] / 1024:.1f}MB; '
+              f'mestre RSS={result["master"]["rss"] / 1024:.1f}MB; PSS total={result["totalPss"] / 1024:.1f}MB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# Configuração do gunicorn: gunicorn src.main:app  (o arquivo é lido automaticamente)
+#
+# WEB_CONCURRENCY          número de workers (padrão 1)
+# GUNICORN_THREADS         threads por worker (padrão 1); com mais de 1 usa o worker gthread
+# GUNICORN_WORKER_CLASS    força a classe do worker (sync, gthread, ...)
+# GUNICORN_PRELOAD         carrega a aplicação no mestre antes do fork (padrão 1)
+# GUNICORN_MAX_REQUESTS    reinicia o worker após N pedidos (padrão 1000, 0 desativa)
+# GUNICORN_TIMEOUT         segundos sem resposta até o worker ser reiniciado (padrão 30)
+# DB_SYNC_SCHEMA_ON_START  sincroniza o esquema do banco ao iniciar (padrão 1; ver on_starting)
+#
+# O pool de conexões (DB_POOL_SIZE, ...) é validado contra estes mesmos valores em src/config.py.
+import gc
+import os
+import shutil
+import sys
+import tempfile
+
+# Adicionar o diretório do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.config import env_bool, env_int, worker_layout_from_env
+
+workers, threads = worker_layout_from_env()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or ('gthread' if threads > 1 else 'sync')
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+# Maior que o timeout de ociosidade do proxy à frente (Render: 5s)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+# A aplicação é importada uma vez no mestre e partilhada por copy-on-write entre os workers
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+
+# Reinicia os workers periodicamente (contém fugas de memória); o jitter evita que todos
+# reiniciem ao mesmo tempo
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+# Métricas do Prometheus com vários processos: cada worker grava num diretório partilhado
+# (definido antes do preload: prometheus_client lê a variável ao ser importado)
+if workers > 1 and not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = os.path.join(tempfile.gettempdir(), 'proreps-prometheus')
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    # Arquivos de métricas de uma execução anterior não podem ser somados aos novos
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+def on_starting(server):
+    # Uma vez, no mestre e antes dos workers: tabelas e colunas novas de uma atualização
+    # (senão os pedidos falham com "no such column" até alguém rodar flask init-db)
+    from src.main import app, prepare_database
+    prepare_database(app)
+
+def when_ready(server):
+    # Move os objetos já criados para fora do GC: as coletas nos workers não tocam nessas
+    # páginas e elas continuam partilhadas com o mestre
+    if preload_app:
+        gc.freeze()
+
+def post_fork(server, worker):
+    from src.main import app, on_worker_fork
+    on_worker_fork(app)
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
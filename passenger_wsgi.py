@@ -5,7 +5,12 @@ import os
 sys.path.insert(0, os.path.dirname(__file__))
 
 # Importar a aplicação Flask
-from src.main import app as application
+from src.main import app as application, prepare_database
+
+# Tabelas e colunas novas de uma atualização antes do primeiro pedido
+prepare_database(application)
+# O agendador (src/scheduler.py) arranca no primeiro pedido de cada processo: o smart spawning
+# do passenger carrega este arquivo e depois faz fork, e a thread não sobreviveria
 
 if __name__ == "__main__":
     application.run()
@@ -0,0 +1,272 @@
+# Modo assíncrono opcional (ASGI): uvicorn src.asgi:app
+#
+# As rotas só-leitura de listagem, estatísticas e dashboard são atendidas no event loop com
+# sessões assíncronas do SQLAlchemy (aiosqlite/asyncpg, ver requirements-async.txt), de modo
+# que clientes lentos não ocupam um worker cada. Qualquer outro pedido (escritas, rotas com
+# parâmetros, OPTIONS do CORS) é repassado à aplicação Flask síncrona numa thread.
+# A aplicação Flask com gunicorn continua sendo o modo padrão.
+import asyncio
+import gzip
+import io
+import json
+import sys
+from urllib.parse import unquote
+
+import jwt as pyjwt
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.config import Config, env_bool, env_int
+from src.sqlite_profile import configure_sqlite_engine
+from src.models.user import User
+from src.models.customer import Customer
+from src.models.sale import Sale
+from src.models.lead import Lead
+from src.models.quote import Quote
+from src.models.appointment import Appointment
+from src.models.company import Company
+from src.routes.appointments import appointments_stats
+from src.routes.companies import companies_stats
+from src.routes.quotes import quotes_stats
+from src.routes.reports import dashboard_data
+from src.routes.users import users_stats
+
+# Drivers assíncronos para cada banco
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+COMPRESS_MIN_SIZE = 1024
+
+def async_database_url(database_url):
+    """Converte a URL síncrona (DATABASE_URL) para o driver assíncrono equivalente"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'Banco {backend} não tem driver assíncrono configurado')
+    
+    connect_args = {}
+    # asyncpg não aceita sslmode na URL: passa a ser o argumento ssl
+    if 'sslmode' in url.query:
+        connect_args['ssl'] = url.query['sslmode']
+        url = url.difference_update_query(['sslmode'])
+    return url.set(drivername=ASYNC_DRIVERS[backend]), connect_args
+
+def create_engine_from_config(config):
+    url, connect_args = async_database_url(config.SQLALCHEMY_DATABASE_URI)
+    options = {'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True), 'connect_args': connect_args}
+    if url.get_backend_name() != 'sqlite':
+        # Uma única conexão por pedido em curso: o pool limita a concorrência no banco
+        options.update({
+            'pool_size': env_int('ASYNC_DB_POOL_SIZE', 10),
+            'max_overflow': env_int('ASYNC_DB_MAX_OVERFLOW', 10),
+            'pool_timeout': env_int('DB_POOL_TIMEOUT', 10),
+            'pool_recycle': env_int('DB_POOL_RECYCLE', 280),
+        })
+    engine = create_async_engine(url, **options)
+    if env_bool('SQLITE_TUNING', True):
+        configure_sqlite_engine(engine.sync_engine)
+    return engine
+
+class HTTPError(Exception):
+    def __init__(self, status, body):
+        super().__init__(status)
+        self.status = status
+        self.body = body
+
+def current_identity(headers, secret):
+    """Identidade do token de acesso (mesmas regras e mensagens do flask-jwt-extended)"""
+    authorization = headers.get('authorization')
+    if not authorization:
+        raise HTTPError(401, {'msg': 'Missing Authorization Header'})
+    parts = authorization.split()
+    if len(parts) != 2 or parts[0] != 'Bearer':
+        raise HTTPError(422, {'msg': "Bad Authorization header. Expected 'Authorization: Bearer <JWT>'"})
+    
+    try:
+        claims = pyjwt.decode(parts[1], secret, algorithms=['HS256'])
+    except pyjwt.ExpiredSignatureError:
+        raise HTTPError(401, {'msg': 'Token has expired'})
+    except pyjwt.InvalidTokenError as e:
+        raise HTTPError(422, {'msg': str(e)})
+    if claims.get('type') != 'access':
+        raise HTTPError(422, {'msg': 'Only non-refresh tokens are allowed'})
+    return claims.get('sub')
+
+def list_rows(model, order_by=None):
+    """Listagem completa de um modelo (mesma ordem das rotas síncronas)"""
+    def load(session):
+        query = session.query(model)
+        if order_by is not None:
+            query = query.order_by(order_by)
+        return [row.to_dict() for row in query.all()]
+    return load
+
+def admin_only(load):
+    """Exige que o usuário autenticado seja administrador"""
+    def guarded(session, identity):
+        user = session.get(User, int(identity)) if str(identity).isdigit() else None
+        if not user or user.role != 'admin':
+            raise HTTPError(403, {'error': 'Acesso negado. Apenas administradores podem ver estatísticas.'})
+        return load(session)
+    guarded.needs_identity = True
+    return guarded
+
+# Rotas atendidas no modo assíncrono: caminho -> função síncrona executada com run_sync
+ROUTES = {
+    '/api/customers': list_rows(Customer),
+    '/api/sales': list_rows(Sale),
+    '/api/leads': list_rows(Lead),
+    '/api/quotes': list_rows(Quote, Quote.created_at.desc()),
+    '/api/appointments': list_rows(Appointment, Appointment.appointment_date.desc()),
+    '/api/companies': list_rows(Company, Company.name),
+    '/api/quotes/stats': quotes_stats,
+    '/api/appointments/stats': appointments_stats,
+    '/api/companies/stats': companies_stats,
+    '/api/users/stats': admin_only(users_stats),
+    '/api/reports/dashboard': dashboard_data,
+}
+
+class AsyncApp:
+    """Aplicação ASGI: rotas só-leitura assíncronas e o resto repassado ao Flask"""
+    
+    def __init__(self, config=None, wsgi_app=None):
+        self.config = config if config is not None else Config()
+        self.wsgi_app = wsgi_app
+        self.engine = None
+        self.sessionmaker = None
+        self.allowed_origins = self.config.CORS_ORIGINS
+    
+    def startup(self):
+        if self.engine is None:
+            self.engine = create_engine_from_config(self.config)
+            self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+    
+    async def shutdown(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            handler = ROUTES.get(scope['path'])
+            # Só GET sem parâmetros é atendido aqui (?ids=, filtros etc. ficam com o Flask)
+            if handler is not None and scope['method'] in ('GET', 'HEAD') and not scope.get('query_string'):
+                await self.handle(handler, scope, send)
+            else:
+                await self.forward_to_wsgi(scope, receive, send)
+    
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.startup()
+                if self.config.SCHEDULER_ENABLED:
+                    # Tarefas periódicas deste processo (uvicorn --workers: só um por máquina)
+                    from src.scheduler import start_scheduler
+                    start_scheduler(self.flask_app())
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def handle(self, handler, scope, send):
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+        self.startup()
+        try:
+            identity = current_identity(headers, self.config.JWT_SECRET_KEY)
+            async with self.sessionmaker() as session:
+                if getattr(handler, 'needs_identity', False):
+                    body = await session.run_sync(handler, identity)
+                else:
+                    body = await session.run_sync(handler)
+            status = 200
+        except HTTPError as e:
+            status, body = e.status, e.body
+        
+        # Mesmo formato do jsonify do Flask (chaves ordenadas, compacto)
+        data = (json.dumps(body, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+        response_headers = [(b'content-type', b'application/json')]
+        
+        if len(data) >= COMPRESS_MIN_SIZE and 'gzip' in headers.get('accept-encoding', ''):
+            data = gzip.compress(data, compresslevel=6, mtime=0)
+            response_headers.append((b'content-encoding', b'gzip'))
+        response_headers.append((b'vary', b'Accept-Encoding, Origin'))
+        
+        origin = headers.get('origin')
+        if origin and (self.allowed_origins == '*' or origin in self.allowed_origins):
+            response_headers.append((b'access-control-allow-origin', origin.encode('latin-1')))
+        
+        response_headers.append((b'content-length', str(len(data)).encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': data if scope['method'] != 'HEAD' else b''})
+    
+    def flask_app(self):
+        if self.wsgi_app is None:
+            from src.main import create_app
+            self.wsgi_app = create_app(self.config)
+        return self.wsgi_app
+    
+    async def forward_to_wsgi(self, scope, receive, send):
+        """Executa o pedido na aplicação Flask numa thread (resposta completa em memória)"""
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        
+        environ = wsgi_environ(scope, body)
+        status, headers, chunks = await asyncio.to_thread(run_wsgi, self.flask_app(), environ)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+
+def wsgi_environ(scope, body):
+    """Ambiente WSGI equivalente ao pedido ASGI"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': unquote(scope['path']).encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for key, value in scope['headers']:
+        name = key.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            environ_key = f'HTTP_{name}'
+            environ[environ_key] = f'{environ[environ_key]},{value}' if environ_key in environ else value
+    return environ
+
+def run_wsgi(wsgi_app, environ):
+    """Executa a aplicação WSGI e devolve (status, cabeçalhos, corpo)"""
+    response = {}
+    
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    
+    result = wsgi_app(environ, start_response)
+    try:
+        chunks = [chunk for chunk in result]
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status'], response['headers'], chunks
+
+app = AsyncApp()
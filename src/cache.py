@@ -0,0 +1,69 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+# Cache em memória do processo. Cada worker do gunicorn tem o seu: a invalidação após o
+# commit vale para o worker que escreveu, os outros veem o valor novo ao fim do TTL.
+MISSING = object()
+
+class TTLCache:
+    """Dicionário com expiração por chave e invalidação por prefixo"""
+    
+    def __init__(self, default_ttl=30):
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+        self.entries = {}  # chave -> (instante de expiração, valor)
+    
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return MISSING
+            return entry[1]
+    
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+    
+    def get_or_set(self, key, factory, ttl=None):
+        """Valor em cache ou calculado por factory() e guardado"""
+        value = self.get(key)
+        if value is MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+    
+    def invalidate(self, prefix=''):
+        """Remove as chaves que começam pelo prefixo (todas, se vazio)"""
+        with self.lock:
+            for key in [key for key in self.entries if key.startswith(prefix)]:
+                del self.entries[key]
+
+cache = TTLCache()
+
+def invalidate_after_commit(session, *prefixes):
+    """Invalida os prefixos quando a transação da sessão for confirmada"""
+    session.info.setdefault('cache_invalidations', set()).update(prefixes)
+
+def invalidate_on_change(model, *prefixes):
+    """Invalida os prefixos após o commit de qualquer inserção, alteração ou exclusão do modelo (via ORM)"""
+    def invalidate(mapper, connection, target):
+        invalidate_after_commit(object_session(target), *prefixes)
+    for name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, name, invalidate)
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_committed(session):
+    for prefix in session.info.pop('cache_invalidations', ()):
+        cache.invalidate(prefix)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def discard_invalidations(session, previous_transaction):
+    # Nada mudou no banco: o cache continua válido
+    if not session.in_transaction():
+        session.info.pop('cache_invalidations', None)
@@ -0,0 +1,196 @@
+import warnings
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SAWarning
+from sqlalchemy.schema import CreateColumn
+from src.extensions import db
+
+def load_models():
+    """Importa todos os modelos para que fiquem registados em db.metadata"""
+    from src.models.user import User
+    from src.models.customer import Customer
+    from src.models.sale import Sale
+    from src.models.lead import Lead
+    from src.models.quote import Quote
+    from src.models.appointment import Appointment
+    from src.models.company import Company
+    from src.models.report import Report
+    # Tabelas derivadas, sem dados padrão
+    import src.models.commission
+    import src.models.forecast
+    import src.models.leaderboard
+    import src.models.lead_counter
+    return User, Customer, Sale, Lead, Quote, Appointment, Company, Report
+
+def seed_default_data():
+    """Cria os dados padrão de cada tabela vazia (usuários, clientes, vendas, ...)"""
+    User, Customer, Sale, Lead, Quote, Appointment, Company, Report = load_models()
+    
+    User.create_default_users()
+    Customer.create_default_customers()
+    Sale.create_default_sales()
+    Lead.create_default_leads()
+    Quote.create_default_quotes()
+    Appointment.create_default_appointments()
+    Company.create_default_companies()
+    Report.create_default_reports()
+
+# Colunas novas em tabelas com dados: (tabela, coluna) -> UPDATE que preenche as linhas existentes
+COLUMN_BACKFILLS = {
+    # Cotações aprovadas antes de approved_at existir: a última alteração é a melhor aproximação
+    ('quotes', 'approved_at'): "UPDATE quotes SET approved_at = updated_at WHERE status = 'Aprovada'",
+}
+
+# Índices redefinidos com o mesmo nome: (tabela, índice) -> colunas da definição antiga.
+# Um banco que ainda tem a definição antiga tem o índice recriado (o nome sozinho não mostra a diferença)
+REDEFINED_INDEXES = {
+    # index=True (score ASC) -> score DESC NULLS LAST, id DESC
+    ('leads', 'ix_leads_score'): ['score'],
+}
+
+def existing_index_names(connection, inspector, table_name):
+    """Nomes dos índices da tabela, inclusive os de expressão"""
+    if connection.dialect.name == 'sqlite':
+        # A reflexão do SQLite ignora índices de expressão (ex.: lower(email))
+        return set(connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"), {'table': table_name}
+        ).scalars())
+    return {index['name'] for index in inspector.get_indexes(table_name)}
+
+def reflected_index_columns(inspector, table_name, index_name):
+    """Colunas do índice como estão no banco (None se a reflexão não o devolver)"""
+    with warnings.catch_warnings():
+        # O SQLite avisa a cada índice de expressão que não consegue refletir (ex.: lower(email))
+        warnings.simplefilter('ignore', SAWarning)
+        indexes = inspector.get_indexes(table_name)
+    return next((index['column_names'] for index in indexes if index['name'] == index_name), None)
+
+def sync_schema(engine):
+    """Cria as tabelas, colunas e índices que faltam no banco (nunca remove nem altera)"""
+    changes = []
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                table.create(connection)
+                changes.append(f'tabela {table.name}')
+                continue
+            
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                definition = CreateColumn(column).compile(dialect=engine.dialect).string
+                # Colunas novas em tabelas com dados não podem ser NOT NULL sem valor padrão
+                if not column.nullable and column.server_default is None:
+                    definition = definition.replace(' NOT NULL', '')
+                table_name = engine.dialect.identifier_preparer.format_table(table)
+                connection.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {definition}'))
+                if (table.name, column.name) in COLUMN_BACKFILLS:
+                    connection.execute(text(COLUMN_BACKFILLS[table.name, column.name]))
+                changes.append(f'coluna {table.name}.{column.name}')
+            
+            existing_indexes = existing_index_names(connection, inspector, table.name)
+            for index in table.indexes:
+                old_columns = REDEFINED_INDEXES.get((table.name, index.name))
+                if old_columns and index.name in existing_indexes \
+                        and reflected_index_columns(inspector, table.name, index.name) == old_columns:
+                    index.drop(connection)
+                    existing_indexes.discard(index.name)
+                if index.name not in existing_indexes:
+                    index.create(connection)
+                    changes.append(f'índice {index.name}')
+    return changes
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Cria as tabelas e sincroniza colunas e índices novos dos modelos"""
+    load_models()
+    changes = sync_schema(db.engine)
+    for change in changes:
+        click.echo(f'Criado: {change}')
+    click.echo(f'Esquema sincronizado ({len(changes)} alterações)')
+    
+    # Ranking novo num banco com dados: preenche a partir do histórico
+    from src.services.leaderboard import backfill_leaderboard
+    backfill = backfill_leaderboard()
+    if backfill:
+        click.echo(f'Ranking preenchido: {backfill[1]} linhas desde {backfill[0]:%Y-%m-%d}')
+
+@click.command('seed')
+@with_appcontext
+def seed_command():
+    """Cria os dados padrão nas tabelas vazias"""
+    seed_default_data()
+    click.echo('Dados padrão criados com sucesso!')
+
+@click.command('expire-quotes')
+@click.option('--batch-size', type=int, default=None, help='Cotações por transação (padrão QUOTE_EXPIRY_BATCH_SIZE)')
+@with_appcontext
+def expire_quotes_command(batch_size):
+    """Marca como Expirada as cotações pendentes com validade vencida"""
+    from flask import current_app
+    from src.services.quote_expiry import expire_overdue_quotes
+    expired = expire_overdue_quotes(batch_size or current_app.config['QUOTE_EXPIRY_BATCH_SIZE'])
+    click.echo(f'{expired} cotações expiradas')
+
+@click.command('snapshot-commissions')
+@click.option('--start', 'start', required=True, help='Início do período (ISO 8601)')
+@click.option('--end', 'end', required=True, help='Fim do período, exclusivo (ISO 8601)')
+@click.option('--granularity', type=click.Choice(['month', 'quarter', 'year']), default='month')
+@with_appcontext
+def snapshot_commissions_command(start, end, granularity):
+    """Recalcula e grava as comissões dos períodos inteiros entre --start e --end"""
+    from datetime import datetime
+    from src.services.commissions import snapshot_commissions
+    start, end, count = snapshot_commissions(datetime.fromisoformat(start), datetime.fromisoformat(end), granularity)
+    click.echo(f'{count} linhas de comissão gravadas ({start:%Y-%m-%d} a {end:%Y-%m-%d})')
+
+@click.command('refresh-forecasts')
+@click.option('--full', is_flag=True, help='Refaz a busca dos parâmetros com todo o histórico')
+@with_appcontext
+def refresh_forecasts_command(full):
+    """Atualiza as previsões de receita até o último mês completo"""
+    from src.services.forecasting import refresh_forecasts
+    click.echo(f'Previsões atualizadas ({refresh_forecasts(full=full)})')
+
+@click.command('reconcile-leaderboard')
+@click.option('--since', default=None, help='Recalcula desde esta data (ISO 8601); padrão: períodos atuais e últimos 30 dias')
+@with_appcontext
+def reconcile_leaderboard_command(since):
+    """Recalcula o ranking de representantes a partir das vendas, cotações e compromissos"""
+    from datetime import datetime
+    from src.services.leaderboard import reconcile_leaderboard
+    since, count = reconcile_leaderboard(datetime.fromisoformat(since) if since else None)
+    click.echo(f'{count} linhas do ranking recalculadas desde {since:%Y-%m-%d}')
+
+@click.command('score-leads')
+@click.option('--full', is_flag=True, help='Pontua todos os leads, não só os alterados')
+@click.option('--batch-size', type=int, default=None, help='Leads por transação (padrão LEAD_SCORING_BATCH_SIZE)')
+@with_appcontext
+def score_leads_command(full, batch_size):
+    """Calcula a pontuação dos leads novos ou alterados"""
+    from src.services.lead_scoring import score_leads
+    click.echo(f'{score_leads(full=full, batch_size=batch_size)} leads pontuados')
+
+@click.command('sync-lead-counters')
+@with_appcontext
+def sync_lead_counters_command():
+    """Recalcula os leads em aberto por representante usados na atribuição automática"""
+    from src.services.lead_assignment import sync_rep_counters
+    click.echo(f'{sync_rep_counters()} contadores de representantes sincronizados')
+
+def init_commands(app):
+    """Registra os comandos do flask CLI (flask --app src.main <comando>)"""
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(expire_quotes_command)
+    app.cli.add_command(snapshot_commissions_command)
+    app.cli.add_command(refresh_forecasts_command)
+    app.cli.add_command(reconcile_leaderboard_command)
+    app.cli.add_command(score_leads_command)
+    app.cli.add_command(sync_lead_counters_command)
@@ -0,0 +1,142 @@
+import gzip
+import os
+import re
+import sys
+import zlib
+from flask import request
+
+# brotli é opcional (pip install brotli): sem ele as respostas usam apenas gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json', 'application/javascript', 'text/html', 'text/css', 'text/plain',
+    'text/javascript', 'image/svg+xml', 'application/xml', 'text/xml',
+)
+PRECOMPRESSED_EXTENSIONS = ('.js', '.css', '.html', '.json', '.svg', '.txt', '.map', '.ico', '.xml')
+# Nomes gerados pelo bundler com hash do conteúdo (ex.: index-C8UjQcYk.js) nunca mudam
+HASHED_FILENAME = re.compile(r'-[A-Za-z0-9_-]{8}\.')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Extensão do arquivo pré-comprimido para cada codificação
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+def available_encodings():
+    """Codificações suportadas pelo servidor, por ordem de preferência"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def negotiate_encoding(encodings=None):
+    """Melhor codificação aceita pelo cliente (Accept-Encoding), ou None"""
+    return request.accept_encodings.best_match(encodings or available_encodings())
+
+def add_vary(response, header='Accept-Encoding'):
+    vary = {value.strip().lower() for value in response.headers.get('Vary', '').split(',') if value.strip()}
+    if header.lower() not in vary:
+        response.vary.add(header)
+
+def compress_bytes(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def stream_compressor(encoding, level):
+    """Compressor incremental: devolve (compress(chunk), finish())"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = formato gzip
+    return compressor.compress, compressor.flush
+
+def compress_stream(chunks, encoding, level):
+    """Comprime uma resposta em streaming sem acumulá-la em memória"""
+    compress, finish = stream_compressor(encoding, level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+def init_compression(app):
+    """Comprime (gzip/br) as respostas da API acima de COMPRESS_MIN_SIZE bytes"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+    # Qualidade 4-5 do brotli comprime melhor que gzip 6 com custo de CPU parecido
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+    
+    @app.after_request
+    def compress_response(response):
+        # Arquivos estáticos têm versões pré-comprimidas, geradas ao carregar o manifesto (src/static_manifest.py)
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return response
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES or request.method == 'HEAD':
+            return response
+        
+        add_vary(response)
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+        level = app.config['COMPRESS_BR_LEVEL'] if encoding == 'br' else app.config['COMPRESS_GZIP_LEVEL']
+        
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < app.config['COMPRESS_MIN_SIZE']:
+                return response
+            response.set_data(compress_bytes(data, encoding, level))
+        
+        response.headers['Content-Encoding'] = encoding
+        # O ETag do conteúdo original não vale para a versão comprimida
+        if response.headers.get('ETag') and not response.headers['ETag'].startswith('W/'):
+            response.headers['ETag'] = 'W/' + response.headers['ETag']
+        return response
+
+def static_cache_control(filename):
+    """Cache longo para arquivos com hash no nome; revalidação para o resto (ex.: index.html)"""
+    if HASHED_FILENAME.search(os.path.basename(filename)):
+        return IMMUTABLE_CACHE_CONTROL
+    return 'no-cache'
+
+def precompress_static(folder, min_size=256):
+    """Gera os irmãos .gz (e .br, se brotli estiver instalado) dos arquivos estáticos"""
+    written = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if not name.endswith(PRECOMPRESSED_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            
+            for encoding in available_encodings():
+                target = path + ENCODING_SUFFIXES[encoding]
+                # Já atualizado desde a última compilação do frontend
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                compressed = compress_bytes(data, encoding, 11 if encoding == 'br' else 9)
+                # Não vale a pena servir uma versão que quase não reduz o tamanho
+                if len(compressed) >= len(data) * 0.95:
+                    continue
+                # Grava num temporário e renomeia: workers iniciando juntos nunca servem um arquivo parcial
+                temporary = f'{target}.{os.getpid()}.tmp'
+                with open(temporary, 'wb') as f:
+                    f.write(compressed)
+                os.replace(temporary, target)
+                written.append((target, len(data), len(compressed)))
+    return written
+
+if __name__ == '__main__':
+    # Passo de build opcional (o manifesto estático gera o que faltar ao iniciar): python -m src.compression [pasta]
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), 'static')
+    for target, original, compressed in precompress_static(folder):
+        print(f'{target}: {original} -> {compressed} bytes')
+    if brotli is None:
+        print('brotli não instalado: apenas arquivos .gz foram gerados')
@@ -0,0 +1,191 @@
+import os
+from sqlalchemy.engine import make_url
+from src.monitoring.pool import InstrumentedQueuePool
+
+# Estratégias de atribuição automática de leads (src/services/lead_assignment.py)
+LEAD_ASSIGNMENT_STRATEGIES = ('least_load', 'weighted_round_robin')
+
+def env_int(name, default):
+    """Lê um inteiro de uma variável de ambiente"""
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'Variável de ambiente {name} deve ser um inteiro (recebido: {value!r})')
+
+def env_float(name, default):
+    """Lê um número decimal de uma variável de ambiente"""
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f'Variável de ambiente {name} deve ser um número (recebido: {value!r})')
+
+def env_choice(name, choices, default):
+    """Lê uma variável de ambiente que deve ser um dos valores de choices"""
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    value = value.strip()
+    if value not in choices:
+        raise ValueError(f'Variável de ambiente {name} deve ser um dos seguintes: {", ".join(choices)} (recebido: {value!r})')
+    return value
+
+def env_bool(name, default):
+    """Lê um booleano (1/0, true/false, yes/no) de uma variável de ambiente"""
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def normalize_database_url(database_url):
+    """Corrige o esquema postgres:// (Render/Heroku) para o nome aceito pelo SQLAlchemy"""
+    if database_url and database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql://", 1)
+    return database_url
+
+def database_url_from_env():
+    """URL do banco principal (DATABASE_URL)"""
+    return normalize_database_url(os.environ.get('DATABASE_URL')) or 'sqlite:///local_dev.db'
+
+def replica_binds_from_env(engine_options):
+    """Binds das réplicas de leitura (DATABASE_REPLICA_URLS, separadas por vírgula)"""
+    urls = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    return {
+        f'replica_{index}': dict(engine_options, url=normalize_database_url(url))
+        for index, url in enumerate(urls)
+    }
+
+def worker_layout_from_env():
+    """Número de workers e threads por worker do gunicorn"""
+    return env_int('WEB_CONCURRENCY', 1), env_int('GUNICORN_THREADS', 1)
+
+def engine_options_from_env(database_url):
+    """Opções do engine/pool de conexões a partir das variáveis de ambiente"""
+    # DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (s), DB_POOL_RECYCLE (s),
+    # DB_POOL_PRE_PING e DB_STATEMENT_TIMEOUT_MS (apenas PostgreSQL)
+    url = make_url(database_url)
+    workers, threads = worker_layout_from_env()
+    
+    options = {
+        # Valida a conexão antes de usá-la: o proxy do Render derruba sockets ociosos
+        'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True),
+    }
+    
+    # SQLite em memória usa StaticPool (uma única conexão), sem opções de pool
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return options
+    
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': env_int('DB_POOL_SIZE', max(threads, 2)),
+        'max_overflow': env_int('DB_MAX_OVERFLOW', threads),
+        'pool_timeout': env_int('DB_POOL_TIMEOUT', 10),
+        # Recicla antes do timeout de ociosidade do proxy (5 minutos)
+        'pool_recycle': env_int('DB_POOL_RECYCLE', 280),
+    })
+    
+    statement_timeout = env_int('DB_STATEMENT_TIMEOUT_MS', 0)
+    if statement_timeout and url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    
+    validate_pool_settings(options, workers, threads, env_int('DB_MAX_CONNECTIONS', 0))
+    return options
+
+def validate_pool_settings(options, workers, threads, max_connections=0):
+    """Verifica o pool contra o layout de workers × threads (ValueError se inválido)"""
+    pool_size = options['pool_size']
+    max_overflow = options['max_overflow']
+    
+    if workers < 1 or threads < 1:
+        raise ValueError('WEB_CONCURRENCY e GUNICORN_THREADS devem ser maiores que zero')
+    if pool_size < 1 or max_overflow < 0 or options['pool_timeout'] <= 0:
+        raise ValueError('DB_POOL_SIZE deve ser >= 1, DB_MAX_OVERFLOW >= 0 e DB_POOL_TIMEOUT > 0')
+    
+    # Cada thread do worker pode precisar de uma conexão ao mesmo tempo
+    if pool_size + max_overflow < threads:
+        raise ValueError(
+            f'Pool de conexões ({pool_size} + {max_overflow} overflow) menor que o número '
+            f'de threads por worker ({threads}): os pedidos ficariam à espera de conexão'
+        )
+    
+    # O total de conexões de todos os workers não pode passar do limite do servidor
+    if max_connections and workers * (pool_size + max_overflow) > max_connections:
+        raise ValueError(
+            f'{workers} workers × ({pool_size} + {max_overflow}) conexões excede '
+            f'DB_MAX_CONNECTIONS={max_connections}'
+        )
+
+class Config:
+    """Configuração da aplicação lida das variáveis de ambiente no momento da criação"""
+    
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Frontend em produção e ambientes de desenvolvimento local
+    CORS_ORIGINS = ["https://pro-reps-crm-frontend.onrender.com", "http://localhost:3000", "http://127.0.0.1:5173"]
+    
+    def __init__(self):
+        self.SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key')
+        self.JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'dev-jwt-key')
+        
+        self.SQLALCHEMY_DATABASE_URI = database_url_from_env()
+        # Pool de conexões configurado por variáveis de ambiente e validado contra workers × threads
+        self.SQLALCHEMY_ENGINE_OPTIONS = engine_options_from_env(self.SQLALCHEMY_DATABASE_URI)
+        
+        # Réplicas de leitura opcionais: pedidos GET e geração de relatórios leem das réplicas
+        self.SQLALCHEMY_BINDS = replica_binds_from_env(self.SQLALCHEMY_ENGINE_OPTIONS)
+        self.DB_REPLICA_MAX_LAG = env_int('DB_REPLICA_MAX_LAG', 5)
+        self.DB_REPLICA_LAG_CHECK_INTERVAL = env_int('DB_REPLICA_LAG_CHECK_INTERVAL', 5)
+        self.DB_REPLICA_STICKY_SECONDS = env_int('DB_REPLICA_STICKY_SECONDS', 10)
+        # Cria tabelas, colunas e índices novos ao iniciar o servidor (mesmo que flask init-db)
+        self.DB_SYNC_SCHEMA_ON_START = env_bool('DB_SYNC_SCHEMA_ON_START', True)
+        
+        # Token opcional exigido pelo /api/metrics (Authorization: Bearer <token>)
+        self.METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+        
+        # Perfis de pedidos: cabeçalho X-Profile: 1 (admins) ou fração aleatória dos pedidos
+        self.PROFILE_SAMPLE_RATE = env_float('PROFILE_SAMPLE_RATE', 0.0)
+        self.PROFILE_FORMAT = os.environ.get('PROFILE_FORMAT', 'collapsed')
+        self.PROFILE_MAX_FILES = env_int('PROFILE_MAX_FILES', 50)
+        if os.environ.get('PROFILE_DIR'):
+            self.PROFILE_DIR = os.environ['PROFILE_DIR']
+        
+        # Tarefas periódicas (src/scheduler.py): um processo por máquina, intervalos em segundos
+        self.SCHEDULER_ENABLED = env_bool('SCHEDULER_ENABLED', True)
+        self.QUOTE_EXPIRY_INTERVAL = env_int('QUOTE_EXPIRY_INTERVAL', 300)
+        self.QUOTE_EXPIRY_BATCH_SIZE = env_int('QUOTE_EXPIRY_BATCH_SIZE', 500)
+        # Previsão de receita: meses de histórico, ajuste completo a cada N meses e atualização periódica
+        self.FORECAST_HISTORY_MONTHS = env_int('FORECAST_HISTORY_MONTHS', 36)
+        self.FORECAST_REFIT_MONTHS = env_int('FORECAST_REFIT_MONTHS', 3)
+        self.FORECAST_REFRESH_INTERVAL = env_int('FORECAST_REFRESH_INTERVAL', 3600)
+        # Recalcula o ranking dos períodos atuais (corrige escritas fora do ORM)
+        self.LEADERBOARD_RECONCILE_INTERVAL = env_int('LEADERBOARD_RECONCILE_INTERVAL', 900)
+        # Pontuação de leads: execução incremental, leads por lote e idade máxima de uma pontuação
+        self.LEAD_SCORING_INTERVAL = env_int('LEAD_SCORING_INTERVAL', 300)
+        self.LEAD_SCORING_BATCH_SIZE = env_int('LEAD_SCORING_BATCH_SIZE', 500)
+        self.LEAD_SCORE_REFRESH_HOURS = env_int('LEAD_SCORE_REFRESH_HOURS', 24)
+        # Atribuição automática de leads sem responsável: least_load ou weighted_round_robin
+        self.LEAD_AUTO_ASSIGN = env_bool('LEAD_AUTO_ASSIGN', True)
+        self.LEAD_ASSIGNMENT_STRATEGY = env_choice('LEAD_ASSIGNMENT_STRATEGY', LEAD_ASSIGNMENT_STRATEGIES, 'least_load')
+        self.LEAD_COUNTER_SYNC_INTERVAL = env_int('LEAD_COUNTER_SYNC_INTERVAL', 600)
+        # Validade das estatísticas em cache nos outros workers (o que escreveu invalida na hora)
+        self.STATS_CACHE_TTL = env_int('STATS_CACHE_TTL', 30)
+
+class TestConfig(Config):
+    """Banco SQLite local (src/database/app_test.db) e CORS aberto para testes"""
+    
+    CORS_ORIGINS = '*'
+    
+    def __init__(self):
+        super().__init__()
+        self.SECRET_KEY = 'asdf#FGSgvasgf$5$WGT'
+        self.JWT_SECRET_KEY = 'jwt-secret-string-change-in-production'
+        
+        database_dir = os.path.join(os.path.dirname(__file__), 'database')
+        os.makedirs(database_dir, exist_ok=True)
+        self.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(database_dir, 'app_test.db')}"
+        self.SQLALCHEMY_ENGINE_OPTIONS = engine_options_from_env(self.SQLALCHEMY_DATABASE_URI)
+        self.SQLALCHEMY_BINDS = {}
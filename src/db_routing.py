@@ -0,0 +1,167 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+# Réplicas são registadas em SQLALCHEMY_BINDS com as chaves replica_0, replica_1, ...
+# (ver replica_binds_from_env em src/config.py). Para testar localmente basta apontar
+# DATABASE_REPLICA_URLS para uma cópia do arquivo SQLite principal.
+REPLICA_BIND_PREFIX = 'replica_'
+READ_ONLY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Depois de uma escrita o cliente recebe o instante (epoch em segundos) até o qual as suas
+# leituras ficam no primário: no cookie (mesma origem) e no cabeçalho, que clientes de outra
+# origem devolvem no pedido seguinte. Vale em qualquer worker, ao contrário de um dicionário
+# do processo.
+PRIMARY_UNTIL_COOKIE = 'db_primary_until'
+PRIMARY_UNTIL_HEADER = 'X-DB-Primary-Until'
+
+_replica_counter = itertools.count()
+_lag_lock = threading.Lock()
+_lag_cache = {}  # engine -> (instante da verificação, atraso em segundos)
+
+class RoutingSession(Session):
+    """Sessão que envia as leituras de pedidos só-leitura às réplicas e o resto ao primário"""
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        
+        if bind is not None or self._flushing:
+            return primary
+        if is_write_statement(clause):
+            # INSERT/UPDATE/DELETE fora do flush (Core, em lote, text()): as leituras seguintes
+            # precisam ver a escrita
+            self.info['wrote'] = True
+            return primary
+        if self.info.get('wrote') or not replica_reads_allowed():
+            return primary
+        
+        # Uma única réplica por sessão para que as leituras do pedido sejam consistentes
+        if 'replica' not in self.info:
+            self.info['replica'] = choose_replica(self._db.engines)
+        return self.info['replica'] or primary
+
+def is_write_statement(clause):
+    """INSERT/UPDATE/DELETE, inclusive em text() (que não começa por SELECT ou WITH)"""
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().lower().startswith(('select', 'with'))
+    return False
+
+@event.listens_for(RoutingSession, 'after_flush')
+def mark_session_wrote(session, flush_context):
+    # Depois de uma escrita a sessão passa a ler apenas do primário
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def mark_client_sticky(session):
+    # Enviado ao cliente em send_primary_until, no fim do pedido
+    if session.info.get('wrote') and has_request_context():
+        g.db_primary_until = time.time() + current_app.config.get('DB_REPLICA_STICKY_SECONDS', 10)
+
+def primary_until():
+    """Instante recebido do cliente até o qual lê do primário (0 se ausente, inválido ou vencido)"""
+    value = request.headers.get(PRIMARY_UNTIL_HEADER) or request.cookies.get(PRIMARY_UNTIL_COOKIE)
+    try:
+        until = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    # Um valor além da janela configurada não prende o cliente ao primário indefinidamente
+    now = time.time()
+    if not now < until <= now + current_app.config.get('DB_REPLICA_STICKY_SECONDS', 10):
+        return 0.0
+    return until
+
+def replica_reads_allowed():
+    """Indica se as leituras do contexto atual podem ir para uma réplica"""
+    if not has_request_context():
+        return False
+    if request.method not in READ_ONLY_METHODS and not g.get('db_replica_reads'):
+        return False
+    
+    # Logo após uma escrita do próprio cliente (neste ou noutro worker) as leituras ficam no primário
+    return not primary_until()
+
+def init_db_routing(app):
+    """Envia ao cliente o prazo de leitura do primário depois de cada escrita confirmada"""
+    @app.after_request
+    def send_primary_until(response):
+        until = g.pop('db_primary_until', None)
+        if until is not None:
+            value = f'{until:.3f}'
+            response.headers[PRIMARY_UNTIL_HEADER] = value
+            response.set_cookie(
+                PRIMARY_UNTIL_COOKIE, value, max_age=current_app.config.get('DB_REPLICA_STICKY_SECONDS', 10),
+                httponly=True, samesite='Lax', secure=request.is_secure
+            )
+        return response
+
+def choose_replica(engines):
+    """Escolhe uma réplica com atraso aceitável (round-robin), ou None"""
+    replicas = [engine for key, engine in sorted(engines.items(), key=lambda item: str(item[0]))
+                if key and key.startswith(REPLICA_BIND_PREFIX)]
+    if not replicas:
+        return None
+    
+    max_lag = current_app.config.get('DB_REPLICA_MAX_LAG', 5)
+    healthy = [engine for engine in replicas if replica_lag(engine) <= max_lag]
+    if not healthy:
+        return None
+    return healthy[next(_replica_counter) % len(healthy)]
+
+def replica_lag(engine):
+    """Atraso de replicação em segundos (em cache por alguns segundos; infinito se falhar)"""
+    interval = current_app.config.get('DB_REPLICA_LAG_CHECK_INTERVAL', 5)
+    now = time.monotonic()
+    
+    with _lag_lock:
+        cached = _lag_cache.get(engine)
+        if cached is not None and now - cached[0] < interval:
+            return cached[1]
+    
+    try:
+        lag = measure_replica_lag(engine)
+    except Exception as e:
+        current_app.logger.warning('Réplica indisponível (%s): %s', engine.url.render_as_string(hide_password=True), e)
+        lag = float('inf')
+    
+    with _lag_lock:
+        _lag_cache[engine] = (now, lag)
+    return lag
+
+def measure_replica_lag(engine):
+    """Consulta o atraso de replicação diretamente na réplica"""
+    if engine.dialect.name != 'postgresql':
+        # Arquivos SQLite locais não têm replicação: atraso zero
+        return 0.0
+    
+    with engine.connect() as connection:
+        lag = connection.execute(text(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+        )).scalar()
+    return float(lag or 0)
+
+@contextmanager
+def replica_reads():
+    """Permite que as leituras deste bloco usem réplicas mesmo em pedidos POST"""
+    previous = g.get('db_replica_reads', False)
+    g.db_replica_reads = True
+    try:
+        yield
+    finally:
+        g.db_replica_reads = previous
+
+def read_only_route(view):
+    """Marca uma rota não-GET que apenas lê dados (ex.: geração de relatórios)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
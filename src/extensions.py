@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from src.db_routing import RoutingSession
 
-db = SQLAlchemy()
+# As leituras de pedidos só-leitura podem ser encaminhadas às réplicas (src/db_routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 cors = CORS()
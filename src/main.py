@@ -1,85 +1,172 @@
 import os
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, jsonify, request
 from sqlalchemy import text
 
 # Primeiro, importa as extensões
 from src.extensions import db, jwt, cors
+from src.config import Config
 
-# Cria a instância da aplicação ANTES de importar os blueprints
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+def create_app(config=None):
+    """Cria e configura a aplicação (config: objeto como src.config.Config ou TestConfig)"""
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    
+    # --- CONFIGURAÇÕES ---
+    app.config.from_object(config if config is not None else Config())
+    
+    # --- INICIALIZAÇÃO DAS EXTENSÕES ---
+    # Importações tardias: só carregam quando uma aplicação é criada
+    from src.monitoring.metrics import init_metrics
+    from src.monitoring.queries import init_query_stats
+    from src.monitoring.profiler import init_profiler
+    from src.compression import init_compression
+    from src.static_manifest import init_static_manifest
+    from src.commands import init_commands
+    from src.sqlite_profile import init_sqlite_profile
+    from src.scheduler import init_scheduler
+    from src.db_routing import PRIMARY_UNTIL_HEADER, init_db_routing
+    
+    # Associa as extensões à aplicação 'app'
+    db.init_app(app)
+    jwt.init_app(app)
+    # Consultas SQL de cada pedido (com aviso de N+1 em debug) e métricas de latência/tamanho
+    init_query_stats(app)
+    init_metrics(app)
+    init_profiler(app)
+    # Compressão gzip/br das respostas da API (os estáticos usam arquivos pré-comprimidos)
+    init_compression(app)
+    # Arquivos estáticos servidos a partir de um manifesto em memória
+    init_static_manifest(app)
+    # Comandos do flask CLI: init-db, seed e expire-quotes
+    init_commands(app)
+    # Tarefas periódicas (expiração de cotações); iniciadas por start_scheduler no post_fork
+    # do gunicorn, no arranque do src.asgi ou no primeiro pedido do processo
+    init_scheduler(app)
+    # Leituras no primário logo após as escritas do cliente (réplicas de leitura)
+    init_db_routing(app)
+    
+    # Permite pedidos da nossa URL de frontend e também do ambiente de desenvolvimento local
+    # O frontend de outra origem lê X-DB-Primary-Until e devolve-o nos pedidos seguintes
+    cors.init_app(app, resources={r"/api/*": {"origins": app.config['CORS_ORIGINS']}},
+                  expose_headers=[PRIMARY_UNTIL_HEADER])
+    
+    register_blueprints(app)
+    register_global_routes(app)
+    # SQLite: WAL, cache, busy_timeout etc. e repetição das rotas de escrita bloqueadas
+    init_sqlite_profile(app)
+    return app
 
-# --- CONFIGURAÇÕES ---
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
-app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'dev-jwt-key')
-
-database_url = os.environ.get('DATABASE_URL')
-if database_url and database_url.startswith("postgres://"):
-    database_url = database_url.replace("postgres://", "postgresql://", 1)
-
-app.config['SQLALCHEMY_DATABASE_URI'] = database_url or 'sqlite:///local_dev.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# --- INICIALIZAÇÃO DAS EXTENSÕES ---
-# Associa as extensões à aplicação 'app'
-db.init_app(app)
-jwt.init_app(app)
-
-# ####################################################################
-# INÍCIO DA ALTERAÇÃO - CONFIGURAÇÃO DO CORS
-# ####################################################################
-# Substituímos a linha simples do CORS por esta configuração mais específica
-frontend_url = "https://pro-reps-crm-frontend.onrender.com"
-# Permite pedidos da nossa URL de frontend e também do ambiente de desenvolvimento local
-cors.init_app(app, resources={r"/api/*": {"origins": [frontend_url, "http://localhost:3000", "http://127.0.0.1:5173"]}} )
-# ####################################################################
-# FIM DA ALTERAÇÃO
-# ####################################################################
+def register_blueprints(app):
+    # Importe os blueprints DEPOIS que 'app' e 'db' estão configurados
+    from src.routes.auth import auth_bp
+    from src.routes.customers import customers_bp
+    from src.routes.sales import sales_bp
+    from src.routes.leads import leads_bp
+    from src.routes.quotes import quotes_bp
+    from src.routes.appointments import appointments_bp
+    from src.routes.companies import companies_bp
+    from src.routes.reports import reports_bp
+    from src.routes.users import users_bp
+    from src.routes.batch import batch_bp
+    from src.routes.profiles import profiles_bp
+    from src.routes.commissions import commissions_bp
+    from src.routes.analytics import analytics_bp
+    
+    # --- REGISTO DOS BLUEPRINTS ---
+    app.register_blueprint(auth_bp, url_prefix='/api')
+    app.register_blueprint(customers_bp, url_prefix='/api')
+    app.register_blueprint(sales_bp, url_prefix='/api')
+    app.register_blueprint(leads_bp, url_prefix='/api')
+    app.register_blueprint(quotes_bp, url_prefix='/api')
+    app.register_blueprint(appointments_bp, url_prefix='/api')
+    app.register_blueprint(companies_bp, url_prefix='/api')
+    app.register_blueprint(reports_bp, url_prefix='/api')
+    app.register_blueprint(users_bp, url_prefix='/api')
+    app.register_blueprint(batch_bp, url_prefix='/api')
+    app.register_blueprint(profiles_bp, url_prefix='/api')
+    app.register_blueprint(commissions_bp, url_prefix='/api')
+    app.register_blueprint(analytics_bp, url_prefix='/api')
 
+def register_global_routes(app):
+    from src.monitoring.pool import pool_status
+    from src.monitoring.metrics import metrics_response
+    
+    # --- ROTAS GLOBAIS ---
+    @app.route('/api/health')
+    def health_check():
+        try:
+            db.session.execute(text('SELECT 1'))
+            db_status = 'connected'
+        except Exception as e:
+            db_status = f'error: {e}'
+        return jsonify({'status': 'ok', 'database_status': db_status})
+    
+    @app.route('/api/health/pool')
+    def pool_health():
+        """Estado do pool de conexões de cada engine (espera no checkout, overflow, idade)"""
+        return jsonify({
+            str(bind_key or 'default'): pool_status(engine)
+            for bind_key, engine in db.engines.items()
+        })
+    
+    @app.route('/api/metrics')
+    def metrics():
+        """Métricas da aplicação no formato de texto do Prometheus"""
+        metrics_token = app.config.get('METRICS_TOKEN')
+        if metrics_token and request.headers.get('Authorization') != f'Bearer {metrics_token}':
+            return jsonify({'error': 'Acesso negado'}), 403
+        
+        return metrics_response()
+    
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        # Arquivos conhecidos pelo manifesto; qualquer outro caminho recebe o index.html (SPA)
+        return app.extensions['static_manifest'].serve(path)
 
-# --- IMPORTAÇÃO TARDIA DOS BLUEPRINTS ---
-# Importe os blueprints DEPOIS que 'app' e 'db' estão configurados
-from src.routes.auth import auth_bp
-from src.routes.customers import customers_bp
-from src.routes.sales import sales_bp
-from src.routes.leads import leads_bp
-from src.routes.quotes import quotes_bp
-from src.routes.appointments import appointments_bp
-from src.routes.companies import companies_bp
-from src.routes.reports import reports_bp
-from src.routes.users import users_bp
+def prepare_database(app):
+    """Sincroniza o esquema antes de servir pedidos (gunicorn on_starting, passenger, execução local)"""
+    if not app.config.get('DB_SYNC_SCHEMA_ON_START', True):
+        return []
+    from src.commands import load_models, sync_schema
+    with app.app_context():
+        load_models()
+        changes = sync_schema(db.engine)
+    if changes:
+        app.logger.info('Esquema sincronizado: %s', ', '.join(changes))
+    return changes
 
-# --- REGISTO DOS BLUEPRINTS ---
-app.register_blueprint(auth_bp, url_prefix='/api')
-app.register_blueprint(customers_bp, url_prefix='/api')
-app.register_blueprint(sales_bp, url_prefix='/api')
-app.register_blueprint(leads_bp, url_prefix='/api')
-app.register_blueprint(quotes_bp, url_prefix='/api')
-app.register_blueprint(appointments_bp, url_prefix='/api')
-app.register_blueprint(companies_bp, url_prefix='/api')
-app.register_blueprint(reports_bp, url_prefix='/api')
-app.register_blueprint(users_bp, url_prefix='/api')
+def on_worker_fork(app):
+    """Chamado em cada worker logo após o fork (gunicorn post_fork)"""
+    # Com preload_app o processo mestre pode ter aberto conexões: os sockets herdados
+    # não podem ser usados pelos dois processos. close=False descarta o pool sem fechar
+    # as conexões do mestre; o worker abre as suas na primeira consulta.
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+            # As conexões do mestre saem do pool sem o evento close: a idade e os contadores
+            # herdados não descrevem este worker
+            stats = getattr(engine.pool, 'stats', None)
+            if stats is not None:
+                stats.reset()
+    # Threads não sobrevivem ao fork: o agendador é iniciado no worker (só um por máquina)
+    from src.scheduler import start_scheduler
+    start_scheduler(app)
 
-# --- ROTAS GLOBAIS ---
-@app.route('/api/health')
-def health_check():
-    try:
-        with app.app_context():
-            db.session.execute(text('SELECT 1'))
-        db_status = 'connected'
-    except Exception as e:
-        db_status = f'error: {e}'
-    return jsonify({'status': 'ok', 'database_status': db_status})
+_app = None
 
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    if path != "" and os.path.exists(os.path.join(app.static_folder, path)):
-        return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, 'index.html')
+def __getattr__(name):
+    # 'app' é criada no primeiro acesso (gunicorn src.main:app, passenger_wsgi):
+    # importar create_app não constrói a aplicação de produção
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Bloco para execução local
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
+    app = create_app()
+    prepare_database(app)
+    # O agendador arranca no primeiro pedido (no processo filho do reloader, não no que o vigia)
     app.run(host='0.0.0.0', port=5000, debug=True)
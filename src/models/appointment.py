@@ -7,7 +7,7 @@ class Appointment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    client_id = db.Column(db.Integer, db.ForeignKey('customers.id'))
+    client_id = db.Column(db.Integer, db.ForeignKey('customers.id'), index=True)
     client_name = db.Column(db.String(100))
     representative = db.Column(db.String(100), nullable=False)
     appointment_date = db.Column(db.DateTime, nullable=False)
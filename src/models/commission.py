@@ -0,0 +1,34 @@
+from src.models.user import db
+from datetime import datetime
+
+class CommissionSnapshot(db.Model):
+    """Comissão apurada por representante, empresa representada e período (src/services/commissions.py)"""
+    __tablename__ = 'commission_snapshots'
+    __table_args__ = (
+        db.UniqueConstraint('granularity', 'period_start', 'representative', 'company_id', name='uq_commission_snapshot'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)  # month, quarter, year
+    period_start = db.Column(db.DateTime, nullable=False, index=True)
+    period_end = db.Column(db.DateTime, nullable=False)  # exclusivo
+    representative = db.Column(db.String(100), nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+    sales_count = db.Column(db.Integer, nullable=False, default=0)
+    sales_value = db.Column(db.Float, nullable=False, default=0.0)
+    commission_value = db.Column(db.Float, nullable=False, default=0.0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'granularity': self.granularity,
+            'periodStart': self.period_start.isoformat() if self.period_start else None,
+            'periodEnd': self.period_end.isoformat() if self.period_end else None,
+            'representative': self.representative,
+            'companyId': self.company_id,
+            'salesCount': self.sales_count,
+            'salesValue': self.sales_value,
+            'commissionValue': self.commission_value,
+            'createdAt': self.created_at.isoformat() if self.created_at else None
+        }
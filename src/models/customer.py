@@ -1,5 +1,6 @@
 from src.models.user import db
 from datetime import datetime
+from src.cache import invalidate_on_change
 
 class Customer(db.Model):
     __tablename__ = 'customers'
@@ -50,3 +51,9 @@ class Customer(db.Model):
             db.session.commit()
             return True
         return False
+
+# Leads são ligados aos clientes por e-mail sem diferenciar maiúsculas (funil de conversão)
+db.Index('ix_customers_email_lower', db.func.lower(Customer.email))
+
+# Funil de conversão em cache (GET /api/analytics/funnel)
+invalidate_on_change(Customer, 'analytics:')
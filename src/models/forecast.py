@@ -0,0 +1,41 @@
+from src.models.user import db
+from datetime import datetime
+
+class ForecastState(db.Model):
+    """Parâmetros e estado ajustados da previsão de receita de uma série (src/services/forecasting.py)"""
+    __tablename__ = 'forecast_states'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    series_key = db.Column(db.String(100), nullable=False, unique=True)  # '*' = geral, senão o representante
+    model = db.Column(db.String(20), nullable=False)  # holt_winters, holt, naive
+    alpha = db.Column(db.Float, nullable=False, default=0.0)
+    beta = db.Column(db.Float, nullable=False, default=0.0)
+    gamma = db.Column(db.Float, nullable=False, default=0.0)
+    level = db.Column(db.Float, nullable=False, default=0.0)
+    trend = db.Column(db.Float, nullable=False, default=0.0)
+    season = db.Column(db.JSON)  # 12 componentes sazonais, indexados pelo mês do ano (0 = janeiro)
+    sse = db.Column(db.Float)
+    observations = db.Column(db.Integer, nullable=False, default=0)
+    # Meses completos [history_start, fitted_through] já incorporados ao estado
+    history_start = db.Column(db.DateTime, nullable=False)
+    fitted_through = db.Column(db.DateTime, nullable=False)
+    refitted_through = db.Column(db.DateTime, nullable=False)  # último ajuste completo (busca dos parâmetros)
+    # Contagem e soma das vendas do histórico no ajuste: diferença indica vendas retroativas
+    history_count = db.Column(db.Integer, nullable=False, default=0)
+    history_value = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'seriesKey': self.series_key,
+            'model': self.model,
+            'alpha': self.alpha,
+            'beta': self.beta,
+            'gamma': self.gamma,
+            'observations': self.observations,
+            'sse': self.sse,
+            'historyStart': self.history_start.isoformat() if self.history_start else None,
+            'fittedThrough': self.fitted_through.isoformat() if self.fitted_through else None,
+            'refittedThrough': self.refitted_through.isoformat() if self.refitted_through else None,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+        }
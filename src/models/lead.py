@@ -1,5 +1,8 @@
 from src.models.user import db
 from datetime import datetime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateIndex
+from src.cache import invalidate_on_change
 
 class Lead(db.Model):
     __tablename__ = 'leads'
@@ -9,8 +12,12 @@ class Lead(db.Model):
     email = db.Column(db.String(120), nullable=False)
     status = db.Column(db.String(20), nullable=False, default='Novo')  # Novo, Contato, Qualificado, Perdido
     source = db.Column(db.String(50))  # Website, LinkedIn, Indicação, etc.
-    assigned_to = db.Column(db.String(100))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    assigned_to = db.Column(db.String(100), index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Pontuação de 0 a 100 calculada em lote por src/services/lead_scoring.py (índice ix_leads_score)
+    score = db.Column(db.Float)
+    scored_at = db.Column(db.DateTime)
     
     def to_dict(self):
         return {
@@ -20,7 +27,10 @@ class Lead(db.Model):
             'status': self.status,
             'source': self.source,
             'assignedTo': self.assigned_to,
-            'createdAt': self.created_at.isoformat() if self.created_at else None
+            'score': round(self.score, 1) if self.score is not None else None,
+            'scoredAt': self.scored_at.isoformat() if self.scored_at else None,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
         }
     
     @staticmethod
@@ -66,3 +76,18 @@ class Lead(db.Model):
             db.session.commit()
             return True
         return False
+
+# GET /api/leads?sort=score lê os primeiros leads direto do índice, sem ordenar a tabela: a ordem
+# tem de ser a mesma da consulta (no PostgreSQL um índice ASC percorrido ao contrário dá NULLS FIRST)
+db.Index('ix_leads_score', Lead.score.desc().nulls_last(), Lead.id.desc())
+
+@compiles(CreateIndex, 'sqlite')
+def create_index_sqlite(create, compiler, **kw):
+    # SQLite não aceita NULLS LAST em índices; lá NULL é o menor valor e DESC já o deixa no fim
+    return compiler.visit_create_index(create, **kw).replace(' DESC NULLS LAST', ' DESC')
+
+# Pontuação incremental: leads dos clientes (por e-mail) com cotações ou compromissos alterados
+db.Index('ix_leads_email_lower', db.func.lower(Lead.email))
+
+# Funil de conversão em cache (GET /api/analytics/funnel)
+invalidate_on_change(Lead, 'analytics:')
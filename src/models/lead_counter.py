@@ -0,0 +1,24 @@
+from src.models.user import db
+from datetime import datetime
+
+class RepLeadCounter(db.Model):
+    """Leads em aberto e atribuições automáticas de cada representante (src/services/lead_assignment.py)"""
+    __tablename__ = 'rep_lead_counters'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    representative = db.Column(db.String(100), nullable=False, unique=True)
+    open_leads = db.Column(db.Integer, nullable=False, default=0)  # status diferente de Perdido
+    assigned_total = db.Column(db.Integer, nullable=False, default=0)  # atribuídos automaticamente (round-robin)
+    weight = db.Column(db.Float, nullable=False, default=1.0)  # 0 = não recebe leads automaticamente
+    active = db.Column(db.Boolean, nullable=False, default=True)  # usuário representante ativo
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'representative': self.representative,
+            'openLeads': self.open_leads,
+            'assignedTotal': self.assigned_total,
+            'weight': self.weight,
+            'active': self.active,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+        }
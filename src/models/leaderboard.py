@@ -0,0 +1,31 @@
+from src.models.user import db
+from datetime import datetime
+
+class LeaderboardEntry(db.Model):
+    """Totais de um representante num período (dia, semana, mês, ano), mantidos a cada escrita"""
+    __tablename__ = 'leaderboard_entries'
+    __table_args__ = (
+        # Também serve a leitura do ranking: WHERE granularity = ? AND period_start = ?
+        db.UniqueConstraint('granularity', 'period_start', 'representative', name='uq_leaderboard_entry'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)  # day, week, month, year
+    period_start = db.Column(db.DateTime, nullable=False)
+    representative = db.Column(db.String(100), nullable=False)
+    sales_count = db.Column(db.Integer, nullable=False, default=0)
+    sales_value = db.Column(db.Float, nullable=False, default=0.0)
+    quotes_approved = db.Column(db.Integer, nullable=False, default=0)
+    appointments_completed = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'representative': self.representative,
+            'granularity': self.granularity,
+            'periodStart': self.period_start.isoformat() if self.period_start else None,
+            'salesCount': self.sales_count,
+            'salesValue': round(self.sales_value, 2),
+            'quotesApproved': self.quotes_approved,
+            'appointmentsCompleted': self.appointments_completed
+        }
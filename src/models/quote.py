@@ -1,11 +1,15 @@
 from src.models.user import db
 from datetime import datetime
+from sqlalchemy import event
+from src.cache import invalidate_on_change
 
 class Quote(db.Model):
     __tablename__ = 'quotes'
+    # Varredura de expiração: WHERE status = 'Pendente' AND valid_until < agora
+    __table_args__ = (db.Index('ix_quotes_status_valid_until', 'status', 'valid_until'),)
     
     id = db.Column(db.Integer, primary_key=True)
-    client_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False, index=True)
     client_name = db.Column(db.String(100), nullable=False)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
@@ -15,6 +19,8 @@ class Quote(db.Model):
     valid_until = db.Column(db.DateTime, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Preenchido quando o status passa a Aprovada (updated_at muda a cada edição da cotação)
+    approved_at = db.Column(db.DateTime)
     
     def to_dict(self):
         return {
@@ -28,7 +34,8 @@ class Quote(db.Model):
             'representative': self.representative,
             'validUntil': self.valid_until.isoformat() if self.valid_until else None,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
+            'approvedAt': self.approved_at.isoformat() if self.approved_at else None
         }
     
     @staticmethod
@@ -56,7 +63,8 @@ class Quote(db.Model):
                     status='Aprovada',
                     representative='Ana Silva',
                     valid_until=datetime(2024, 11, 15),
-                    created_at=datetime(2024, 9, 15)
+                    created_at=datetime(2024, 9, 15),
+                    approved_at=datetime(2024, 9, 25)
                 ),
                 Quote(
                     client_id=3,
@@ -75,3 +83,15 @@ class Quote(db.Model):
             db.session.commit()
             return True
         return False
+
+@event.listens_for(Quote.status, 'set')
+def stamp_approval(quote, value, oldvalue, initiator):
+    """Data de aprovação ao entrar em Aprovada (a informada na criação prevalece); limpa ao sair"""
+    if value == 'Aprovada' and oldvalue != 'Aprovada':
+        if quote.approved_at is None:
+            quote.approved_at = datetime.utcnow()
+    elif value != 'Aprovada' and oldvalue == 'Aprovada':
+        quote.approved_at = None
+
+# Estatísticas e análises em cache (src/cache.py) deixam de valer quando a transação confirmar
+invalidate_on_change(Quote, 'quotes:', 'analytics:')
@@ -1,17 +1,22 @@
 from src.models.user import db
 from datetime import datetime
+from src.cache import invalidate_on_change
 
 class Sale(db.Model):
     __tablename__ = 'sales'
     
     id = db.Column(db.Integer, primary_key=True)
-    client_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False, index=True)
     client_name = db.Column(db.String(100), nullable=False)
     product = db.Column(db.String(200), nullable=False)
     value = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(20), nullable=False, default='Pendente')  # Pendente, Concluída, Cancelada
     representative = db.Column(db.String(100), nullable=False)
-    date = db.Column(db.DateTime, default=datetime.utcnow)
+    date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Cotação de origem (POST /api/quotes/<id>/convert); no máximo uma venda por cotação
+    quote_id = db.Column(db.Integer, db.ForeignKey('quotes.id'), unique=True, index=True)
+    # Empresa representada (base da comissão: companies.commission_rate)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), index=True)
     
     def to_dict(self):
         return {
@@ -22,7 +27,9 @@ class Sale(db.Model):
             'value': self.value,
             'status': self.status,
             'representative': self.representative,
-            'date': self.date.isoformat() if self.date else None
+            'date': self.date.isoformat() if self.date else None,
+            'quoteId': self.quote_id,
+            'companyId': self.company_id
         }
     
     @staticmethod
@@ -72,3 +79,6 @@ class Sale(db.Model):
             db.session.commit()
             return True
         return False
+
+# Séries de receita e funil em cache (GET /api/analytics/*) deixam de valer após o commit
+invalidate_on_change(Sale, 'analytics:')
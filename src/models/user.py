@@ -1,9 +1,7 @@
-from flask_sqlalchemy import SQLAlchemy
+from src.extensions import db
 from datetime import datetime, timedelta
 import bcrypt
 
-db = SQLAlchemy()
-
 class User(db.Model):
     __tablename__ = 'users'
     
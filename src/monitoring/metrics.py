@@ -0,0 +1,116 @@
+import os
+import time
+from flask import g, request, Response
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from src.extensions import db
+from src.monitoring.pool import PoolStats
+
+# Com vários workers do gunicorn, PROMETHEUS_MULTIPROC_DIR deve apontar para um diretório
+# partilhado (vazio no arranque): cada processo grava as métricas em arquivos mmap e o
+# /api/metrics agrega todos eles.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Latência dos pedidos HTTP',
+    ['method', 'endpoint'], buckets=LATENCY_BUCKETS
+)
+REQUEST_COUNT = Counter(
+    'http_requests_total', 'Total de pedidos HTTP',
+    ['method', 'endpoint', 'status']
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Tamanho das respostas HTTP',
+    ['method', 'endpoint'], buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_duration_seconds', 'Tempo gasto em consultas SQL por pedido',
+    ['method', 'endpoint'], buckets=LATENCY_BUCKETS
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'Número de consultas SQL por pedido',
+    ['method', 'endpoint'], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds', 'Espera por uma conexão do pool',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+)
+POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Conexões em uso', ['bind'], multiprocess_mode='livesum'
+)
+POOL_OVERFLOW = Gauge(
+    'db_pool_overflow', 'Conexões abertas além do pool_size', ['bind'], multiprocess_mode='livesum'
+)
+POOL_CONNECTION_AGE = Gauge(
+    'db_pool_connection_age_max_seconds', 'Idade da conexão mais antiga', ['bind'], multiprocess_mode='livemax'
+)
+
+def init_metrics(app):
+    """Regista o middleware que mede cada pedido (usa g.query_stats de init_query_stats)"""
+    if POOL_CHECKOUT_WAIT.observe not in PoolStats.checkout_observers:
+        PoolStats.checkout_observers.append(POOL_CHECKOUT_WAIT.observe)
+    with app.app_context():
+        track_pool_metrics(db.engines)
+    
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start_time = time.perf_counter()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        start_time = g.pop('metrics_start_time', None)
+        if start_time is None:
+            return response
+        
+        method = request.method
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_LATENCY.labels(method, endpoint).observe(time.perf_counter() - start_time)
+        REQUEST_COUNT.labels(method, endpoint, str(response.status_code)).inc()
+        
+        if not response.is_streamed:
+            RESPONSE_SIZE.labels(method, endpoint).observe(response.calculate_content_length() or 0)
+        
+        query_stats = g.get('query_stats')
+        if query_stats is not None:
+            REQUEST_DB_TIME.labels(method, endpoint).observe(query_stats.duration)
+            REQUEST_DB_QUERIES.labels(method, endpoint).observe(query_stats.count)
+        return response
+
+def track_pool_metrics(engines):
+    """Atualiza os gauges do pool a cada checkout e checkin, no processo que os fez"""
+    # Atualizar só no /api/metrics deixava os valores do worker que atendeu o scrape: com
+    # livesum/livemax cada worker tem de gravar os seus
+    for bind_key, engine in engines.items():
+        if isinstance(engine.pool, QueuePool):
+            track_engine_pool(engine, str(bind_key or 'default'))
+
+def track_engine_pool(engine, bind):
+    checked_out = POOL_CHECKED_OUT.labels(bind)
+    overflow = POOL_OVERFLOW.labels(bind)
+    connection_age = POOL_CONNECTION_AGE.labels(bind)
+    
+    def update_pool_metrics(returning):
+        # engine.pool: engine.dispose() troca o pool (os listeners passam para o novo)
+        pool = engine.pool
+        # No checkin a conexão ainda não voltou ao pool; se a fila já estiver cheia ela é descartada
+        discarded = returning and pool.checkedin() >= pool.size()
+        checked_out.set(pool.checkedout() - returning)
+        overflow.set(max(pool.overflow() - discarded, 0))
+        stats = getattr(pool, 'stats', None)
+        if stats is not None:
+            ages = stats.connection_ages()
+            connection_age.set(max(ages) if ages else 0)
+    
+    event.listen(engine, 'checkout', lambda *args: update_pool_metrics(False))
+    event.listen(engine, 'checkin', lambda *args: update_pool_metrics(True))
+
+def metrics_response():
+    """Métricas no formato de texto do Prometheus (agregadas entre processos se configurado)"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
@@ -0,0 +1,125 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+class PoolStats:
+    """Contadores do pool de conexões (tempo de espera no checkout e idade das conexões)"""
+    
+    # Funções chamadas com o tempo de espera de cada checkout (ex.: histograma do Prometheus)
+    checkout_observers = []
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        """Zera os contadores e esquece as conexões abertas (após o fork elas são do processo pai)"""
+        # Lock novo: no fork outra thread do processo pai pode estar a segurar o antigo
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.checkout_timeouts = 0
+        self.connections_opened = 0
+        self.invalidations = 0
+        self.connected_at = {}  # id do registo -> instante em que a conexão foi aberta
+    
+    def record_checkout(self, wait):
+        with self.lock:
+            self.checkouts += 1
+            self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+        for observer in self.checkout_observers:
+            observer(wait)
+    
+    def record_timeout(self):
+        with self.lock:
+            self.checkout_timeouts += 1
+    
+    def connection_ages(self):
+        now = time.time()
+        with self.lock:
+            return [now - connected_at for connected_at in self.connected_at.values()]
+
+def track_connections(pool, stats):
+    """Registra no pool os listeners que atualizam stats (referenciam só stats, não o pool)"""
+    def on_connect(dbapi_connection, connection_record):
+        with stats.lock:
+            stats.connections_opened += 1
+            stats.connected_at[id(connection_record)] = time.time()
+    
+    def on_close(dbapi_connection, connection_record):
+        with stats.lock:
+            stats.connected_at.pop(id(connection_record), None)
+    
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        with stats.lock:
+            stats.invalidations += 1
+            stats.connected_at.pop(id(connection_record), None)
+    
+    event.listen(pool, 'connect', on_connect)
+    event.listen(pool, 'close', on_close)
+    event.listen(pool, 'invalidate', on_invalidate)
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mede a espera por conexões e acompanha a idade de cada conexão"""
+    
+    def __init__(self, *args, **kwargs):
+        # recreate() (engine.dispose()) passa os listeners do pool antigo em _dispatch: já
+        # estão registados e o pool novo herda as estatísticas em recreate()
+        recreated = kwargs.get('_dispatch') is not None
+        super().__init__(*args, **kwargs)
+        if not recreated:
+            self.stats = PoolStats()
+            track_connections(self, self.stats)
+    
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection_record = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return connection_record
+
+def pool_status(engine):
+    """Retorna o estado atual do pool de um engine"""
+    pool = engine.pool
+    status = {'poolClass': type(pool).__name__}
+    
+    if not isinstance(pool, QueuePool):
+        return status
+    
+    status.update({
+        'size': pool.size(),
+        'checkedOut': pool.checkedout(),
+        'checkedIn': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'maxOverflow': pool._max_overflow,
+        'timeout': pool.timeout()
+    })
+    
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        ages = stats.connection_ages()
+        with stats.lock:
+            status.update({
+                'checkouts': stats.checkouts,
+                'checkoutWaitTotal': stats.checkout_wait_total,
+                'checkoutWaitAverage': stats.checkout_wait_total / stats.checkouts if stats.checkouts else 0,
+                'checkoutWaitMax': stats.checkout_wait_max,
+                'checkoutTimeouts': stats.checkout_timeouts,
+                'connectionsOpened': stats.connections_opened,
+                'invalidations': stats.invalidations
+            })
+        status['connectionAgeMax'] = max(ages) if ages else 0
+        status['connectionAgeAverage'] = sum(ages) / len(ages) if ages else 0
+    
+    return status
@@ -0,0 +1,175 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import current_app, g, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_NAME = re.compile(r'^[\w.-]+\.(folded|speedscope\.json)$')
+
+class StackSampler:
+    """Amostra periodicamente a pilha de uma thread (perfil estatístico, baixo custo)"""
+    
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()  # pilha (raiz -> folha) -> número de amostras
+        self.started_at = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+    
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+    
+    def to_collapsed(self):
+        """Formato 'collapsed stacks' (flamegraph.pl, speedscope, inferno)"""
+        return '\n'.join(f'{";".join(stack)} {count}' for stack, count in self.samples.most_common()) + '\n'
+    
+    def to_speedscope(self, name):
+        """Formato JSON do speedscope (perfil do tipo 'sampled')"""
+        frames = []
+        frame_index = {}
+        samples = []
+        weights = []
+        for stack, count in self.samples.items():
+            indexes = []
+            for frame_name in stack:
+                if frame_name not in frame_index:
+                    frame_index[frame_name] = len(frames)
+                    frames.append({'name': frame_name})
+                indexes.append(frame_index[frame_name])
+            samples.append(indexes)
+            weights.append(count * self.interval)
+        
+        return json.dumps({
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights
+            }]
+        })
+
+def init_profiler(app):
+    """Perfil por pedido: cabeçalho X-Profile (apenas admins) ou amostragem PROFILE_SAMPLE_RATE"""
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILE_INTERVAL', 0.002)
+    app.config.setdefault('PROFILE_FORMAT', 'collapsed')  # collapsed ou speedscope
+    app.config.setdefault('PROFILE_MAX_FILES', 50)
+    app.config.setdefault('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+    
+    @app.before_request
+    def start_profiling():
+        if not should_profile():
+            return
+        g.profiler = StackSampler(threading.get_ident(), current_app.config['PROFILE_INTERVAL'])
+        g.profiler.start()
+    
+    @app.after_request
+    def save_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+        
+        profiler.stop()
+        try:
+            response.headers['X-Profile-Id'] = write_profile(profiler)
+        except OSError as e:
+            current_app.logger.warning('Não foi possível gravar o perfil: %s', e)
+        return response
+
+def should_profile():
+    """Decide se o pedido atual deve ser perfilado"""
+    if request.headers.get(PROFILE_HEADER) == '1':
+        return is_admin_request()
+    sample_rate = current_app.config['PROFILE_SAMPLE_RATE']
+    return sample_rate > 0 and random.random() < sample_rate
+
+def is_admin_request():
+    """Verifica se o pedido traz um JWT válido de administrador"""
+    from src.models.user import User
+    
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return False
+    user_id = get_jwt_identity()
+    if user_id is None:
+        return False
+    user = User.query.get(user_id)
+    return user is not None and user.role == 'admin'
+
+def write_profile(profiler):
+    """Grava o perfil no diretório e descarta os mais antigos (buffer circular)"""
+    config = current_app.config
+    profile_dir = config['PROFILE_DIR']
+    os.makedirs(profile_dir, exist_ok=True)
+    
+    endpoint = (request.endpoint or 'unmatched').replace('.', '-')
+    base_name = (f'{datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")}_{request.method}_{endpoint}_'
+                 f'{int(profiler.duration * 1000)}ms')
+    
+    if config['PROFILE_FORMAT'] == 'speedscope':
+        name = f'{base_name}.speedscope.json'
+        content = profiler.to_speedscope(f'{request.method} {request.path}')
+    else:
+        name = f'{base_name}.folded'
+        content = profiler.to_collapsed()
+    
+    with open(os.path.join(profile_dir, name), 'w') as f:
+        f.write(content)
+    
+    # Os nomes começam pelo instante de criação: a ordem alfabética é a cronológica
+    profiles = list_profiles(profile_dir)
+    for old in profiles[config['PROFILE_MAX_FILES']:]:
+        try:
+            os.remove(os.path.join(profile_dir, old['name']))
+        except OSError:
+            pass
+    return name
+
+def list_profiles(profile_dir):
+    """Perfis gravados, do mais recente para o mais antigo"""
+    if not os.path.isdir(profile_dir):
+        return []
+    
+    profiles = []
+    for name in sorted(os.listdir(profile_dir), reverse=True):
+        if not PROFILE_NAME.match(name):
+            continue
+        path = os.path.join(profile_dir, name)
+        profiles.append({
+            'name': name,
+            'size': os.path.getsize(path),
+            'createdAt': datetime.utcfromtimestamp(os.path.getmtime(path)).isoformat()
+        })
+    return profiles
@@ -0,0 +1,115 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Coletores ativos no contexto atual (pedido, teste ou bloco collect_queries)
+_collectors = ContextVar('query_collectors', default=())
+
+# Mesma forma de consulta repetida a partir deste número de vezes indica um N+1
+N_PLUS_ONE_THRESHOLD = 5
+MAX_RECORDED_STATEMENTS = 200
+
+_IN_LIST = re.compile(r'IN \((?:\s*(?:\?|%\(\w+\)s|:\w+)\s*,?)+\)')
+_POSTCOMPILE = re.compile(r'\(__\[POSTCOMPILE_\w+\]\)')
+_WHITESPACE = re.compile(r'\s+')
+
+def statement_shape(statement):
+    """Forma normalizada da consulta (sem espaços extra e com listas IN colapsadas)"""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _POSTCOMPILE.sub('(...)', shape)
+    return _IN_LIST.sub('IN (...)', shape)
+
+class QueryStats:
+    """Número de consultas SQL, tempo total gasto nelas e formas repetidas"""
+    
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.statements = []
+    
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+        if len(self.statements) < MAX_RECORDED_STATEMENTS:
+            self.statements.append(statement)
+    
+    def repeated_shapes(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """Consultas executadas pelo menos threshold vezes (assinatura de N+1)"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+def start_collecting():
+    """Começa a contar as consultas do contexto atual; devolve (stats, token)"""
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    return stats, token
+
+def stop_collecting(token):
+    _collectors.reset(token)
+
+@contextmanager
+def collect_queries():
+    """Conta as consultas executadas dentro do bloco"""
+    stats, token = start_collecting()
+    try:
+        yield stats
+    finally:
+        stop_collecting(token)
+
+@contextmanager
+def assert_max_queries(max_queries):
+    """Falha com AssertionError se o bloco executar mais de max_queries consultas"""
+    with collect_queries() as stats:
+        yield stats
+    
+    if stats.count > max_queries:
+        statements = '\n'.join(f'  {statement_shape(statement)}' for statement in stats.statements)
+        raise AssertionError(f'{stats.count} consultas executadas (máximo {max_queries}):\n{statements}')
+
+def query_debug_enabled():
+    """QUERY_DEBUG se definido; senão o modo debug lido no pedido (app.run(debug=True) vem depois de create_app)"""
+    debug = current_app.config['QUERY_DEBUG']
+    return current_app.debug if debug is None else debug
+
+def init_query_stats(app):
+    """Conta as consultas de cada pedido em g.query_stats e avisa sobre possíveis N+1"""
+    # QUERY_DEBUG ativa o log de consultas repetidas (None: modo debug)
+    app.config.setdefault('QUERY_DEBUG', None)
+    app.config.setdefault('QUERY_N_PLUS_ONE_THRESHOLD', N_PLUS_ONE_THRESHOLD)
+    
+    @app.before_request
+    def start_request_query_stats():
+        g.query_stats, g.query_stats_token = start_collecting()
+    
+    @app.after_request
+    def log_repeated_queries(response):
+        query_stats = g.get('query_stats')
+        if query_stats is not None and query_debug_enabled():
+            threshold = current_app.config['QUERY_N_PLUS_ONE_THRESHOLD']
+            for shape, count in query_stats.repeated_shapes(threshold):
+                current_app.logger.warning(
+                    'Possível N+1 em %s %s: %d× %s', request.method, request.path, count, shape[:300]
+                )
+        return response
+    
+    @app.teardown_request
+    def stop_request_query_stats(exc):
+        token = g.pop('query_stats_token', None)
+        if token is not None:
+            stop_collecting(token)
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info['query_start_time'].pop()
+    for stats in _collectors.get():
+        stats.record(statement, duration)
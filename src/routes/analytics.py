@@ -0,0 +1,100 @@
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required
+from src.cache import cache
+# Registra a tabela forecast_states antes de db.create_all()
+import src.models.forecast
+# Registra também os eventos que mantêm o ranking a cada escrita
+from src.services.leaderboard import METRICS, WINDOWS, top_representatives
+from src.utils.periods import parse_datetime, parse_period_args
+from datetime import datetime, timedelta
+
+analytics_bp = Blueprint('analytics', __name__)
+
+SERIES_GRANULARITIES = ('day', 'week', 'month', 'quarter')
+# Limite de períodos por série (ex.: 10 anos por dia)
+MAX_PERIODS = 3660
+
+@analytics_bp.route('/analytics/revenue', methods=['GET'])
+@jwt_required()
+def get_revenue_series():
+    """Série temporal de receita e cotações (?granularity=day|week|month|quarter&start=&end=&window=&representative=)"""
+    # NumPy só é carregado no primeiro pedido de análises
+    from src.services.analytics import revenue_series
+    
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in SERIES_GRANULARITIES:
+        return jsonify({'error': f'Granularidade deve ser uma de: {", ".join(SERIES_GRANULARITIES)}'}), 400
+    try:
+        start, end = parse_period_args(default_start=datetime.utcnow() - timedelta(days=365))
+    except ValueError:
+        return jsonify({'error': 'Período inválido: start e end em ISO 8601, com end posterior a start'}), 400
+    if granularity == 'day' and (end - start).days > MAX_PERIODS:
+        return jsonify({'error': f'Máximo de {MAX_PERIODS} dias com granularity=day'}), 400
+    window = max(1, min(request.args.get('window', 3, type=int), 52))
+    representative = request.args.get('representative')
+    
+    # Em cache pela query string: invalidado quando vendas ou cotações mudam
+    key = f'analytics:revenue:{request.query_string.decode()}'
+    series = cache.get_or_set(
+        key,
+        lambda: revenue_series(start, end, granularity, window, representative),
+        current_app.config['STATS_CACHE_TTL']
+    )
+    return jsonify({
+        'granularity': granularity,
+        'window': window,
+        'period': {'start': start.isoformat(), 'end': end.isoformat()},
+        **series
+    })
+
+@analytics_bp.route('/analytics/forecast', methods=['GET'])
+@jwt_required()
+def get_revenue_forecast():
+    """Previsão mensal de receita geral e por representante (?horizon=3&representative=)"""
+    from src.services.forecasting import get_forecasts
+    
+    horizon = max(1, min(request.args.get('horizon', 3, type=int), 12))
+    representative = request.args.get('representative')
+    # Somente leitura dos estados ajustados (atualizados pelo agendador ou por flask refresh-forecasts)
+    key = f'analytics:forecast:{horizon}:{representative or ""}'
+    forecasts = cache.get_or_set(
+        key,
+        lambda: get_forecasts(horizon, representative),
+        current_app.config['STATS_CACHE_TTL']
+    )
+    return jsonify({'horizon': horizon, **forecasts})
+
+@analytics_bp.route('/analytics/funnel', methods=['GET'])
+@jwt_required()
+def get_conversion_funnel():
+    """Funil lead -> cliente -> cotação -> venda por origem e por representante (?start=&end=)"""
+    from src.services.funnel import conversion_funnel
+    
+    try:
+        start, end = parse_period_args(default_start=datetime.utcnow() - timedelta(days=365))
+    except ValueError:
+        return jsonify({'error': 'Período inválido: start e end em ISO 8601, com end posterior a start'}), 400
+    
+    # Em cache por período (query string); invalidado quando leads, clientes, cotações ou vendas mudam
+    key = f'analytics:funnel:{request.query_string.decode()}'
+    funnel = cache.get_or_set(key, lambda: conversion_funnel(start, end), current_app.config['STATS_CACHE_TTL'])
+    return jsonify({'period': {'start': start.isoformat(), 'end': end.isoformat()}, **funnel})
+
+@analytics_bp.route('/analytics/leaderboard', methods=['GET'])
+@jwt_required()
+def get_leaderboard():
+    """Ranking de representantes do período atual (?granularity=day|week|month|year&metric=salesValue&limit=10&at=)"""
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in WINDOWS:
+        return jsonify({'error': f'Granularidade deve ser uma de: {", ".join(WINDOWS)}'}), 400
+    metric = request.args.get('metric', 'salesValue')
+    if metric not in METRICS:
+        return jsonify({'error': f'Métrica deve ser uma de: {", ".join(METRICS)}'}), 400
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+    try:
+        at = parse_datetime(request.args['at']) if request.args.get('at') else None
+    except ValueError:
+        return jsonify({'error': 'Data inválida em at (ISO 8601)'}), 400
+    
+    # Lido das linhas já agregadas do período: sem cache, cada escrita atualiza o ranking na hora
+    return jsonify(top_representatives(granularity, metric, limit, at))
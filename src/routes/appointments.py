@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import User, db
 from src.models.appointment import Appointment
+from src.utils.batch import batch_get_response
 from datetime import datetime, timedelta
 
 appointments_bp = Blueprint('appointments', __name__)
@@ -9,7 +10,11 @@ appointments_bp = Blueprint('appointments', __name__)
 @appointments_bp.route('/appointments', methods=['GET'])
 @jwt_required()
 def get_appointments():
-    """Lista todos os compromissos"""
+    """Lista todos os compromissos (ou apenas os ids de ?ids=1,2,3)"""
+    ids_response = batch_get_response(Appointment)
+    if ids_response is not None:
+        return ids_response
+    
     appointments = Appointment.query.order_by(Appointment.appointment_date.desc()).all()
     return jsonify([appointment.to_dict() for appointment in appointments])
 
@@ -167,26 +172,30 @@ def get_appointments_by_client(client_id):
 @jwt_required()
 def get_appointments_stats():
     """Retorna estatísticas dos compromissos"""
-    total_appointments = Appointment.query.count()
-    scheduled_appointments = Appointment.query.filter_by(status='Agendado').count()
-    completed_appointments = Appointment.query.filter_by(status='Concluído').count()
-    cancelled_appointments = Appointment.query.filter_by(status='Cancelado').count()
+    return jsonify(appointments_stats(db.session))
+
+def appointments_stats(session):
+    """Estatísticas dos compromissos (também usada pelo modo assíncrono em src/asgi.py)"""
+    total_appointments = session.query(Appointment).count()
+    scheduled_appointments = session.query(Appointment).filter_by(status='Agendado').count()
+    completed_appointments = session.query(Appointment).filter_by(status='Concluído').count()
+    cancelled_appointments = session.query(Appointment).filter_by(status='Cancelado').count()
     
     # Compromissos de hoje
     today = datetime.now().date()
-    today_appointments = Appointment.query.filter(
+    today_appointments = session.query(Appointment).filter(
         db.func.date(Appointment.appointment_date) == today
     ).count()
     
     # Compromissos da semana
     week_start = today - timedelta(days=today.weekday())
     week_end = week_start + timedelta(days=6)
-    week_appointments = Appointment.query.filter(
+    week_appointments = session.query(Appointment).filter(
         db.func.date(Appointment.appointment_date) >= week_start,
         db.func.date(Appointment.appointment_date) <= week_end
     ).count()
     
-    return jsonify({
+    return {
         'totalAppointments': total_appointments,
         'scheduledAppointments': scheduled_appointments,
         'completedAppointments': completed_appointments,
@@ -194,4 +203,4 @@ def get_appointments_stats():
         'todayAppointments': today_appointments,
         'weekAppointments': week_appointments,
         'completionRate': (completed_appointments / total_appointments * 100) if total_appointments > 0 else 0
-    })
+    }
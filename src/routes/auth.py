@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from src.models.user import User, db
+from src.utils.batch import batch_get_response
 from datetime import datetime, timedelta
 
 auth_bp = Blueprint('auth', __name__)
@@ -81,13 +82,17 @@ def change_password():
 @auth_bp.route('/users', methods=['GET'])
 @jwt_required()
 def get_users():
-    """Lista todos os usuários (apenas admin)"""
+    """Lista todos os usuários ou os ids de ?ids=1,2,3 (apenas admin)"""
     user_id = get_jwt_identity()
     current_user = User.query.get(user_id)
     
     if not current_user or current_user.role != 'admin':
         return jsonify({'error': 'Acesso negado'}), 403
     
+    ids_response = batch_get_response(User)
+    if ids_response is not None:
+        return ids_response
+    
     users = User.query.all()
     return jsonify([user.to_dict() for user in users])
 
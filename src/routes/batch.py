@@ -0,0 +1,117 @@
+from flask import Blueprint, jsonify, request, current_app
+from flask_jwt_extended import jwt_required
+from sqlalchemy.orm import Session
+from werkzeug.exceptions import HTTPException
+from src.models.user import db
+from src.sqlite_profile import without_busy_retry
+
+batch_bp = Blueprint('batch', __name__)
+
+MAX_BATCH_REQUESTS = 20
+ALLOWED_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+# Rotas globais que não pertencem à API
+NON_API_ENDPOINTS = ('serve', 'static')
+
+@batch_bp.route('/batch', methods=['POST'])
+# Usa a própria sessão e os commits parciais dos pedidos: repetir o lote inteiro não é seguro
+@without_busy_retry
+@jwt_required()
+def run_batch():
+    """Executa vários pedidos da API num único pedido HTTP"""
+    data = request.json or {}
+    sub_requests = data.get('requests')
+    atomic = bool(data.get('atomic', False))
+    
+    # Validações
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({'error': 'Campo requests é obrigatório (lista de pedidos)'}), 400
+    
+    if len(sub_requests) > MAX_BATCH_REQUESTS:
+        return jsonify({'error': f'Máximo de {MAX_BATCH_REQUESTS} pedidos por lote'}), 400
+    
+    for sub_request in sub_requests:
+        if not isinstance(sub_request, dict) or not str(sub_request.get('path', '')).startswith('/api/'):
+            return jsonify({'error': 'Cada pedido precisa de um path começando por /api/'}), 400
+        if sub_request.get('method', 'GET').upper() not in ALLOWED_METHODS:
+            return jsonify({'error': f'Método deve ser um dos seguintes: {", ".join(ALLOWED_METHODS)}'}), 400
+    
+    responses = []
+    committed = True
+    
+    # Uma única conexão para todo o lote. No modo atómico os commits das rotas
+    # não são propagados: a transação externa decide no fim.
+    with db.engine.connect() as connection:
+        transaction = connection.begin() if atomic else None
+        session = Session(
+            bind=connection,
+            query_cls=db.Query,
+            join_transaction_mode='rollback_only' if atomic else 'conditional_savepoint'
+        )
+        db.session.remove()
+        db.session.registry.set(session)
+        
+        try:
+            for sub_request in sub_requests:
+                if atomic and not committed:
+                    responses.append(batch_response(sub_request, 424, {'error': 'Não executado: lote atómico interrompido'}))
+                    continue
+                
+                result = dispatch_sub_request(sub_request, session)
+                responses.append(result)
+                
+                if atomic and result['status'] >= 400:
+                    committed = False
+            
+            if atomic:
+                if committed:
+                    session.commit()
+                    transaction.commit()
+                elif transaction.is_active:
+                    # O rollback da sessão num pedido com erro já desfaz (e encerra) a transação externa
+                    transaction.rollback()
+        finally:
+            db.session.remove()
+    
+    result = {'responses': responses}
+    if atomic:
+        result['committed'] = committed
+    return jsonify(result)
+
+def dispatch_sub_request(sub_request, session):
+    """Executa um pedido do lote no contexto da aplicação atual"""
+    method = sub_request.get('method', 'GET').upper()
+    
+    with current_app.test_request_context(sub_request['path'], method=method, json=sub_request.get('body')):
+        try:
+            if request.routing_exception is not None:
+                raise request.routing_exception
+            
+            if request.url_rule.endpoint in NON_API_ENDPOINTS:
+                return batch_response(sub_request, 404, {'error': 'Rota não encontrada'})
+            if request.url_rule.endpoint == 'batch.run_batch':
+                return batch_response(sub_request, 400, {'error': 'Lotes não podem ser aninhados'})
+            
+            view = current_app.view_functions[request.url_rule.endpoint]
+            # O JWT já foi verificado no pedido externo e está em g, partilhado com este contexto
+            view = getattr(view, '__wrapped__', view)
+            response = current_app.make_response(view(**request.view_args))
+        except HTTPException as e:
+            session.rollback()
+            return batch_response(sub_request, e.code, {'error': e.description})
+        except Exception:
+            current_app.logger.exception('Erro ao executar pedido em lote: %s %s', method, sub_request['path'])
+            session.rollback()
+            return batch_response(sub_request, 500, {'error': 'Erro interno do servidor'})
+        
+        body = response.get_json(silent=True)
+        if body is None and response.status_code != 204:
+            body = response.get_data(as_text=True)
+        return batch_response(sub_request, response.status_code, body)
+
+def batch_response(sub_request, status, body):
+    """Monta a resposta de um pedido do lote"""
+    return {
+        'id': sub_request.get('id'),
+        'status': status,
+        'body': body
+    }
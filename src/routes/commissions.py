@@ -0,0 +1,79 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.models.user import User
+from src.models.commission import CommissionSnapshot
+from src.utils.periods import parse_datetime, parse_period_args
+
+commissions_bp = Blueprint('commissions', __name__)
+
+GRANULARITIES = ('month', 'quarter', 'year')
+
+@commissions_bp.route('/commissions', methods=['GET'])
+@jwt_required()
+def get_commissions():
+    """Comissões por representante, empresa e período calculadas a partir das vendas"""
+    # NumPy só é carregado no primeiro pedido de comissões
+    from src.services.commissions import compute_commissions
+    
+    try:
+        start, end = parse_period_args()
+    except ValueError:
+        return jsonify({'error': 'Período inválido: start e end em ISO 8601, com end posterior a start'}), 400
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in GRANULARITIES:
+        return jsonify({'error': f'Granularidade deve ser uma de: {", ".join(GRANULARITIES)}'}), 400
+    # ?status= vazio inclui vendas de qualquer status
+    status = request.args.get('status', 'Concluída')
+    
+    result = compute_commissions(start, end, granularity, status)
+    result['period'] = {'start': start.isoformat(), 'end': end.isoformat(), 'granularity': granularity}
+    return jsonify(result)
+
+@commissions_bp.route('/commissions/snapshots', methods=['GET'])
+@jwt_required()
+def get_commission_snapshots():
+    """Lista as comissões gravadas (filtros opcionais ?start=&end=&granularity=&representative=)"""
+    try:
+        start, end = parse_period_args()
+    except ValueError:
+        return jsonify({'error': 'Período inválido: start e end em ISO 8601, com end posterior a start'}), 400
+    
+    query = CommissionSnapshot.query.filter(
+        CommissionSnapshot.granularity == request.args.get('granularity', 'month'),
+        CommissionSnapshot.period_start >= start,
+        CommissionSnapshot.period_start < end,
+    )
+    if request.args.get('representative'):
+        query = query.filter(CommissionSnapshot.representative == request.args['representative'])
+    snapshots = query.order_by(CommissionSnapshot.period_start, CommissionSnapshot.representative).all()
+    return jsonify([snapshot.to_dict() for snapshot in snapshots])
+
+@commissions_bp.route('/commissions/snapshots', methods=['POST'])
+@jwt_required()
+def create_commission_snapshot():
+    """Recalcula e grava as comissões dos períodos informados (apenas admins)"""
+    from src.services.commissions import snapshot_commissions
+    
+    current_user = User.query.get(get_jwt_identity())
+    if not current_user or current_user.role != 'admin':
+        return jsonify({'error': 'Acesso negado. Apenas administradores podem gravar comissões.'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    granularity = data.get('granularity', 'month')
+    if granularity not in GRANULARITIES:
+        return jsonify({'error': f'Granularidade deve ser uma de: {", ".join(GRANULARITIES)}'}), 400
+    try:
+        start = parse_datetime(data['periodStart'])
+        end = parse_datetime(data['periodEnd'])
+    except (KeyError, AttributeError, ValueError):
+        return jsonify({'error': 'Campos periodStart e periodEnd são obrigatórios (ISO 8601)'}), 400
+    if end <= start:
+        return jsonify({'error': 'periodEnd deve ser posterior a periodStart'}), 400
+    
+    start, end, count = snapshot_commissions(start, end, granularity, data.get('status', 'Concluída'))
+    return jsonify({
+        'periodStart': start.isoformat(),
+        'periodEnd': end.isoformat(),
+        'granularity': granularity,
+        'rows': count
+    }), 201
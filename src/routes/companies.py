@@ -1,7 +1,9 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from src.models.user import User, db
 from src.models.company import Company
+from src.utils.batch import batch_get_response
 from datetime import datetime
 
 companies_bp = Blueprint('companies', __name__)
@@ -9,7 +11,11 @@ companies_bp = Blueprint('companies', __name__)
 @companies_bp.route('/companies', methods=['GET'])
 @jwt_required()
 def get_companies():
-    """Lista todas as empresas representadas"""
+    """Lista todas as empresas representadas (ou apenas os ids de ?ids=1,2,3)"""
+    ids_response = batch_get_response(Company)
+    if ids_response is not None:
+        return ids_response
+    
     companies = Company.query.order_by(Company.name).all()
     return jsonify([company.to_dict() for company in companies])
 
@@ -138,7 +144,12 @@ def delete_company(company_id):
     """Exclui empresa"""
     company = Company.query.get_or_404(company_id)
     db.session.delete(company)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Chaves estrangeiras ativas (PostgreSQL e SQLite com foreign_keys=ON)
+        db.session.rollback()
+        return jsonify({'error': 'Empresa possui vendas ou comissões vinculadas'}), 409
     
     return '', 204
 
@@ -176,16 +187,20 @@ def get_expiring_contracts():
 @jwt_required()
 def get_companies_stats():
     """Retorna estatísticas das empresas"""
-    total_companies = Company.query.count()
-    active_companies = Company.query.filter_by(status='Ativa').count()
-    inactive_companies = Company.query.filter_by(status='Inativa').count()
-    suspended_companies = Company.query.filter_by(status='Suspensa').count()
+    return jsonify(companies_stats(db.session))
+
+def companies_stats(session):
+    """Estatísticas das empresas (também usada pelo modo assíncrono em src/asgi.py)"""
+    total_companies = session.query(Company).count()
+    active_companies = session.query(Company).filter_by(status='Ativa').count()
+    inactive_companies = session.query(Company).filter_by(status='Inativa').count()
+    suspended_companies = session.query(Company).filter_by(status='Suspensa').count()
     
     # Média da taxa de comissão
-    avg_commission = db.session.query(db.func.avg(Company.commission_rate)).filter_by(status='Ativa').scalar() or 0
+    avg_commission = session.query(db.func.avg(Company.commission_rate)).filter_by(status='Ativa').scalar() or 0
     
     # Empresas por segmento
-    segments = db.session.query(
+    segments = session.query(
         Company.segment, 
         db.func.count(Company.id)
     ).filter_by(status='Ativa').group_by(Company.segment).all()
@@ -195,13 +210,13 @@ def get_companies_stats():
     # Contratos vencendo nos próximos 30 dias
     from datetime import timedelta
     thirty_days_from_now = datetime.now() + timedelta(days=30)
-    expiring_contracts = Company.query.filter(
+    expiring_contracts = session.query(Company).filter(
         Company.contract_end <= thirty_days_from_now,
         Company.contract_end >= datetime.now(),
         Company.status == 'Ativa'
     ).count()
     
-    return jsonify({
+    return {
         'totalCompanies': total_companies,
         'activeCompanies': active_companies,
         'inactiveCompanies': inactive_companies,
@@ -209,4 +224,4 @@ def get_companies_stats():
         'averageCommission': float(avg_commission),
         'segmentDistribution': segments_dict,
         'expiringContracts': expiring_contracts
-    })
+    }
@@ -1,14 +1,24 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from src.models.user import User, db
 from src.models.customer import Customer
+from src.models.sale import Sale
+from src.models.quote import Quote
+from src.models.appointment import Appointment
+from src.utils.batch import batch_get_response
+from datetime import datetime
 
 customers_bp = Blueprint('customers', __name__)
 
 @customers_bp.route('/customers', methods=['GET'])
 @jwt_required()
 def get_customers():
-    """Lista todos os clientes"""
+    """Lista todos os clientes (ou apenas os ids de ?ids=1,2,3)"""
+    ids_response = batch_get_response(Customer)
+    if ids_response is not None:
+        return ids_response
+    
     customers = Customer.query.all()
     return jsonify([customer.to_dict() for customer in customers])
 
@@ -41,6 +51,29 @@ def get_customer(customer_id):
     customer = Customer.query.get_or_404(customer_id)
     return jsonify(customer.to_dict())
 
+@customers_bp.route('/customers/<int:customer_id>/overview', methods=['GET'])
+@jwt_required()
+def get_customer_overview(customer_id):
+    """Retorna visão 360º do cliente (vendas, cotações, compromissos e totais)"""
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+    customer = Customer.query.get_or_404(customer_id)
+    
+    # Só os `limit` mais recentes de cada coleção saem do banco (LIMIT pelos índices de client_id);
+    # os totais são agregados no banco
+    return jsonify({
+        'customer': customer.to_dict(),
+        'recentSales': [sale.to_dict() for sale in recent(Sale, Sale.date, customer_id, limit)],
+        'recentQuotes': [quote.to_dict() for quote in recent(Quote, Quote.created_at, customer_id, limit)],
+        'recentAppointments': [
+            appointment.to_dict() for appointment in recent(Appointment, Appointment.appointment_date, customer_id, limit)
+        ],
+        'totals': customer_lifetime_totals(customer_id)
+    })
+
+def recent(model, date_column, customer_id, limit):
+    """Registos mais recentes do cliente, na mesma ordem das relações de Customer"""
+    return model.query.filter(model.client_id == customer_id).order_by(date_column.desc()).limit(limit).all()
+
 @customers_bp.route('/customers/<int:customer_id>', methods=['PUT'])
 @jwt_required()
 def update_customer(customer_id):
@@ -62,6 +95,61 @@ def delete_customer(customer_id):
     """Exclui cliente"""
     customer = Customer.query.get_or_404(customer_id)
     db.session.delete(customer)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Chaves estrangeiras ativas (PostgreSQL e SQLite com foreign_keys=ON)
+        db.session.rollback()
+        return jsonify({'error': 'Cliente possui vendas, cotações ou compromissos vinculados'}), 409
     
     return '', 204
+
+def count_where(condition):
+    return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+
+def sum_where(condition, column):
+    return db.func.coalesce(db.func.sum(db.case((condition, column), else_=0)), 0.0)
+
+def customer_lifetime_totals(customer_id):
+    """Calcula os totais do cliente com uma agregação por tabela"""
+    completed = Sale.status == 'Concluída'
+    total_sales, completed_sales, total_revenue, last_sale_date = db.session.execute(
+        db.select(
+            db.func.count(Sale.id), count_where(completed), sum_where(completed, Sale.value), db.func.max(Sale.date)
+        ).where(Sale.client_id == customer_id)
+    ).one()
+    
+    approved = Quote.status == 'Aprovada'
+    pending = Quote.status == 'Pendente'
+    total_quotes, approved_quotes, pending_quotes, approved_value, pending_value = db.session.execute(
+        db.select(
+            db.func.count(Quote.id), count_where(approved), count_where(pending),
+            sum_where(approved, Quote.value), sum_where(pending, Quote.value)
+        ).where(Quote.client_id == customer_id)
+    ).one()
+    
+    total_appointments, completed_appointments = db.session.execute(
+        db.select(db.func.count(Appointment.id), count_where(Appointment.status == 'Concluído'))
+        .where(Appointment.client_id == customer_id)
+    ).one()
+    next_appointment = Appointment.query.filter(
+        Appointment.client_id == customer_id,
+        Appointment.status == 'Agendado',
+        Appointment.appointment_date >= datetime.now()
+    ).order_by(Appointment.appointment_date).first()
+    
+    return {
+        'totalSales': total_sales,
+        'completedSales': completed_sales,
+        'totalRevenue': float(total_revenue),
+        'averageTicket': total_revenue / completed_sales if completed_sales else 0,
+        'lastSaleDate': last_sale_date.isoformat() if last_sale_date else None,
+        'totalQuotes': total_quotes,
+        'approvedQuotes': approved_quotes,
+        'pendingQuotes': pending_quotes,
+        'approvedQuotesValue': float(approved_value),
+        'pendingQuotesValue': float(pending_value),
+        'totalAppointments': total_appointments,
+        'completedAppointments': completed_appointments,
+        'nextAppointment': next_appointment.to_dict() if next_appointment else None
+    }
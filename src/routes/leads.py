@@ -1,14 +1,31 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required
-from src.models.user import db
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.models.user import User, db
 from src.models.lead import Lead
+from src.models.lead_counter import RepLeadCounter
+# Registra também os eventos que mantêm os contadores de leads por representante
+from src.services.lead_assignment import CLOSED_STATUS, assign_lead, create_leads
+from src.utils.batch import MAX_BATCH_IDS
 
 leads_bp = Blueprint('leads', __name__)
 
+# ?sort=score sem ?limit devolve só os primeiros (a lista ordenada é usada como fila de prioridade)
+SCORE_DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
 @leads_bp.route('/leads', methods=['GET'])
 @jwt_required()
 def get_leads():
-    leads = Lead.query.all()
+    """Lista os leads (?sort=score: os de maior pontuação primeiro, 100 por padrão; ?limit=N)"""
+    query = Lead.query
+    limit = request.args.get('limit', type=int)
+    if request.args.get('sort') == 'score':
+        # Mesma ordem de ix_leads_score (leads ainda sem pontuação no fim): lê só as primeiras entradas
+        query = query.order_by(Lead.score.desc().nulls_last(), Lead.id.desc())
+        limit = limit or SCORE_DEFAULT_LIMIT
+    if limit:
+        query = query.limit(max(1, min(limit, MAX_LIMIT)))
+    leads = query.all()
     return jsonify([lead.to_dict() for lead in leads])
 
 @leads_bp.route('/leads', methods=['POST'])
@@ -22,10 +39,67 @@ def create_lead():
         source=data.get('source'),
         assigned_to=data.get('assignedTo')
     )
+    # Sem responsável informado: atribuição automática (menor carga ou round-robin ponderado)
+    if not lead.assigned_to and lead.status != CLOSED_STATUS and current_app.config['LEAD_AUTO_ASSIGN']:
+        assign_lead(db.session, lead)
     db.session.add(lead)
     db.session.commit()
     return jsonify(lead.to_dict()), 201
 
+@leads_bp.route('/leads/bulk', methods=['POST'])
+@jwt_required()
+def create_leads_bulk():
+    """Cria vários leads numa única transação, atribuindo os sem responsável de uma vez"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('leads')
+    if not isinstance(items, list) or not items or len(items) > MAX_BATCH_IDS:
+        return jsonify({'error': f'Campo leads deve ser uma lista (máximo {MAX_BATCH_IDS})'}), 400
+    
+    rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('name') or not item.get('email'):
+            return jsonify({'error': f'Lead {index}: campos name e email são obrigatórios'}), 400
+        rows.append({
+            'name': item['name'],
+            'email': item['email'],
+            'status': item.get('status', 'Novo'),
+            'source': item.get('source'),
+            'assigned_to': item.get('assignedTo'),
+        })
+    
+    leads = create_leads(rows, assign=current_app.config['LEAD_AUTO_ASSIGN'])
+    db.session.commit()
+    return jsonify([lead.to_dict() for lead in leads]), 201
+
+@leads_bp.route('/leads/assignment', methods=['GET'])
+@jwt_required()
+def get_lead_assignment():
+    """Estratégia de atribuição e leads em aberto por representante"""
+    counters = RepLeadCounter.query.order_by(RepLeadCounter.open_leads.desc(), RepLeadCounter.representative).all()
+    return jsonify({
+        'strategy': current_app.config['LEAD_ASSIGNMENT_STRATEGY'],
+        'autoAssign': current_app.config['LEAD_AUTO_ASSIGN'],
+        'representatives': [counter.to_dict() for counter in counters]
+    })
+
+@leads_bp.route('/leads/assignment/<path:representative>', methods=['PUT'])
+@jwt_required()
+def update_lead_assignment(representative):
+    """Altera o peso de um representante na atribuição automática (apenas admins)"""
+    current_user = User.query.get(get_jwt_identity())
+    if not current_user or current_user.role != 'admin':
+        return jsonify({'error': 'Acesso negado. Apenas administradores podem alterar a atribuição de leads.'}), 403
+    
+    counter = RepLeadCounter.query.filter_by(representative=representative).first_or_404()
+    data = request.get_json(silent=True) or {}
+    weight = data.get('weight')
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+        return jsonify({'error': 'Campo weight deve ser um número maior ou igual a zero'}), 400
+    
+    counter.weight = float(weight)
+    db.session.commit()
+    return jsonify(counter.to_dict())
+
 @leads_bp.route('/leads/<int:lead_id>', methods=['PUT'])
 @jwt_required()
 def update_lead(lead_id):
@@ -0,0 +1,31 @@
+from flask import Blueprint, jsonify, current_app, send_from_directory
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.models.user import User
+from src.monitoring.profiler import PROFILE_NAME, list_profiles
+
+profiles_bp = Blueprint('profiles', __name__)
+
+@profiles_bp.route('/admin/profiles', methods=['GET'])
+@jwt_required()
+def get_profiles():
+    """Lista os perfis de pedidos gravados (apenas admins)"""
+    current_user = User.query.get(get_jwt_identity())
+    
+    if not current_user or current_user.role != 'admin':
+        return jsonify({'error': 'Acesso negado. Apenas administradores podem ver perfis.'}), 403
+    
+    return jsonify(list_profiles(current_app.config['PROFILE_DIR']))
+
+@profiles_bp.route('/admin/profiles/<name>', methods=['GET'])
+@jwt_required()
+def download_profile(name):
+    """Descarrega um perfil gravado (apenas admins)"""
+    current_user = User.query.get(get_jwt_identity())
+    
+    if not current_user or current_user.role != 'admin':
+        return jsonify({'error': 'Acesso negado. Apenas administradores podem ver perfis.'}), 403
+    
+    if not PROFILE_NAME.match(name):
+        return jsonify({'error': 'Nome de perfil inválido'}), 400
+    
+    return send_from_directory(current_app.config['PROFILE_DIR'], name, as_attachment=True)
@@ -1,7 +1,12 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from src.models.user import User, db
 from src.models.quote import Quote
+from src.routes.sales import company_id_error
+from src.services.quote_conversion import convert_quotes, load_convertible_quotes
+from src.utils.batch import MAX_BATCH_IDS, batch_get_response
+from src.cache import cache
 from datetime import datetime
 
 quotes_bp = Blueprint('quotes', __name__)
@@ -9,7 +14,11 @@ quotes_bp = Blueprint('quotes', __name__)
 @quotes_bp.route('/quotes', methods=['GET'])
 @jwt_required()
 def get_quotes():
-    """Lista todas as cotações"""
+    """Lista todas as cotações (ou apenas os ids de ?ids=1,2,3)"""
+    ids_response = batch_get_response(Quote)
+    if ids_response is not None:
+        return ids_response
+    
     quotes = Quote.query.order_by(Quote.created_at.desc()).all()
     return jsonify([quote.to_dict() for quote in quotes])
 
@@ -92,10 +101,67 @@ def delete_quote(quote_id):
     """Exclui cotação"""
     quote = Quote.query.get_or_404(quote_id)
     db.session.delete(quote)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Cotação já convertida em venda'}), 409
     
     return '', 204
 
+@quotes_bp.route('/quotes/<int:quote_id>/convert', methods=['POST'])
+@jwt_required()
+def convert_quote(quote_id):
+    """Cria a venda a partir da cotação e marca a cotação como Aprovada (companyId opcional: empresa da venda)"""
+    data = request.get_json(silent=True) or {}
+    error = company_id_error(data.get('companyId'))
+    if error:
+        return jsonify({'error': error}), 400
+    quotes, errors = load_convertible_quotes([quote_id])
+    if quote_id not in quotes:
+        return jsonify({'error': errors[quote_id]}), 404
+    if errors:
+        return jsonify({'error': errors[quote_id]}), 409
+    
+    try:
+        sale, = convert_quotes([quotes[quote_id]], data.get('status', 'Pendente'), data.get('companyId'))
+        db.session.commit()
+    except IntegrityError:
+        # Outro pedido converteu a mesma cotação (índice único em sales.quote_id)
+        db.session.rollback()
+        return jsonify({'error': 'Cotação já convertida em venda'}), 409
+    
+    return jsonify(sale.to_dict()), 201
+
+@quotes_bp.route('/quotes/convert', methods=['POST'])
+@jwt_required()
+def convert_quotes_batch():
+    """Converte várias cotações em vendas numa única transação (tudo ou nada; companyId vale para todas)"""
+    data = request.get_json(silent=True) or {}
+    quote_ids = data.get('ids')
+    if (not isinstance(quote_ids, list) or not quote_ids or len(quote_ids) > MAX_BATCH_IDS
+            or not all(isinstance(quote_id, int) for quote_id in quote_ids)):
+        return jsonify({'error': f'Campo ids deve ser uma lista de inteiros (máximo {MAX_BATCH_IDS})'}), 400
+    error = company_id_error(data.get('companyId'))
+    if error:
+        return jsonify({'error': error}), 400
+    quote_ids = list(dict.fromkeys(quote_ids))
+    
+    quotes, errors = load_convertible_quotes(quote_ids)
+    if errors:
+        return jsonify({'error': 'Algumas cotações não podem ser convertidas',
+                        'quotes': {str(quote_id): reason for quote_id, reason in errors.items()}}), 409
+    
+    try:
+        sales = convert_quotes([quotes[quote_id] for quote_id in quote_ids], data.get('status', 'Pendente'),
+                               data.get('companyId'))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Alguma cotação foi convertida por outro pedido'}), 409
+    
+    return jsonify([sale.to_dict() for sale in sales]), 201
+
 @quotes_bp.route('/quotes/status/<status>', methods=['GET'])
 @jwt_required()
 def get_quotes_by_status(status):
@@ -114,18 +180,24 @@ def get_quotes_by_client(client_id):
 @jwt_required()
 def get_quotes_stats():
     """Retorna estatísticas das cotações"""
-    total_quotes = Quote.query.count()
-    pending_quotes = Quote.query.filter_by(status='Pendente').count()
-    approved_quotes = Quote.query.filter_by(status='Aprovada').count()
-    rejected_quotes = Quote.query.filter_by(status='Rejeitada').count()
+    # Em cache por STATS_CACHE_TTL segundos; invalidadas quando alguma cotação muda
+    stats = cache.get_or_set('quotes:stats', lambda: quotes_stats(db.session), current_app.config['STATS_CACHE_TTL'])
+    return jsonify(stats)
+
+def quotes_stats(session):
+    """Estatísticas das cotações (também usada pelo modo assíncrono em src/asgi.py)"""
+    total_quotes = session.query(Quote).count()
+    pending_quotes = session.query(Quote).filter_by(status='Pendente').count()
+    approved_quotes = session.query(Quote).filter_by(status='Aprovada').count()
+    rejected_quotes = session.query(Quote).filter_by(status='Rejeitada').count()
     
     # Valor total das cotações aprovadas
-    approved_value = db.session.query(db.func.sum(Quote.value)).filter_by(status='Aprovada').scalar() or 0
+    approved_value = session.query(db.func.sum(Quote.value)).filter_by(status='Aprovada').scalar() or 0
     
     # Valor total das cotações pendentes
-    pending_value = db.session.query(db.func.sum(Quote.value)).filter_by(status='Pendente').scalar() or 0
+    pending_value = session.query(db.func.sum(Quote.value)).filter_by(status='Pendente').scalar() or 0
     
-    return jsonify({
+    return {
         'totalQuotes': total_quotes,
         'pendingQuotes': pending_quotes,
         'approvedQuotes': approved_quotes,
@@ -133,4 +205,4 @@ def get_quotes_stats():
         'approvedValue': float(approved_value),
         'pendingValue': float(pending_value),
         'conversionRate': (approved_quotes / total_quotes * 100) if total_quotes > 0 else 0
-    })
+    }
@@ -6,6 +6,10 @@ from src.models.sale import Sale
 from src.models.customer import Customer
 from src.models.lead import Lead
 from src.models.quote import Quote
+from src.services.leaderboard import daily_totals_since
+from src.utils.batch import batch_get_response
+from src.db_routing import read_only_route, replica_reads
+from src.utils.periods import naive_utc, parse_datetime
 from datetime import datetime, timedelta
 
 reports_bp = Blueprint('reports', __name__)
@@ -13,7 +17,11 @@ reports_bp = Blueprint('reports', __name__)
 @reports_bp.route('/reports', methods=['GET'])
 @jwt_required()
 def get_reports():
-    """Lista todos os relatórios"""
+    """Lista todos os relatórios (ou apenas os ids de ?ids=1,2,3)"""
+    ids_response = batch_get_response(Report)
+    if ids_response is not None:
+        return ids_response
+    
     reports = Report.query.order_by(Report.created_at.desc()).all()
     return jsonify([report.to_dict() for report in reports])
 
@@ -30,13 +38,15 @@ def create_report():
             return jsonify({'error': f'Campo {field} é obrigatório'}), 400
     
     try:
-        period_start = datetime.fromisoformat(data['periodStart'].replace('Z', '+00:00'))
-        period_end = datetime.fromisoformat(data['periodEnd'].replace('Z', '+00:00'))
+        # UTC sem fuso, como as datas gravadas: é o que as consultas comparam e o que fica no relatório
+        period_start = parse_datetime(data['periodStart'])
+        period_end = parse_datetime(data['periodEnd'])
     except ValueError:
         return jsonify({'error': 'Formato de data inválido'}), 400
     
-    # Gerar dados do relatório baseado no tipo
-    report_data = generate_report_data(data['type'], period_start, period_end)
+    # Gerar dados do relatório baseado no tipo (leituras podem ir para as réplicas)
+    with replica_reads():
+        report_data = generate_report_data(data['type'], period_start, period_end)
     
     report = Report(
         title=data['title'],
@@ -73,6 +83,7 @@ def delete_report(report_id):
 
 @reports_bp.route('/reports/generate/<report_type>', methods=['POST'])
 @jwt_required()
+@read_only_route
 def generate_report(report_type):
     """Gera relatório em tempo real"""
     data = request.json
@@ -83,7 +94,8 @@ def generate_report(report_type):
     except (ValueError, KeyError):
         return jsonify({'error': 'Período inválido'}), 400
     
-    report_data = generate_report_data(report_type, period_start, period_end)
+    # Datas com fuso (ex.: sufixo Z) viram UTC sem fuso, como as gravadas, antes das consultas
+    report_data = generate_report_data(report_type, naive_utc(period_start), naive_utc(period_end))
     
     return jsonify({
         'type': report_type,
@@ -97,35 +109,31 @@ def generate_report(report_type):
 @jwt_required()
 def get_dashboard_data():
     """Retorna dados para o dashboard"""
+    return jsonify(dashboard_data(db.session))
+
+def dashboard_data(session):
+    """Dados do dashboard (também usada pelo modo assíncrono em src/asgi.py)"""
     # Período padrão: últimos 30 dias
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30)
     
     # Estatísticas gerais
-    total_customers = Customer.query.count()
-    total_sales = Sale.query.filter(
+    total_customers = session.query(Customer).count()
+    total_sales = session.query(Sale).filter(
         Sale.date >= start_date,
         Sale.date <= end_date
     ).count()
-    total_leads = Lead.query.count()
+    total_leads = session.query(Lead).count()
     
     # Faturamento do período
-    revenue = db.session.query(db.func.sum(Sale.value)).filter(
+    revenue = session.query(db.func.sum(Sale.value)).filter(
         Sale.date >= start_date,
         Sale.date <= end_date,
         Sale.status == 'Concluída'
     ).scalar() or 0
     
-    # Vendas por representante
-    sales_by_rep = db.session.query(
-        Sale.representative,
-        db.func.count(Sale.id),
-        db.func.sum(Sale.value)
-    ).filter(
-        Sale.date >= start_date,
-        Sale.date <= end_date,
-        Sale.status == 'Concluída'
-    ).group_by(Sale.representative).all()
+    # Vendas por representante: soma dos totais diários do ranking (dias inteiros desde start_date)
+    sales_by_rep = daily_totals_since(session, start_date)
     
     sales_by_representative = {
         rep: {'count': count, 'value': float(value or 0)}
@@ -133,14 +141,14 @@ def get_dashboard_data():
     }
     
     # Leads por status
-    leads_by_status = db.session.query(
+    leads_by_status = session.query(
         Lead.status,
         db.func.count(Lead.id)
     ).group_by(Lead.status).all()
     
     leads_status_dict = {status: count for status, count in leads_by_status}
     
-    return jsonify({
+    return {
         'totalCustomers': total_customers,
         'totalSales': total_sales,
         'totalLeads': total_leads,
@@ -151,7 +159,7 @@ def get_dashboard_data():
             'start': start_date.isoformat(),
             'end': end_date.isoformat()
         }
-    })
+    }
 
 def generate_report_data(report_type, period_start, period_end):
     """Gera dados do relatório baseado no tipo"""
@@ -234,22 +242,19 @@ def generate_report_data(report_type, period_start, period_end):
         }
     
     elif report_type == 'financeiro':
-        # Relatório financeiro
-        sales = Sale.query.filter(
-            Sale.date >= period_start,
-            Sale.date <= period_end,
-            Sale.status == 'Concluída'
-        ).all()
+        # Relatório financeiro: receita por mês agrupada em NumPy (src/services/analytics.py)
+        from src.services.analytics import sales_by_period
         
-        total_revenue = sum(sale.value for sale in sales)
+        # period_end é inclusivo aqui; a série usa fim exclusivo
+        periods, revenue, sales_count, _ = sales_by_period(period_start, period_end + timedelta(microseconds=1), 'month')
+        total_revenue = float(revenue.sum())
         
-        # Receita por mês
-        monthly_revenue = {}
-        for sale in sales:
-            month_key = sale.date.strftime('%Y-%m')
-            if month_key not in monthly_revenue:
-                monthly_revenue[month_key] = 0
-            monthly_revenue[month_key] += sale.value
+        # Receita por mês (apenas meses com vendas concluídas)
+        monthly_revenue = {
+            str(period)[:7]: value
+            for period, value, count in zip(periods.tolist(), revenue.tolist(), sales_count.tolist())
+            if count > 0
+        }
         
         return {
             'totalRevenue': total_revenue,
@@ -2,9 +2,18 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from src.models.user import db
 from src.models.sale import Sale
+from src.models.company import Company
 
 sales_bp = Blueprint('sales', __name__)
 
+def company_id_error(company_id):
+    """Mensagem de erro se companyId não for null nem o id de uma empresa existente"""
+    if company_id is None:
+        return None
+    if isinstance(company_id, bool) or not isinstance(company_id, int) or db.session.get(Company, company_id) is None:
+        return 'Campo companyId deve ser o id de uma empresa existente (ou null)'
+    return None
+
 @sales_bp.route('/sales', methods=['GET'])
 @jwt_required()
 def get_sales():
@@ -15,13 +24,18 @@ def get_sales():
 @jwt_required()
 def create_sale():
     data = request.json
+    error = company_id_error(data.get('companyId'))
+    if error:
+        return jsonify({'error': error}), 400
+    
     sale = Sale(
         client_id=data['clientId'],
         client_name=data['clientName'],
         product=data['product'],
         value=data['value'],
         status=data.get('status', 'Pendente'),
-        representative=data['representative']
+        representative=data['representative'],
+        company_id=data.get('companyId')
     )
     db.session.add(sale)
     db.session.commit()
@@ -38,6 +52,12 @@ def update_sale(sale_id):
     sale.value = data.get('value', sale.value)
     sale.status = data.get('status', sale.status)
     sale.representative = data.get('representative', sale.representative)
+    if 'companyId' in data:
+        # null desfaz o vínculo com a empresa
+        error = company_id_error(data['companyId'])
+        if error:
+            return jsonify({'error': error}), 400
+        sale.company_id = data['companyId']
     
     db.session.commit()
     return jsonify(sale.to_dict())
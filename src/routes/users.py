@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash
 from src.models.user import User, db
+from src.utils.batch import batch_get_response
 from datetime import datetime, timedelta
 
 users_bp = Blueprint('users', __name__)
@@ -9,13 +10,17 @@ users_bp = Blueprint('users', __name__)
 @users_bp.route('/users', methods=['GET'])
 @jwt_required()
 def get_users():
-    """Lista todos os usuários (apenas admins)"""
+    """Lista todos os usuários ou os ids de ?ids=1,2,3 (apenas admins)"""
     current_user_id = get_jwt_identity()
     current_user = User.query.get(current_user_id)
     
     if not current_user or current_user.role != 'admin':
         return jsonify({'error': 'Acesso negado. Apenas administradores podem listar usuários.'}), 403
     
+    ids_response = batch_get_response(User)
+    if ids_response is not None:
+        return ids_response
+    
     users = User.query.all()
     return jsonify([user.to_dict() for user in users])
 
@@ -211,12 +216,16 @@ def get_users_stats():
     if not current_user or current_user.role != 'admin':
         return jsonify({'error': 'Acesso negado. Apenas administradores podem ver estatísticas.'}), 403
     
-    total_users = User.query.count()
-    active_users = User.query.filter_by(is_active=True).count()
-    inactive_users = User.query.filter_by(is_active=False).count()
+    return jsonify(users_stats(db.session))
+
+def users_stats(session):
+    """Estatísticas dos usuários (também usada pelo modo assíncrono em src/asgi.py)"""
+    total_users = session.query(User).count()
+    active_users = session.query(User).filter_by(is_active=True).count()
+    inactive_users = session.query(User).filter_by(is_active=False).count()
     
     # Usuários por role
-    users_by_role = db.session.query(
+    users_by_role = session.query(
         User.role,
         db.func.count(User.id)
     ).group_by(User.role).all()
@@ -225,12 +234,12 @@ def get_users_stats():
     
     # Usuários criados nos últimos 30 dias
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_users = User.query.filter(User.created_at >= thirty_days_ago).count()
+    recent_users = session.query(User).filter(User.created_at >= thirty_days_ago).count()
     
-    return jsonify({
+    return {
         'totalUsers': total_users,
         'activeUsers': active_users,
         'inactiveUsers': inactive_users,
         'usersByRole': roles_dict,
         'recentUsers': recent_users
-    })
+    }
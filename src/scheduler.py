@@ -0,0 +1,144 @@
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: sem flock, cada processo executa as tarefas (uso local com um só processo)
+    fcntl = None
+
+class Job:
+    __slots__ = ('name', 'func', 'interval', 'next_run', 'last_run', 'last_error')
+    
+    def __init__(self, name, func, interval, delay=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        # Primeira execução após delay segundos (padrão: um intervalo)
+        self.next_run = time.monotonic() + (interval if delay is None else delay)
+        self.last_run = None
+        self.last_error = None
+
+class Scheduler:
+    """Executa tarefas periódicas numa thread do próprio processo, cada uma num app context"""
+    
+    def __init__(self, app, tick=1.0):
+        self.app = app
+        self.tick = tick
+        self.jobs = {}
+        self.thread = None
+        self.stopping = threading.Event()
+        self.lock_file = None
+        # Este processo já tentou iniciar (com ou sem sucesso): o hook do primeiro pedido não repete
+        self.attempted = False
+    
+    def add_job(self, name, func, interval, delay=None):
+        self.jobs[name] = Job(name, func, interval, delay)
+    
+    def run_job(self, job):
+        with self.app.app_context():
+            try:
+                job.func()
+                job.last_error = None
+            except Exception as e:
+                job.last_error = str(e)
+                self.app.logger.exception('Falha na tarefa agendada %s', job.name)
+        job.last_run = datetime.utcnow()
+        job.next_run = time.monotonic() + job.interval
+    
+    def run_pending(self):
+        now = time.monotonic()
+        for job in list(self.jobs.values()):
+            if job.next_run <= now:
+                self.run_job(job)
+    
+    def loop(self):
+        while not self.stopping.wait(self.tick):
+            self.run_pending()
+    
+    def acquire_host_lock(self):
+        """Só um processo por máquina executa as tarefas (os outros workers do gunicorn desistem)"""
+        if fcntl is None:
+            return True
+        path = os.path.join(tempfile.gettempdir(), 'proreps-scheduler.lock')
+        lock_file = open(path, 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Mantido aberto: o lock é liberado quando o processo termina
+        self.lock_file = lock_file
+        return True
+    
+    def start(self):
+        self.attempted = True
+        if self.thread is not None or not self.jobs or not self.acquire_host_lock():
+            return False
+        self.thread = threading.Thread(target=self.loop, name='scheduler', daemon=True)
+        self.thread.start()
+        self.app.logger.info('Agendador iniciado (pid %d): %s', os.getpid(), ', '.join(self.jobs))
+        return True
+    
+    def stop(self):
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+def init_scheduler(app):
+    """Registra as tarefas periódicas; a thread só começa em start_scheduler (após o fork ou no primeiro pedido)"""
+    from src.services.quote_expiry import expire_overdue_quotes
+    
+    def refresh_forecasts():
+        # NumPy só é carregado na primeira execução
+        from src.services.forecasting import refresh_forecasts
+        refresh_forecasts()
+    
+    def reconcile_leaderboard():
+        from src.services.leaderboard import backfill_leaderboard, reconcile_leaderboard
+        # Banco atualizado sem o ranking: reconstrói o histórico em vez de só os períodos atuais
+        if backfill_leaderboard() is None:
+            reconcile_leaderboard()
+    
+    def score_leads():
+        from src.services.lead_scoring import score_leads
+        score_leads()
+    
+    def sync_lead_counters():
+        from src.services.lead_assignment import sync_rep_counters
+        sync_rep_counters()
+    
+    scheduler = Scheduler(app)
+    batch_size = app.config['QUOTE_EXPIRY_BATCH_SIZE']
+    if app.config['QUOTE_EXPIRY_INTERVAL'] > 0:
+        scheduler.add_job('expire-quotes', lambda: expire_overdue_quotes(batch_size), app.config['QUOTE_EXPIRY_INTERVAL'])
+    if app.config['FORECAST_REFRESH_INTERVAL'] > 0:
+        # Logo ao iniciar: a rota de previsão só lê os estados gravados
+        scheduler.add_job('refresh-forecasts', refresh_forecasts, app.config['FORECAST_REFRESH_INTERVAL'], delay=0)
+    if app.config['LEADERBOARD_RECONCILE_INTERVAL'] > 0:
+        # Logo ao iniciar: o dashboard lê as vendas por representante só do ranking
+        scheduler.add_job('reconcile-leaderboard', reconcile_leaderboard, app.config['LEADERBOARD_RECONCILE_INTERVAL'], delay=0)
+    if app.config['LEAD_SCORING_INTERVAL'] > 0:
+        scheduler.add_job('score-leads', score_leads, app.config['LEAD_SCORING_INTERVAL'])
+    if app.config['LEAD_COUNTER_SYNC_INTERVAL'] > 0:
+        scheduler.add_job('sync-lead-counters', sync_lead_counters, app.config['LEAD_COUNTER_SYNC_INTERVAL'])
+    app.extensions['scheduler'] = scheduler
+    
+    @app.before_request
+    def start_scheduler_on_first_request():
+        # flask run, passenger, start_test_5001 e pedidos repassados pelo src.asgi: o primeiro
+        # pedido de cada processo inicia as tarefas (no gunicorn o post_fork já o fez). Não é
+        # feito em create_app: um processo que carrega a aplicação e depois faz fork (preload do
+        # gunicorn, smart spawning do passenger, reloader do flask) perderia a thread.
+        if not scheduler.attempted:
+            start_scheduler(app)
+
+def start_scheduler(app):
+    """Inicia as tarefas neste processo se SCHEDULER_ENABLED e nenhum outro já as executa"""
+    if not app.config['SCHEDULER_ENABLED']:
+        return False
+    return app.extensions['scheduler'].start()
@@ -0,0 +1,95 @@
+import numpy as np
+from sqlalchemy import type_coerce
+from src.models.user import db
+from src.models.sale import Sale
+from src.models.quote import Quote
+from src.services.arrays import period_after, period_floor, period_range, stream_columns
+
+def load_series_columns(model, date_column, start, end, representative=None):
+    """Data, valor e status dos registos em [start, end), como arrays NumPy"""
+    query = (
+        db.select(type_coerce(date_column, db.String), model.value, model.status)
+        .where(date_column >= start, date_column < end)
+    )
+    if representative:
+        query = query.where(model.representative == representative)
+    (dates, values, statuses), labels = stream_columns(db.session, query, ('datetime', 'float', 'category'))
+    return dates, values, statuses, labels[2]
+
+def bin_by_period(dates, periods, granularity):
+    """Índice do período (em periods, ordenado) de cada data"""
+    return np.searchsorted(periods, period_floor(dates, granularity))
+
+def status_mask(statuses, labels, status):
+    """Máscara dos registos com o status (códigos comparados, sem strings por linha)"""
+    if status not in labels:
+        return np.zeros(len(statuses), dtype=bool)
+    return statuses == labels.index(status)
+
+def growth_rates(series):
+    """Variação percentual em relação ao período anterior (NaN sem base de comparação)"""
+    growth = np.full(len(series), np.nan)
+    previous = series[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth[1:] = np.where(previous != 0, (series[1:] - previous) / previous * 100, np.nan)
+    return growth
+
+def moving_average(series, window):
+    """Média móvel simples de `window` períodos (NaN enquanto a janela não está completa)"""
+    average = np.full(len(series), np.nan)
+    if window <= len(series):
+        cumulative = np.cumsum(np.insert(series, 0, 0.0))
+        average[window - 1:] = (cumulative[window:] - cumulative[:-window]) / window
+    return average
+
+def nullable(values, digits=2):
+    """Lista JSON com None no lugar de NaN"""
+    return [None if np.isnan(value) else round(value, digits) for value in values.tolist()]
+
+def sales_by_period(start, end, granularity='month', representative=None):
+    """Períodos de [start, end) com receita e quantidade das vendas concluídas e valor das pendentes"""
+    periods = period_range(start, end, granularity)
+    size = len(periods)
+    dates, values, statuses, labels = load_series_columns(Sale, Sale.date, start, end, representative)
+    bins = bin_by_period(dates, periods, granularity)
+    completed = status_mask(statuses, labels, 'Concluída')
+    pending = status_mask(statuses, labels, 'Pendente')
+    revenue = np.bincount(bins[completed], weights=values[completed], minlength=size)
+    sales_count = np.bincount(bins[completed], minlength=size)
+    pending_value = np.bincount(bins[pending], weights=values[pending], minlength=size)
+    return periods, revenue, sales_count, pending_value
+
+def revenue_series(start, end, granularity='month', window=3, representative=None):
+    """Receita das vendas e valor das cotações por período em [start, end), com crescimento e média móvel"""
+    periods, revenue, sales_count, pending_value = sales_by_period(start, end, granularity, representative)
+    size = len(periods)
+    
+    quote_dates, quote_values, quote_statuses, quote_labels = load_series_columns(Quote, Quote.created_at, start, end, representative)
+    quote_bins = bin_by_period(quote_dates, periods, granularity)
+    approved = status_mask(quote_statuses, quote_labels, 'Aprovada')
+    quotes_count = np.bincount(quote_bins, minlength=size)
+    quotes_value = np.bincount(quote_bins, weights=quote_values, minlength=size)
+    approved_value = np.bincount(quote_bins[approved], weights=quote_values[approved], minlength=size)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_ticket = np.where(sales_count > 0, revenue / sales_count, 0.0)
+    
+    return {
+        'periods': [str(period) for period in periods],
+        'periodEnds': [str(period) for period in period_after(periods, granularity)],
+        'revenue': np.round(revenue, 2).tolist(),
+        'salesCount': sales_count.tolist(),
+        'averageTicket': np.round(average_ticket, 2).tolist(),
+        'pendingSalesValue': np.round(pending_value, 2).tolist(),
+        'quotesCount': quotes_count.tolist(),
+        'quotesValue': np.round(quotes_value, 2).tolist(),
+        'approvedQuotesValue': np.round(approved_value, 2).tolist(),
+        'growth': nullable(growth_rates(revenue)),
+        'movingAverage': nullable(moving_average(revenue, window)),
+        'totals': {
+            'revenue': round(float(revenue.sum()), 2),
+            'salesCount': int(sales_count.sum()),
+            'quotesCount': int(quotes_count.sum()),
+            'quotesValue': round(float(quotes_value.sum()), 2),
+        },
+    }
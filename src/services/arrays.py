@@ -0,0 +1,79 @@
+from datetime import timezone
+import numpy as np
+
+# Linhas lidas do cursor por vez: a memória cresce com as colunas NumPy, não com objetos ORM
+STREAM_CHUNK_SIZE = 50_000
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+MONTH_STEPS = {'month': 1, 'quarter': 3, 'year': 12}
+DAY_STEPS = {'day': 1, 'week': 7}
+
+def stream_columns(session, query, kinds, chunk_size=STREAM_CHUNK_SIZE):
+    """Executa a consulta em blocos e devolve (um array NumPy por coluna, rótulos das categorias)"""
+    # kinds: 'int', 'float', 'datetime' ou 'category' por coluna. Categorias viram códigos
+    # inteiros e labels[i] lista os valores na ordem dos códigos
+    labels = {i: {} for i, kind in enumerate(kinds) if kind == 'category'}
+    chunks = []
+    # Execução Core (sem a camada de carregamento do ORM); yield_per usa cursor de servidor no PostgreSQL
+    result = session.connection().execute(query.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        chunk = []
+        for i, (kind, values) in enumerate(zip(kinds, zip(*partition))):
+            if kind == 'category':
+                # Só os valores distintos do bloco passam pelo dicionário, não cada linha
+                distinct, inverse = np.unique(np.array(values, dtype=object), return_inverse=True)
+                codes = np.array([labels[i].setdefault(value, len(labels[i])) for value in distinct], dtype=np.int64)
+                chunk.append(codes[inverse])
+            else:
+                chunk.append(np.array(values, dtype=column_dtype(kind)))
+        chunks.append(chunk)
+    
+    if chunks:
+        arrays = [np.concatenate(column) for column in zip(*chunks)]
+    else:
+        arrays = [np.empty(0, dtype=column_dtype(kind)) for kind in kinds]
+    return arrays, {i: list(index) for i, index in labels.items()}
+
+def column_dtype(kind):
+    return {'int': np.int64, 'float': np.float64, 'datetime': 'datetime64[us]', 'category': np.int64}[kind]
+
+def to_datetime64(moment, unit='us'):
+    """np.datetime64 de um datetime; com fuso (ex.: ...Z), convertido antes para UTC sem fuso"""
+    # O NumPy descarta o fuso com um aviso; as datas gravadas já são UTC sem fuso
+    if getattr(moment, 'tzinfo', None) is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(moment, unit)
+
+def period_floor(dates, granularity):
+    """Início do período de cada data, como datetime64[D] (semanas começam na segunda-feira)"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'Granularidade inválida: {granularity}')
+    if granularity in DAY_STEPS:
+        days = np.asarray(dates).astype('datetime64[D]')
+        if granularity == 'week':
+            # 1970-01-01 (dia 0) foi uma quinta-feira
+            days = days - (days.astype(np.int64) + 3) % 7
+        return days
+    months = np.asarray(dates).astype('datetime64[M]')
+    step = MONTH_STEPS[granularity]
+    if step > 1:
+        month_numbers = months.astype(np.int64)
+        months = (month_numbers - month_numbers % step).astype('datetime64[M]')
+    return months.astype('datetime64[D]')
+
+def period_after(period_starts, granularity):
+    """Início do período seguinte (fim exclusivo)"""
+    if granularity in DAY_STEPS:
+        return np.asarray(period_starts) + np.timedelta64(DAY_STEPS[granularity], 'D')
+    return (np.asarray(period_starts).astype('datetime64[M]') + MONTH_STEPS[granularity]).astype('datetime64[D]')
+
+def period_range(start, end, granularity):
+    """Inícios de todos os períodos que cobrem [start, end), inclusive os sem dados"""
+    end = to_datetime64(end)
+    first = period_floor(np.array([to_datetime64(start)]), granularity)[0]
+    if granularity in DAY_STEPS:
+        starts = np.arange(first, end.astype('datetime64[D]') + 1, DAY_STEPS[granularity])
+    else:
+        months = np.arange(first.astype('datetime64[M]'), end.astype('datetime64[M]') + 1, MONTH_STEPS[granularity])
+        starts = months.astype('datetime64[D]')
+    return starts[starts < end]
@@ -0,0 +1,132 @@
+from datetime import datetime
+import numpy as np
+from sqlalchemy import type_coerce
+from src.models.user import db
+from src.models.company import Company
+from src.models.sale import Sale
+from src.models.commission import CommissionSnapshot
+from src.services.arrays import period_after, period_floor, period_range, stream_columns
+
+GRANULARITIES = ('month', 'quarter', 'year')
+
+class SaleColumns:
+    """Colunas das vendas em arrays NumPy; representantes codificados como inteiros"""
+    __slots__ = ('representatives', 'rep_codes', 'company_ids', 'values', 'dates')
+    
+    def __init__(self, representatives, rep_codes, company_ids, values, dates):
+        self.representatives = representatives  # código -> nome
+        self.rep_codes = rep_codes
+        self.company_ids = company_ids
+        self.values = values
+        self.dates = dates
+    
+    def __len__(self):
+        return len(self.values)
+
+def load_sale_columns(start, end, status='Concluída'):
+    """Lê representante, empresa, valor e data das vendas vinculadas a empresas, em blocos do cursor"""
+    # type_coerce: o SQLite devolve a data como texto ISO, que o NumPy converte sem criar
+    # um datetime por linha (drivers que já devolvem datetime continuam funcionando)
+    query = (
+        db.select(Sale.representative, Sale.company_id, Sale.value, type_coerce(Sale.date, db.String))
+        .where(Sale.company_id.isnot(None), Sale.date >= start, Sale.date < end)
+    )
+    if status:
+        query = query.where(Sale.status == status)
+    
+    (rep_codes, company_ids, values, dates), labels = stream_columns(
+        db.session, query, ('category', 'int', 'float', 'datetime')
+    )
+    return SaleColumns(labels[0], rep_codes, company_ids, values, dates)
+
+def align_range(start, end, granularity):
+    """Amplia [start, end) para períodos inteiros"""
+    periods = period_range(start, end, granularity)
+    first, last = periods[0], period_after(periods[-1:], granularity)[0]
+    return first.astype('datetime64[us]').astype(datetime), last.astype('datetime64[us]').astype(datetime)
+
+def company_rates(company_ids):
+    """Taxa de comissão (fração) de cada empresa, na ordem de company_ids"""
+    # commission_rate é percentual; a tabela de empresas é pequena perto da de vendas
+    rates = dict(db.session.execute(db.select(Company.id, Company.commission_rate)).all())
+    return np.array([(rates.get(company_id) or 0.0) / 100 for company_id in company_ids.tolist()])
+
+def compute_commissions(start, end, granularity='month', status='Concluída'):
+    """Vendas, valor e comissão agrupados por representante, empresa e período"""
+    columns = load_sale_columns(start, end, status)
+    if not len(columns):
+        return {'rows': [], 'byRepresentative': [], 'byCompany': [],
+                'totals': {'salesCount': 0, 'salesValue': 0.0, 'commissionValue': 0.0}}
+    
+    # Empresas e períodos codificados como 0..n-1; a comissão de cada venda é valor × taxa
+    companies, company_codes = np.unique(columns.company_ids, return_inverse=True)
+    commissions = columns.values * company_rates(companies)[company_codes]
+    periods, period_codes = np.unique(period_floor(columns.dates, granularity), return_inverse=True)
+    
+    # Uma chave por (representante, empresa, período) e somas agrupadas com bincount
+    keys = (columns.rep_codes * len(companies) + company_codes) * len(periods) + period_codes
+    groups, group_codes = np.unique(keys, return_inverse=True)
+    counts = np.bincount(group_codes)
+    value_sums = np.bincount(group_codes, weights=columns.values)
+    commission_sums = np.bincount(group_codes, weights=commissions)
+    
+    rep_of_group, rest = np.divmod(groups, len(companies) * len(periods))
+    company_of_group, period_of_group = np.divmod(rest, len(periods))
+    period_ends = period_after(periods, granularity)
+    rows = [{
+        'representative': columns.representatives[rep],
+        'companyId': int(companies[company]),
+        'periodStart': str(periods[period]),
+        'periodEnd': str(period_ends[period]),
+        'salesCount': int(count),
+        'salesValue': round(float(value), 2),
+        'commissionValue': round(float(commission), 2),
+    } for rep, company, period, count, value, commission in zip(
+        rep_of_group.tolist(), company_of_group.tolist(), period_of_group.tolist(),
+        counts.tolist(), value_sums.tolist(), commission_sums.tolist()
+    )]
+    
+    def totals_by(codes, labels, label_key):
+        sales = np.bincount(codes, minlength=len(labels))
+        values = np.bincount(codes, weights=columns.values, minlength=len(labels))
+        commission = np.bincount(codes, weights=commissions, minlength=len(labels))
+        return [{label_key: label, 'salesCount': int(sales[i]), 'salesValue': round(float(values[i]), 2),
+                 'commissionValue': round(float(commission[i]), 2)} for i, label in enumerate(labels)]
+    
+    return {
+        'rows': rows,
+        'byRepresentative': totals_by(columns.rep_codes, columns.representatives, 'representative'),
+        'byCompany': totals_by(company_codes, companies.tolist(), 'companyId'),
+        'totals': {
+            'salesCount': len(columns),
+            'salesValue': round(float(columns.values.sum()), 2),
+            'commissionValue': round(float(commissions.sum()), 2),
+        },
+    }
+
+def snapshot_commissions(start, end, granularity='month', status='Concluída'):
+    """Grava as comissões dos períodos inteiros que cobrem [start, end), substituindo os existentes"""
+    start, end = align_range(start, end, granularity)
+    result = compute_commissions(start, end, granularity, status)
+    
+    db.session.execute(db.delete(CommissionSnapshot).where(
+        CommissionSnapshot.granularity == granularity,
+        CommissionSnapshot.period_start >= start,
+        CommissionSnapshot.period_start < end,
+    ))
+    now = datetime.utcnow()
+    rows = [{
+        'granularity': granularity,
+        'period_start': datetime.fromisoformat(row['periodStart']),
+        'period_end': datetime.fromisoformat(row['periodEnd']),
+        'representative': row['representative'],
+        'company_id': row['companyId'],
+        'sales_count': row['salesCount'],
+        'sales_value': row['salesValue'],
+        'commission_value': row['commissionValue'],
+        'created_at': now,
+    } for row in result['rows']]
+    if rows:
+        db.session.execute(db.insert(CommissionSnapshot), rows)
+    db.session.commit()
+    return start, end, len(rows)
@@ -0,0 +1,240 @@
+from datetime import datetime
+import numpy as np
+from flask import current_app
+from sqlalchemy import type_coerce
+from sqlalchemy.exc import IntegrityError
+from src.cache import invalidate_after_commit
+from src.models.user import db
+from src.models.sale import Sale
+from src.models.forecast import ForecastState
+from src.services.arrays import stream_columns
+
+OVERALL_KEY = '*'
+SEASON_LENGTH = 12
+# Grade de parâmetros avaliada de uma vez para todas as séries (Holt-Winters aditivo)
+ALPHAS = np.array([0.1, 0.3, 0.5, 0.7, 0.9])
+BETAS = np.array([0.01, 0.1, 0.2, 0.3])
+GAMMAS = np.array([0.05, 0.1, 0.3, 0.5])
+
+def month_number(moment):
+    """Meses desde 1970-01 (mesma escala de datetime64[M])"""
+    return (moment.year - 1970) * 12 + moment.month - 1
+
+def month_start(number):
+    return datetime(1970 + number // 12, number % 12 + 1, 1)
+
+def completed_sales_query(*columns, start, end):
+    return db.select(*columns).where(Sale.status == 'Concluída', Sale.date >= start, Sale.date < end)
+
+def history_signature(start, end):
+    """Quantidade e soma das vendas concluídas em [start, end): muda com vendas retroativas"""
+    count, total = db.session.execute(
+        completed_sales_query(db.func.count(Sale.id), db.func.coalesce(db.func.sum(Sale.value), 0.0), start=start, end=end)
+    ).one()
+    return int(count), round(float(total), 2)
+
+def monthly_revenue(first_month, last_month):
+    """Receita mensal das vendas concluídas por representante; devolve (nomes, matriz representantes × meses)"""
+    size = last_month - first_month + 1
+    query = completed_sales_query(
+        type_coerce(Sale.date, db.String), Sale.value, Sale.representative,
+        start=month_start(first_month), end=month_start(last_month + 1)
+    )
+    (dates, values, rep_codes), labels = stream_columns(db.session, query, ('datetime', 'float', 'category'))
+    names = labels[2]
+    months = dates.astype('datetime64[M]').astype(np.int64) - first_month
+    matrix = np.bincount(rep_codes * size + months, weights=values, minlength=len(names) * size)
+    return names, matrix.reshape(len(names), size)
+
+def smooth(y, months, alpha, beta, gamma, level, trend, season):
+    """Recursão de Holt-Winters aditivo sobre as colunas de y; devolve (nível, tendência, sazonalidade, SSE)"""
+    # y: séries × meses; alpha/beta/gamma, nível e tendência: séries × combinações de parâmetros;
+    # sazonalidade: séries × combinações × 12, indexada pelo mês do ano. O laço é só no tempo.
+    season = season.copy()
+    sse = np.zeros(level.shape)
+    for t in range(y.shape[1]):
+        index = months[t] % SEASON_LENGTH
+        seasonal = season[..., index]
+        observed = y[:, t, None]
+        error = observed - (level + trend + seasonal)
+        sse += error ** 2
+        new_level = alpha * (observed - seasonal) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[..., index] = gamma * (observed - new_level) + (1 - gamma) * seasonal
+        level = new_level
+    return level, trend, season, sse
+
+def fit_series(y, months):
+    """Escolhe, por série, os parâmetros da grade com menor erro de um passo à frente"""
+    count, size = y.shape
+    season = np.zeros((count, 1, SEASON_LENGTH))
+    if size >= 2 * SEASON_LENGTH:
+        model = 'holt_winters'
+        alpha, beta, gamma = (grid.ravel()[None, :] for grid in np.meshgrid(ALPHAS, BETAS, GAMMAS, indexing='ij'))
+        first_year = y[:, :SEASON_LENGTH].mean(axis=1, keepdims=True)
+        second_year = y[:, SEASON_LENGTH:2 * SEASON_LENGTH].mean(axis=1, keepdims=True)
+        level, trend = first_year, (second_year - first_year) / SEASON_LENGTH
+        season[:, 0, months[:SEASON_LENGTH] % SEASON_LENGTH] = y[:, :SEASON_LENGTH] - first_year
+    elif size >= 3:
+        # Menos de dois anos: tendência sem sazonalidade
+        model = 'holt'
+        alpha, beta = (grid.ravel()[None, :] for grid in np.meshgrid(ALPHAS, BETAS, indexing='ij'))
+        gamma = np.zeros_like(alpha)
+        level, trend = y[:, :1], y[:, 1:2] - y[:, :1]
+    else:
+        model = 'naive'
+        alpha, beta, gamma = np.full((1, 1), 0.5), np.zeros((1, 1)), np.zeros((1, 1))
+        level, trend = y.mean(axis=1, keepdims=True), np.zeros((count, 1))
+        months, y = months[:0], y[:, :0]
+    
+    combinations = alpha.shape[1]
+    level, trend, season, sse = smooth(
+        y, months, alpha, beta, gamma,
+        np.repeat(level, combinations, axis=1), np.repeat(trend, combinations, axis=1),
+        np.repeat(season, combinations, axis=1)
+    )
+    best = sse.argmin(axis=1)
+    rows = np.arange(count)
+    return {
+        'model': model,
+        'alpha': alpha[0, best], 'beta': beta[0, best], 'gamma': gamma[0, best],
+        'level': level[rows, best], 'trend': trend[rows, best], 'season': season[rows, best],
+        'sse': sse[rows, best],
+    }
+
+def fit_all(through_month):
+    """Ajuste completo (busca dos parâmetros) com o histórico até through_month, substituindo os estados"""
+    history_months = current_app.config['FORECAST_HISTORY_MONTHS']
+    first_month = through_month - history_months + 1
+    names, matrix = monthly_revenue(first_month, through_month)
+    overall = matrix.sum(axis=0)
+    
+    # Começa no primeiro mês com vendas: zeros antes do início dos dados distorcem a tendência
+    nonzero = np.flatnonzero(overall)
+    offset = int(nonzero[0]) if len(nonzero) else len(overall) - 1
+    first_month += offset
+    y = np.vstack([overall[None, offset:], matrix[:, offset:]])
+    months = np.arange(first_month, through_month + 1)
+    fitted = fit_series(y, months)
+    
+    history_start = month_start(first_month)
+    fitted_through = month_start(through_month)
+    history_count, history_value = history_signature(history_start, month_start(through_month + 1))
+    now = datetime.utcnow()
+    rows = [{
+        'series_key': key,
+        'model': fitted['model'],
+        'alpha': float(fitted['alpha'][i]),
+        'beta': float(fitted['beta'][i]),
+        'gamma': float(fitted['gamma'][i]),
+        'level': float(fitted['level'][i]),
+        'trend': float(fitted['trend'][i]),
+        'season': fitted['season'][i].round(4).tolist(),
+        'sse': float(fitted['sse'][i]),
+        'observations': y.shape[1],
+        'history_start': history_start,
+        'fitted_through': fitted_through,
+        'refitted_through': fitted_through,
+        'history_count': history_count,
+        'history_value': history_value,
+        'updated_at': now,
+    } for i, key in enumerate([OVERALL_KEY] + names)]
+    
+    db.session.execute(db.delete(ForecastState))
+    db.session.execute(db.insert(ForecastState), rows)
+
+def update_incremental(states, through_month):
+    """Incorpora só os meses novos com os parâmetros já ajustados; False se surgiu uma série nova"""
+    fitted_month = month_number(states[0].fitted_through)
+    names, matrix = monthly_revenue(fitted_month + 1, through_month)
+    positions = {state.series_key: i for i, state in enumerate(states)}
+    if any(name not in positions for name in names):
+        return False
+    
+    y = np.zeros((len(states), matrix.shape[1]))
+    y[0] = matrix.sum(axis=0)
+    for name, row in zip(names, matrix):
+        y[positions[name]] = row
+    
+    def column(attribute):
+        return np.array([[getattr(state, attribute)] for state in states], dtype=float)
+    
+    season = np.array([state.season or [0.0] * SEASON_LENGTH for state in states], dtype=float)[:, None, :]
+    level, trend, season, sse = smooth(
+        y, np.arange(fitted_month + 1, through_month + 1),
+        column('alpha'), column('beta'), column('gamma'), column('level'), column('trend'), season
+    )
+    
+    history_count, history_value = history_signature(states[0].history_start, month_start(through_month + 1))
+    for i, state in enumerate(states):
+        state.level = float(level[i, 0])
+        state.trend = float(trend[i, 0])
+        state.season = season[i, 0].round(4).tolist()
+        state.sse = float((state.sse or 0.0) + sse[i, 0])
+        state.observations += y.shape[1]
+        state.fitted_through = month_start(through_month)
+        state.history_count = history_count
+        state.history_value = history_value
+    return True
+
+def refresh_forecasts(now=None, full=False):
+    """Atualiza os estados até o último mês completo; devolve 'current', 'incremental' ou 'full'"""
+    through_month = month_number(now or datetime.utcnow()) - 1
+    states = ForecastState.query.order_by(ForecastState.id).all()
+    mode = 'full'
+    if states and not full:
+        state = states[0]
+        fitted_month = month_number(state.fitted_through)
+        # Vendas retroativas (ou alteradas) no histórico já ajustado exigem um ajuste completo
+        if history_signature(state.history_start, month_start(fitted_month + 1)) == (state.history_count, state.history_value):
+            if fitted_month >= through_month:
+                return 'current'
+            refit_due = through_month - month_number(state.refitted_through) >= current_app.config['FORECAST_REFIT_MONTHS']
+            if not refit_due and update_incremental(states, through_month):
+                mode = 'incremental'
+    
+    if mode == 'full':
+        fit_all(through_month)
+    invalidate_after_commit(db.session, 'analytics:forecast')
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Outro processo gravou os estados ao mesmo tempo: os dele valem
+        db.session.rollback()
+    return mode
+
+def project(state, horizon):
+    """Previsão dos próximos `horizon` meses a partir do estado (nunca negativa)"""
+    steps = np.arange(1, horizon + 1)
+    months = month_number(state.fitted_through) + steps
+    season = np.array(state.season or [0.0] * SEASON_LENGTH)
+    return np.maximum(state.level + steps * state.trend + season[months % SEASON_LENGTH], 0.0)
+
+def get_forecasts(horizon=3, representative=None):
+    """Previsões mensais geral e por representante a partir dos estados gravados (somente leitura)"""
+    # Os estados são atualizados pelo agendador ou por flask refresh-forecasts, nunca na leitura:
+    # a consulta pode ir para uma réplica e não deve escrever nem ajustar modelos
+    query = ForecastState.query.order_by(ForecastState.id)
+    if representative:
+        query = query.filter(ForecastState.series_key.in_([OVERALL_KEY, representative]))
+    states = query.all()
+    if not states:
+        return {'fittedThrough': None, 'periods': [], 'overall': None, 'representatives': []}
+    
+    fitted_month = month_number(states[0].fitted_through)
+    periods = [month_start(fitted_month + step).date().isoformat() for step in range(1, horizon + 1)]
+    series = []
+    for state in states:
+        values = project(state, horizon)
+        series.append({
+            'representative': None if state.series_key == OVERALL_KEY else state.series_key,
+            'model': state.model,
+            'forecast': values.round(2).tolist(),
+            'total': round(float(values.sum()), 2),
+        })
+    return {
+        'fittedThrough': states[0].fitted_through.date().isoformat(),
+        'periods': periods,
+        'overall': series[0],
+        'representatives': series[1:],
+    }
@@ -0,0 +1,107 @@
+import numpy as np
+from sqlalchemy import and_, type_coerce
+from src.models.user import db
+from src.models.customer import Customer
+from src.models.lead import Lead
+from src.models.quote import Quote
+from src.models.sale import Sale
+from src.services.arrays import stream_columns
+
+NO_SOURCE = 'Não informado'
+NO_REPRESENTATIVE = 'Sem responsável'
+ONE_DAY = np.timedelta64(1, 'D')
+
+def funnel_query(start, end):
+    """Uma linha por lead criado em [start, end) com o cliente, a primeira cotação e a primeira venda"""
+    # lead -> cliente por lower(email) (ix_customers_email_lower) -> cotações do cliente criadas
+    # depois do lead (ix_quotes_client_id) -> vendas convertidas dessas cotações (ix_sales_quote_id)
+    return (
+        db.select(
+            db.func.coalesce(Lead.source, NO_SOURCE),
+            db.func.coalesce(Lead.assigned_to, NO_REPRESENTATIVE),
+            Lead.status,
+            type_coerce(Lead.created_at, db.String),
+            db.func.count(db.distinct(Customer.id)),
+            type_coerce(db.func.min(Quote.created_at), db.String),
+            type_coerce(db.func.min(Sale.date), db.String),
+        )
+        .select_from(Lead)
+        .outerjoin(Customer, db.func.lower(Customer.email) == db.func.lower(Lead.email))
+        .outerjoin(Quote, and_(Quote.client_id == Customer.id, Quote.created_at >= Lead.created_at))
+        .outerjoin(Sale, Sale.quote_id == Quote.id)
+        .where(Lead.created_at >= start, Lead.created_at < end)
+        .group_by(Lead.id, Lead.source, Lead.assigned_to, Lead.status, Lead.created_at)
+    )
+
+def grouped_median(codes, values, groups):
+    """Mediana de values por código de grupo (NaN nos grupos vazios), sem laço por grupo"""
+    medians = np.full(groups, np.nan)
+    if not len(values):
+        return medians
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    low = starts[present] + (counts[present] - 1) // 2
+    high = starts[present] + counts[present] // 2
+    medians[present] = (sorted_values[low] + sorted_values[high]) / 2
+    return medians
+
+def percentage(part, whole):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(whole > 0, part / whole * 100, 0.0)
+
+def funnel_by(codes, labels, label_key, columns):
+    """Contagens por etapa, taxas de conversão e medianas de tempo por grupo"""
+    groups = len(labels)
+    leads = np.bincount(codes, minlength=groups)
+    customers = np.bincount(codes[columns['has_customer']], minlength=groups)
+    quoted = np.bincount(codes[columns['quoted']], minlength=groups)
+    won = np.bincount(codes[columns['won']], minlength=groups)
+    lost = np.bincount(codes[columns['lost']], minlength=groups)
+    days_to_quote = grouped_median(codes[columns['quoted']], columns['days_to_quote'], groups)
+    days_to_sale = grouped_median(codes[columns['won']], columns['days_quote_to_sale'], groups)
+    lead_to_quote = percentage(quoted, leads)
+    quote_to_sale = percentage(won, quoted)
+    lead_to_sale = percentage(won, leads)
+    
+    return [{
+        label_key: label,
+        'leads': int(leads[i]),
+        'customers': int(customers[i]),
+        'quoted': int(quoted[i]),
+        'won': int(won[i]),
+        'lost': int(lost[i]),
+        'leadToQuoteRate': round(float(lead_to_quote[i]), 2),
+        'quoteToSaleRate': round(float(quote_to_sale[i]), 2),
+        'leadToSaleRate': round(float(lead_to_sale[i]), 2),
+        'medianDaysToQuote': None if np.isnan(days_to_quote[i]) else round(float(days_to_quote[i]), 1),
+        'medianDaysQuoteToSale': None if np.isnan(days_to_sale[i]) else round(float(days_to_sale[i]), 1),
+    } for i, label in enumerate(labels)]
+
+def conversion_funnel(start, end):
+    """Funil lead -> cliente -> cotação -> venda dos leads criados em [start, end), geral, por origem e por representante"""
+    (sources, representatives, statuses, created, customers, first_quote, first_sale), labels = stream_columns(
+        db.session, funnel_query(start, end),
+        ('category', 'category', 'category', 'datetime', 'int', 'datetime', 'datetime')
+    )
+    quoted = ~np.isnat(first_quote)
+    won = quoted & ~np.isnat(first_sale)
+    status_labels = labels[2]
+    columns = {
+        'has_customer': customers > 0,
+        'quoted': quoted,
+        'won': won,
+        'lost': statuses == status_labels.index('Perdido') if 'Perdido' in status_labels else np.zeros(len(statuses), dtype=bool),
+        'days_to_quote': (first_quote[quoted] - created[quoted]) / ONE_DAY,
+        'days_quote_to_sale': (first_sale[won] - first_quote[won]) / ONE_DAY,
+    }
+    
+    overall = funnel_by(np.zeros(len(sources), dtype=np.int64), ['*'], 'group', columns)[0]
+    del overall['group']
+    return {
+        'overall': overall,
+        'bySource': funnel_by(sources, labels[0], 'source', columns),
+        'byRepresentative': funnel_by(representatives, labels[1], 'representative', columns),
+    }
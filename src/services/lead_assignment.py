@@ -0,0 +1,270 @@
+import heapq
+from flask import current_app
+from sqlalchemy import bindparam, event, inspect
+from sqlalchemy.orm import Session
+from src.cache import invalidate_after_commit
+from src.config import LEAD_ASSIGNMENT_STRATEGIES
+from src.models.user import User, db
+from src.models.lead import Lead
+from src.models.lead_counter import RepLeadCounter
+from src.services.leaderboard import committed_values
+
+# Os contadores mudam na transação de cada escrita de lead via ORM (eventos de flush). A atribuição
+# automática soma o lead ao contador no momento da escolha (compare-and-set), para que workers
+# concorrentes vejam a carga nova; o flush desse lead desconta a soma já feita.
+STRATEGIES = LEAD_ASSIGNMENT_STRATEGIES
+CLOSED_STATUS = 'Perdido'
+LEAD_KEYS = ('assigned_to', 'status')
+# Alterações de usuário que mudam quem recebe leads (renomear, trocar o perfil, desativar)
+ROSTER_KEYS = ('name', 'role', 'is_active')
+MAX_CLAIM_ATTEMPTS = 5
+
+def open_representative(values):
+    """Representante cujo contador inclui o lead (None se sem responsável ou perdido)"""
+    if not values['assigned_to'] or values['status'] == CLOSED_STATUS:
+        return None
+    return values['assigned_to']
+
+def strategy_offset(strategy):
+    # Menor carga: leads em aberto por peso. Round-robin ponderado: próxima vez de cada um,
+    # (atribuídos + 1) / peso, que alterna os representantes na proporção dos pesos.
+    return 1 if strategy == 'weighted_round_robin' else 0
+
+def candidates_query(strategy):
+    load = RepLeadCounter.assigned_total if strategy == 'weighted_round_robin' else RepLeadCounter.open_leads
+    return db.select(
+        RepLeadCounter.id, RepLeadCounter.representative, RepLeadCounter.open_leads,
+        RepLeadCounter.assigned_total, RepLeadCounter.weight
+    ).where(RepLeadCounter.active, RepLeadCounter.weight > 0).order_by(
+        (load + strategy_offset(strategy)) / RepLeadCounter.weight, RepLeadCounter.representative
+    )
+
+def claim_representative(session, strategy=None):
+    """Escolhe um representante e soma um lead ao contador dele (sem commit); None se não houver candidatos"""
+    strategy = strategy or current_app.config['LEAD_ASSIGNMENT_STRATEGY']
+    synced = False
+    attempt = 0
+    while attempt < MAX_CLAIM_ATTEMPTS:
+        candidate = session.execute(candidates_query(strategy).limit(1)).first()
+        if candidate is None:
+            # Tabela ainda vazia (primeira atribuição): cria os contadores e tenta de novo
+            if synced or session.scalar(db.select(RepLeadCounter.id).limit(1)) is not None:
+                return None
+            sync_rep_counters(session, commit=False)
+            synced = True
+            continue
+        
+        counter_id, representative, open_leads, assigned_total, _ = candidate
+        conditions = [RepLeadCounter.id == counter_id]
+        if attempt < MAX_CLAIM_ATTEMPTS - 1:
+            # Compare-and-set: falha se outro worker atribuiu a este representante depois da leitura
+            conditions += [RepLeadCounter.open_leads == open_leads, RepLeadCounter.assigned_total == assigned_total]
+        updated = session.execute(
+            db.update(RepLeadCounter).where(*conditions).values(
+                open_leads=RepLeadCounter.open_leads + 1,
+                assigned_total=RepLeadCounter.assigned_total + 1
+            ).execution_options(synchronize_session=False)
+        )
+        if updated.rowcount == 1:
+            return representative
+        attempt += 1
+    return None
+
+def assign_lead(session, lead, strategy=None):
+    """Atribui o lead (ainda sem responsável) ao representante escolhido pela estratégia"""
+    representative = claim_representative(session, strategy)
+    if representative is not None:
+        lead.assigned_to = representative
+        session.info.setdefault('lead_claims', {})[lead] = representative
+    return representative
+
+def locked_candidates_query(strategy):
+    # Contadores bloqueados até o commit, na ordem por representante das atualizações em lote
+    # (apply_counter_deltas): um plano concorrente espera e lê a carga já com estes leads.
+    # O SQLite ignora FOR UPDATE: lá o plano que leu antes de outro escrever falha ao gravar
+    # (database is locked) e o pedido é repetido (src/sqlite_profile.py).
+    return candidates_query(strategy).order_by(None).order_by(RepLeadCounter.representative).with_for_update()
+
+def plan_assignments(session, count, strategy=None):
+    """Distribui count leads pela estratégia a partir de uma única leitura (bloqueante) dos contadores"""
+    strategy = strategy or current_app.config['LEAD_ASSIGNMENT_STRATEGY']
+    offset = strategy_offset(strategy)
+    rows = session.execute(locked_candidates_query(strategy)).all()
+    if not rows and session.scalar(db.select(RepLeadCounter.id).limit(1)) is None:
+        sync_rep_counters(session, commit=False)
+        rows = session.execute(locked_candidates_query(strategy)).all()
+    if not rows:
+        return []
+    
+    heap = []
+    for _, representative, open_leads, assigned_total, weight in rows:
+        load = assigned_total if offset else open_leads
+        heap.append(((load + offset) / weight, representative, load, weight))
+    heapq.heapify(heap)
+    
+    plan = []
+    for _ in range(count):
+        _, representative, load, weight = heapq.heappop(heap)
+        plan.append(representative)
+        heapq.heappush(heap, ((load + 1 + offset) / weight, representative, load + 1, weight))
+    return plan
+
+def apply_counter_deltas(connection, deltas):
+    """Soma {representante: (leads em aberto, atribuídos)} aos contadores num único executemany"""
+    rows = [
+        {'rep': representative, 'open_delta': open_delta, 'assigned_delta': assigned_delta}
+        for representative, (open_delta, assigned_delta) in sorted(deltas.items())
+        if open_delta or assigned_delta
+    ]
+    if not rows:
+        return
+    table = RepLeadCounter.__table__
+    connection.execute(
+        db.update(table).where(table.c.representative == bindparam('rep')).values(
+            open_leads=table.c.open_leads + bindparam('open_delta'),
+            assigned_total=table.c.assigned_total + bindparam('assigned_delta')
+        ),
+        rows
+    )
+
+def create_leads(rows, assign=True, strategy=None):
+    """Insere os leads (dicionários de colunas) num INSERT em lote, atribuindo os sem responsável (sem commit)"""
+    pending = [row for row in rows if not row['assigned_to'] and row['status'] != CLOSED_STATUS] if assign else []
+    plan = plan_assignments(db.session, len(pending), strategy) if pending else []
+    for row, representative in zip(pending, plan):
+        row['assigned_to'] = representative
+    
+    leads = list(db.session.scalars(db.insert(Lead).returning(Lead), rows))
+    
+    # O INSERT em lote não passa pelo flush: um incremento agregado por representante
+    deltas = {}
+    for row in rows:
+        representative = open_representative(row)
+        if representative:
+            open_delta, assigned_delta = deltas.get(representative, (0, 0))
+            deltas[representative] = (open_delta + 1, assigned_delta)
+    for representative in plan:
+        open_delta, assigned_delta = deltas[representative]
+        deltas[representative] = (open_delta, assigned_delta + 1)
+    apply_counter_deltas(db.session.connection(), deltas)
+    invalidate_after_commit(db.session, 'analytics:')
+    return leads
+
+def insert_missing_counters(session, names):
+    """Cria os contadores que faltam; ignora os criados ao mesmo tempo por outro worker"""
+    table = RepLeadCounter.__table__
+    dialect = session.connection().dialect.name
+    rows = [{'representative': name, 'open_leads': 0, 'assigned_total': 0, 'weight': 1.0, 'active': True} for name in names]
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        session.execute(insert(table).on_conflict_do_nothing(index_elements=['representative']), rows)
+        return
+    existing = set(session.scalars(db.select(RepLeadCounter.representative)))
+    rows = [row for row in rows if row['representative'] not in existing]
+    if rows:
+        session.execute(db.insert(table), rows)
+
+def sync_rep_counters(session=None, commit=True):
+    """Cria os contadores dos representantes novos e recalcula os leads em aberto de cada um"""
+    # Os contadores são por nome: ao renomear um representante o contador do nome antigo fica
+    # inativo e o do novo é criado; os leads continuam com o nome antigo em assigned_to
+    session = session or db.session
+    roster = dict(session.execute(db.select(User.name, User.is_active).where(User.role == 'representante')).all())
+    if roster:
+        insert_missing_counters(session, sorted(roster))
+    active_names = [name for name, is_active in roster.items() if is_active]
+    
+    # Um único UPDATE com a contagem de cada um (ix_leads_assigned_to): sem janela entre ler e gravar
+    open_count = db.select(db.func.count(Lead.id)).where(
+        Lead.assigned_to == RepLeadCounter.representative, Lead.status != CLOSED_STATUS
+    ).scalar_subquery()
+    session.execute(
+        db.update(RepLeadCounter)
+        .values(open_leads=open_count, active=RepLeadCounter.representative.in_(active_names))
+        .execution_options(synchronize_session=False)
+    )
+    count = session.scalar(db.select(db.func.count(RepLeadCounter.id)))
+    if commit:
+        session.commit()
+    return count
+
+@event.listens_for(Session, 'before_flush')
+def collect_previous_owners(session, flush_context, instances):
+    # Antes do flush: retira os leads alterados ou excluídos do contador em que estão no banco
+    deltas = session.info['lead_counter_deltas'] = {}
+    changed = session.info['lead_counter_changed'] = []
+    with session.no_autoflush:
+        for instance in session.dirty | session.deleted:
+            if not isinstance(instance, Lead) or not inspect(instance).has_identity:
+                continue
+            if instance not in session.deleted and not session.is_modified(instance):
+                continue
+            representative = open_representative(committed_values(instance, LEAD_KEYS))
+            if representative:
+                deltas[representative] = deltas.get(representative, 0) - 1
+            if instance not in session.deleted:
+                changed.append(instance)
+        changed.extend(instance for instance in session.new if isinstance(instance, Lead))
+
+@event.listens_for(Session, 'after_flush')
+def apply_owner_changes(session, flush_context):
+    deltas = session.info.pop('lead_counter_deltas', {})
+    changed = session.info.pop('lead_counter_changed', [])
+    claims = session.info.get('lead_claims', {})
+    with session.no_autoflush:
+        for instance in changed:
+            representative = open_representative({key: getattr(instance, key) for key in LEAD_KEYS})
+            if representative:
+                deltas[representative] = deltas.get(representative, 0) + 1
+            # A atribuição automática já somou este lead ao representante escolhido
+            claimed = claims.pop(instance, None)
+            if claimed:
+                deltas[claimed] = deltas.get(claimed, 0) - 1
+    apply_counter_deltas(session.connection(), {representative: (delta, 0) for representative, delta in deltas.items()})
+
+def roster_changed(session):
+    """Há usuários criados, excluídos ou com nome, perfil ou status alterados (ainda sem flush)"""
+    for instance in session.new | session.deleted | session.dirty:
+        if not isinstance(instance, User):
+            continue
+        if instance in session.dirty:
+            state = inspect(instance)
+            if not any(state.attrs[key].history.has_changes() for key in ROSTER_KEYS):
+                continue
+        return True
+    return False
+
+@event.listens_for(Session, 'after_flush')
+def detect_roster_changes(session, flush_context):
+    # No after_flush a sessão ainda tem o estado anterior ao flush
+    if roster_changed(session):
+        session.info['lead_roster_changed'] = True
+
+@event.listens_for(Session, 'before_commit')
+def sync_roster_changes(session):
+    # Sem esperar a sincronização periódica: o nome antigo deixaria de receber leads só depois dela
+    if session.info.pop('lead_roster_changed', False) or roster_changed(session):
+        sync_rep_counters(session, commit=False)
+        # O autoflush da sincronização marca de novo as alterações que ela já considerou
+        session.info.pop('lead_roster_changed', None)
+
+@event.listens_for(Session, 'after_commit')
+def discard_committed_claims(session):
+    session.info.pop('lead_claims', None)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def discard_claims(session, previous_transaction):
+    # A soma feita na escolha também foi desfeita
+    if not session.in_transaction():
+        session.info.pop('lead_claims', None)
+        session.info.pop('lead_roster_changed', None)
+
+def track_previous_owner():
+    # Carrega o valor antigo ao alterar um atributo não carregado (senão o histórico não o tem)
+    for key in LEAD_KEYS:
+        event.listen(getattr(Lead, key), 'set', lambda *args: None, active_history=True)
+
+track_previous_owner()
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta
+import numpy as np
+from flask import current_app
+from sqlalchemy import bindparam, type_coerce
+from src.models.user import db
+from src.models.appointment import Appointment
+from src.models.company import Company
+from src.models.customer import Customer
+from src.models.lead import Lead
+from src.models.quote import Quote
+from src.services.arrays import stream_columns, to_datetime64
+
+# Pontuação de 0 a 100: média ponderada de características em [0, 1] já presentes no esquema.
+# Incremental: só os leads alterados, sem pontuação, com pontuação antiga (idade e domínios
+# mudam com o tempo) ou de clientes com cotações, compromissos ou cadastro novos.
+WEIGHTS = {
+    'source': 0.20,
+    'status': 0.15,
+    'freshness': 0.20,
+    'known_domain': 0.10,
+    'customer': 0.10,
+    'quotes': 0.15,
+    'appointments': 0.10,
+}
+SOURCE_SCORES = {'Indicação': 1.0, 'Evento': 0.8, 'Website': 0.6, 'LinkedIn': 0.5, 'Google Ads': 0.4}
+DEFAULT_SOURCE_SCORE = 0.3
+STATUS_SCORES = {'Novo': 0.3, 'Contato': 0.6, 'Qualificado': 1.0}
+LOST_STATUS = 'Perdido'
+ACTIVE_QUOTE_STATUSES = ('Pendente', 'Aprovada')
+FRESHNESS_HALF_LIFE_DAYS = 30
+# E-mails pessoais não indicam uma empresa conhecida
+FREE_EMAIL_DOMAINS = frozenset({
+    'gmail.com', 'hotmail.com', 'outlook.com', 'live.com', 'yahoo.com', 'yahoo.com.br',
+    'icloud.com', 'uol.com.br', 'bol.com.br', 'terra.com.br',
+})
+ONE_DAY = np.timedelta64(1, 'D')
+
+def email_domains(emails):
+    emails = np.asarray(emails, dtype=str)
+    if not len(emails):
+        return emails
+    return np.strings.partition(emails, '@')[2]
+
+def website_domain(website):
+    host = website.strip().lower().split('://')[-1].split('/')[0]
+    return host[4:] if host.startswith('www.') else host
+
+def known_domains():
+    """Domínios (ordenados) dos sites e e-mails das empresas e dos e-mails dos clientes"""
+    domains = set()
+    for website, email, contact_email in db.session.execute(
+        db.select(Company.website, Company.email, Company.contact_email)
+    ):
+        if website:
+            domains.add(website_domain(website))
+        domains.update(address.rsplit('@', 1)[1].lower() for address in (email, contact_email) if address and '@' in address)
+    customer_emails = db.session.scalars(db.select(db.func.lower(Customer.email)).distinct()).all()
+    domains.update(np.unique(email_domains(customer_emails)).tolist())
+    domains -= FREE_EMAIL_DOMAINS
+    domains.discard('')
+    return np.array(sorted(domains), dtype=str)
+
+def customer_activity(emails):
+    """Clientes, cotações ativas e compromissos não cancelados por e-mail (minúsculo), na ordem de emails"""
+    quotes = db.select(db.func.count(Quote.id)).where(
+        Quote.client_id == Customer.id, Quote.status.in_(ACTIVE_QUOTE_STATUSES)
+    ).scalar_subquery()
+    appointments = db.select(db.func.count(Appointment.id)).where(
+        Appointment.client_id == Customer.id, Appointment.status != 'Cancelado'
+    ).scalar_subquery()
+    # lower(email) IN (...) usa ix_customers_email_lower; as contagens, ix_quotes_client_id e ix_appointments_client_id
+    rows = db.session.execute(
+        db.select(db.func.lower(Customer.email), quotes, appointments)
+        .where(db.func.lower(Customer.email).in_(emails))
+    ).all()
+    
+    size = len(emails)
+    if not rows:
+        return np.zeros(size), np.zeros(size), np.zeros(size)
+    customer_emails, quote_counts, appointment_counts = zip(*rows)
+    labels = np.array(emails, dtype=str)
+    order = np.argsort(labels)
+    positions = order[np.searchsorted(labels, np.array(customer_emails, dtype=str), sorter=order)]
+    return (
+        np.bincount(positions, minlength=size).astype(float),
+        np.bincount(positions, weights=np.array(quote_counts, dtype=float), minlength=size),
+        np.bincount(positions, weights=np.array(appointment_counts, dtype=float), minlength=size),
+    )
+
+def lookup(labels, scores, default):
+    """Valor de cada rótulo de categoria, para indexar pelos códigos"""
+    return np.array([scores.get(label, default) for label in labels], dtype=float)
+
+def score_batch(lead_ids, domains, now):
+    """Calcula e grava a pontuação dos leads informados (sem commit); devolve as pontuações"""
+    query = db.select(
+        Lead.id,
+        db.func.lower(Lead.email),
+        db.func.coalesce(Lead.source, ''),
+        Lead.status,
+        type_coerce(Lead.created_at, db.String),
+    ).where(Lead.id.in_(lead_ids))
+    (ids, email_codes, source_codes, status_codes, created), labels = stream_columns(
+        db.session, query, ('int', 'category', 'category', 'category', 'datetime')
+    )
+    if not len(ids):
+        return np.empty(0)
+    
+    emails = labels[1]
+    customers, quotes, appointments = customer_activity(emails)
+    age_days = np.maximum((to_datetime64(now) - created) / ONE_DAY, 0.0)
+    features = {
+        'source': lookup(labels[2], SOURCE_SCORES, DEFAULT_SOURCE_SCORE)[source_codes],
+        'status': lookup(labels[3], STATUS_SCORES, 0.0)[status_codes],
+        # Meia-vida de 30 dias; sem data de criação conta como antigo
+        'freshness': np.nan_to_num(0.5 ** (age_days / FRESHNESS_HALF_LIFE_DAYS)),
+        'known_domain': np.isin(email_domains(emails), domains).astype(float)[email_codes],
+        'customer': (customers > 0).astype(float)[email_codes],
+        # Saturam: a primeira cotação ou compromisso pesa mais que os seguintes
+        'quotes': (1 - np.exp(-quotes / 2))[email_codes],
+        'appointments': (1 - np.exp(-appointments / 2))[email_codes],
+    }
+    scores = 100 * sum(weight * features[name] for name, weight in WEIGHTS.items())
+    if LOST_STATUS in labels[3]:
+        scores[status_codes == labels[3].index(LOST_STATUS)] = 0.0
+    scores = scores.round(2)
+    
+    # updated_at mantém o valor: a pontuação não conta como alteração do lead
+    table = Lead.__table__
+    db.session.execute(
+        db.update(table)
+        .where(table.c.id == bindparam('lead_id'))
+        .values(score=bindparam('new_score'), scored_at=bindparam('now'), updated_at=table.c.updated_at),
+        [{'lead_id': lead_id, 'new_score': score, 'now': now} for lead_id, score in zip(ids.tolist(), scores.tolist())]
+    )
+    return scores
+
+def leads_to_score(now, full=False):
+    """Ids dos leads a (re)pontuar, em ordem"""
+    query = db.select(Lead.id).order_by(Lead.id)
+    if full:
+        return db.session.scalars(query).all()
+    
+    stale = now - timedelta(hours=current_app.config['LEAD_SCORE_REFRESH_HOURS'])
+    conditions = [Lead.scored_at.is_(None), Lead.updated_at > Lead.scored_at, Lead.scored_at < stale]
+    # Última execução: clientes com atividade depois dela mudam os leads do mesmo e-mail
+    watermark = db.session.scalar(db.select(db.func.max(Lead.scored_at)))
+    if watermark is not None:
+        touched = db.union(
+            db.select(Quote.client_id).where(Quote.updated_at > watermark),
+            db.select(Appointment.client_id).where(Appointment.updated_at > watermark),
+            db.select(Customer.id).where(Customer.created_at > watermark),
+        )
+        emails = db.select(db.func.lower(Customer.email)).where(Customer.id.in_(touched))
+        conditions.append(db.func.lower(Lead.email).in_(emails))
+    return db.session.scalars(query.where(db.or_(*conditions))).all()
+
+def score_leads(full=False, batch_size=None, now=None):
+    """Pontua os leads alterados (ou todos, com full) em lotes, um commit por lote; devolve quantos"""
+    # scored_at = início da execução: o que mudar durante ela é apanhado na próxima
+    now = now or datetime.utcnow()
+    batch_size = batch_size or current_app.config['LEAD_SCORING_BATCH_SIZE']
+    lead_ids = leads_to_score(now, full)
+    if not lead_ids:
+        return 0
+    
+    domains = known_domains()
+    for start in range(0, len(lead_ids), batch_size):
+        score_batch(lead_ids[start:start + batch_size], domains, now)
+        db.session.commit()
+    return len(lead_ids)
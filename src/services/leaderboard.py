@@ -0,0 +1,269 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect, type_coerce
+from sqlalchemy.orm import Session
+from src.models.user import db
+from src.models.appointment import Appointment
+from src.models.leaderboard import LeaderboardEntry
+from src.models.quote import Quote
+from src.models.sale import Sale
+
+# Os totais são atualizados na mesma transação de cada escrita via ORM (eventos de flush)
+# e recalculados periodicamente por reconcile_leaderboard (escritas diretas no banco, corridas).
+WINDOWS = ('day', 'week', 'month', 'year')
+COUNTERS = ('sales_count', 'sales_value', 'quotes_approved', 'appointments_completed')
+METRICS = {
+    'salesValue': 'sales_value',
+    'salesCount': 'sales_count',
+    'quotesApproved': 'quotes_approved',
+    'appointmentsCompleted': 'appointments_completed',
+}
+# Dias sempre recalculados pela reconciliação periódica: a janela do dashboard, que em janeiro
+# começa antes do ano (e da semana) atual
+RECONCILE_DAYS = 30
+
+def sale_contribution(values):
+    if values['status'] != 'Concluída':
+        return None
+    return values['date'], {'sales_count': 1, 'sales_value': values['value'] or 0.0}
+
+def quote_contribution(values):
+    if values['status'] != 'Aprovada':
+        return None
+    return values['approved_at'], {'quotes_approved': 1}
+
+def appointment_contribution(values):
+    if values['status'] != 'Concluído':
+        return None
+    return values['appointment_date'], {'appointments_completed': 1}
+
+# Modelo -> (atributos lidos, função que devolve (data, contadores) ou None)
+TRACKED = {
+    Sale: (('representative', 'status', 'date', 'value'), sale_contribution),
+    Quote: (('representative', 'status', 'approved_at'), quote_contribution),
+    Appointment: (('representative', 'status', 'appointment_date'), appointment_contribution),
+}
+
+def period_start(moment, granularity):
+    """Início do dia, da semana (segunda-feira), do mês ou do ano de moment"""
+    day = datetime(moment.year, moment.month, moment.day)
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+def period_end(start, granularity):
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    if granularity == 'month':
+        return (start + timedelta(days=32)).replace(day=1)
+    return start.replace(year=start.year + 1)
+
+def add_contribution(deltas, model, values, sign):
+    """Soma (sign=1) ou subtrai (sign=-1) a contribuição de um registo em todas as janelas"""
+    contribution = TRACKED[model][1]
+    representative = values['representative']
+    result = contribution(values)
+    if result is None or not representative or result[0] is None:
+        return
+    moment, counters = result
+    for granularity in WINDOWS:
+        totals = deltas.setdefault((granularity, period_start(moment, granularity), representative), {})
+        for counter, value in counters.items():
+            totals[counter] = totals.get(counter, 0) + sign * value
+
+def committed_values(instance, keys):
+    """Valores dos atributos como estão no banco (antes das alterações pendentes)"""
+    state = inspect(instance)
+    values = {}
+    for key in keys:
+        history = state.attrs[key].load_history()
+        values[key] = (history.deleted or history.unchanged or [None])[0]
+    return values
+
+def apply_deltas(connection, deltas):
+    """Soma os deltas às linhas de leaderboard_entries (cria as que faltam) com um upsert"""
+    now = datetime.utcnow()
+    rows = [
+        {'granularity': granularity, 'period_start': start, 'representative': representative,
+         **{counter: totals.get(counter, 0) for counter in COUNTERS}, 'updated_at': now}
+        for (granularity, start, representative), totals in sorted(deltas.items())
+        if any(totals.values())
+    ]
+    if not rows:
+        return
+    
+    table = LeaderboardEntry.__table__
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=['granularity', 'period_start', 'representative'],
+            set_={
+                **{counter: table.c[counter] + statement.excluded[counter] for counter in COUNTERS},
+                'updated_at': statement.excluded.updated_at,
+            }
+        )
+        # Linhas ordenadas pela chave: transações concorrentes bloqueiam na mesma ordem
+        connection.execute(statement, rows)
+        return
+    
+    for row in rows:
+        key = (table.c.granularity == row['granularity']) & (table.c.period_start == row['period_start']) \
+            & (table.c.representative == row['representative'])
+        updated = connection.execute(
+            db.update(table).where(key).values(
+                updated_at=now, **{counter: table.c[counter] + row[counter] for counter in COUNTERS}
+            )
+        )
+        if updated.rowcount == 0:
+            connection.execute(db.insert(table), [row])
+
+def record_changes(session, removed=(), added=()):
+    """Atualiza o ranking para escritas em lote que não passam pelo flush: listas de (modelo, valores)"""
+    deltas = {}
+    for model, values in removed:
+        add_contribution(deltas, model, values, -1)
+    for model, values in added:
+        add_contribution(deltas, model, values, 1)
+    apply_deltas(session.connection(), deltas)
+
+@event.listens_for(Session, 'before_flush')
+def collect_previous_contributions(session, flush_context, instances):
+    # Antes do flush: retira a contribuição do estado atual no banco dos registos alterados ou excluídos
+    # Reinicia a cada flush: um flush que falhou não deixa deltas para o seguinte
+    deltas = session.info['leaderboard_deltas'] = {}
+    changed = session.info['leaderboard_changed'] = []
+    with session.no_autoflush:
+        for instance in session.dirty | session.deleted:
+            model = type(instance)
+            if model not in TRACKED or not inspect(instance).has_identity:
+                continue
+            if instance not in session.deleted and not session.is_modified(instance):
+                continue
+            add_contribution(deltas, model, committed_values(instance, TRACKED[model][0]), -1)
+            if instance not in session.deleted:
+                changed.append(instance)
+        changed.extend(instance for instance in session.new if type(instance) in TRACKED)
+
+@event.listens_for(Session, 'after_flush')
+def apply_contributions(session, flush_context):
+    # Depois do flush os valores padrão (datas, updated_at) já estão nos objetos
+    deltas = session.info.pop('leaderboard_deltas', {})
+    changed = session.info.pop('leaderboard_changed', [])
+    with session.no_autoflush:
+        for instance in changed:
+            model = type(instance)
+            add_contribution(deltas, model, {key: getattr(instance, key) for key in TRACKED[model][0]}, 1)
+    apply_deltas(session.connection(), deltas)
+
+def track_previous_values():
+    # Carrega o valor antigo ao alterar um atributo não carregado (senão o histórico não o tem)
+    for model, (keys, _) in TRACKED.items():
+        for key in keys:
+            event.listen(getattr(model, key), 'set', lambda *args: None, active_history=True)
+
+track_previous_values()
+
+def top_representatives(granularity='month', metric='salesValue', limit=10, at=None):
+    """Ranking do período atual (ou do que contém `at`) lido das linhas já agregadas"""
+    start = period_start(at or datetime.utcnow(), granularity)
+    column = getattr(LeaderboardEntry, METRICS[metric])
+    # Representantes sem atividade na métrica (linhas zeradas por alterações) ficam de fora
+    entries = LeaderboardEntry.query.filter_by(granularity=granularity, period_start=start).filter(column > 0) \
+        .order_by(column.desc(), LeaderboardEntry.representative).limit(limit).all()
+    return {
+        'granularity': granularity,
+        'metric': metric,
+        'periodStart': start.isoformat(),
+        'periodEnd': period_end(start, granularity).isoformat(),
+        'entries': [{'rank': rank, **entry.to_dict()} for rank, entry in enumerate(entries, start=1)],
+    }
+
+def daily_totals_since(session, start):
+    """Vendas concluídas por representante somando os dias a partir de start (dashboard)"""
+    return session.query(
+        LeaderboardEntry.representative,
+        db.func.sum(LeaderboardEntry.sales_count),
+        db.func.sum(LeaderboardEntry.sales_value)
+    ).filter(
+        LeaderboardEntry.granularity == 'day',
+        LeaderboardEntry.period_start >= period_start(start, 'day'),
+        LeaderboardEntry.sales_count > 0
+    ).group_by(LeaderboardEntry.representative).all()
+
+def reconcile_leaderboard(since=None, now=None):
+    """Recalcula a partir das vendas, cotações e compromissos os períodos que começam em since ou depois"""
+    # NumPy só é carregado na reconciliação
+    import numpy as np
+    from src.services.arrays import period_floor, stream_columns
+    
+    moment = since or now or datetime.utcnow()
+    # Todos os períodos que contêm moment, inteiros (a semana pode começar no ano anterior)
+    starts = [period_start(moment, granularity) for granularity in WINDOWS]
+    if since is None:
+        starts.append(period_start(moment - timedelta(days=RECONCILE_DAYS), 'day'))
+    since = min(starts)
+    sources = (
+        (db.select(type_coerce(Sale.date, db.String), Sale.representative, Sale.value)
+         .where(Sale.status == 'Concluída', Sale.date >= since), 'sales_count', 'sales_value'),
+        (db.select(type_coerce(Quote.approved_at, db.String), Quote.representative, db.literal(0.0))
+         .where(Quote.status == 'Aprovada', Quote.approved_at >= since), 'quotes_approved', None),
+        (db.select(type_coerce(Appointment.appointment_date, db.String), Appointment.representative, db.literal(0.0))
+         .where(Appointment.status == 'Concluído', Appointment.appointment_date >= since), 'appointments_completed', None),
+    )
+    
+    totals = {}
+    for query, count_counter, value_counter in sources:
+        (dates, rep_codes, values), labels = stream_columns(
+            db.session, query, ('datetime', 'category', 'float')
+        )
+        names = labels[1]
+        for granularity in WINDOWS:
+            # Uma chave por (período, representante), agrupada sem laço por registo
+            periods = period_floor(dates, granularity).astype('datetime64[D]').astype(np.int64)
+            keys, inverse = np.unique(periods * max(len(names), 1) + rep_codes, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(keys))
+            sums = np.bincount(inverse, weights=values, minlength=len(keys))
+            for key, count, value in zip(keys.tolist(), counts.tolist(), sums.tolist()):
+                day, rep_code = divmod(key, max(len(names), 1))
+                row = totals.setdefault((granularity, datetime(1970, 1, 1) + timedelta(days=day), names[rep_code]), {})
+                row[count_counter] = count
+                if value_counter:
+                    row[value_counter] = round(value, 2)
+    
+    now = datetime.utcnow()
+    rows = [
+        {'granularity': granularity, 'period_start': start, 'representative': representative,
+         **{counter: counters.get(counter, 0) for counter in COUNTERS}, 'updated_at': now}
+        for (granularity, start, representative), counters in sorted(totals.items())
+        # Semanas, meses e anos que começam antes de since só têm parte dos registos: ficam como estão
+        if start >= since
+    ]
+    db.session.execute(db.delete(LeaderboardEntry).where(LeaderboardEntry.period_start >= since))
+    if rows:
+        db.session.execute(db.insert(LeaderboardEntry), rows)
+    db.session.commit()
+    return since, len(rows)
+
+def backfill_leaderboard():
+    """Reconstrói todo o histórico se o ranking estiver vazio (banco atualizado de uma versão sem ele)"""
+    if db.session.scalar(db.select(LeaderboardEntry.id).limit(1)) is not None:
+        return None
+    firsts = [
+        db.session.scalar(db.select(db.func.min(Sale.date)).where(Sale.status == 'Concluída')),
+        db.session.scalar(db.select(db.func.min(Quote.approved_at)).where(Quote.status == 'Aprovada')),
+        db.session.scalar(db.select(db.func.min(Appointment.appointment_date)).where(Appointment.status == 'Concluído')),
+    ]
+    firsts = [first for first in firsts if first is not None]
+    if not firsts:
+        return None
+    return reconcile_leaderboard(since=min(firsts))
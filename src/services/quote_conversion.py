@@ -0,0 +1,75 @@
+from datetime import datetime
+from src.cache import invalidate_after_commit
+from src.models.user import db
+from src.models.quote import Quote
+from src.models.sale import Sale
+from src.services.leaderboard import record_changes
+from src.utils.batch import IN_CHUNK_SIZE, get_by_ids
+
+# Rejeitada e Expirada não viram venda
+CONVERTIBLE_STATUSES = ('Pendente', 'Aprovada')
+
+def converted_quote_ids(quote_ids):
+    """Ids (entre os informados) de cotações que já têm venda"""
+    converted = set()
+    for start in range(0, len(quote_ids), IN_CHUNK_SIZE):
+        chunk = quote_ids[start:start + IN_CHUNK_SIZE]
+        converted.update(db.session.scalars(db.select(Sale.quote_id).where(Sale.quote_id.in_(chunk))))
+    return converted
+
+def load_convertible_quotes(quote_ids):
+    """Carrega as cotações; devolve ({id: cotação}, {id: motivo}) com os motivos das que não podem ser convertidas"""
+    quotes = get_by_ids(Quote, quote_ids)
+    converted = converted_quote_ids(quote_ids)
+    
+    errors = {}
+    for quote_id in quote_ids:
+        quote = quotes.get(quote_id)
+        if quote is None:
+            errors[quote_id] = 'Cotação não encontrada'
+        elif quote_id in converted:
+            errors[quote_id] = 'Cotação já convertida em venda'
+        elif quote.status not in CONVERTIBLE_STATUSES:
+            errors[quote_id] = f'Cotação com status {quote.status} não pode ser convertida'
+    return quotes, errors
+
+def convert_quotes(quotes, sale_status='Pendente', company_id=None):
+    """Cria uma venda por cotação e marca as cotações como Aprovada, na transação atual (sem commit)"""
+    # Cotações não têm empresa: sem company_id a venda não entra no cálculo de comissões
+    now = datetime.utcnow()
+    rows = [{
+        'quote_id': quote.id,
+        'client_id': quote.client_id,
+        'client_name': quote.client_name,
+        'product': quote.title,
+        'value': quote.value,
+        'status': sale_status,
+        'representative': quote.representative,
+        'date': now,
+        'company_id': company_id,
+    } for quote in quotes]
+    # Estado anterior das cotações (o UPDATE abaixo também altera os objetos na sessão)
+    previous = [(Quote, {'representative': quote.representative, 'status': quote.status, 'approved_at': quote.approved_at})
+                for quote in quotes]
+    
+    # Um INSERT em lote (executemany / insertmanyvalues) e um UPDATE por bloco de ids,
+    # em vez de um flush por registo
+    sales = list(db.session.scalars(db.insert(Sale).returning(Sale), rows))
+    quote_ids = [quote.id for quote in quotes]
+    for start in range(0, len(quote_ids), IN_CHUNK_SIZE):
+        db.session.execute(
+            db.update(Quote)
+            .where(Quote.id.in_(quote_ids[start:start + IN_CHUNK_SIZE]))
+            # Cotações já aprovadas mantêm a data de aprovação
+            .values(status='Aprovada', updated_at=now, approved_at=db.func.coalesce(Quote.approved_at, now))
+        )
+    
+    # As escritas em lote não disparam os eventos dos modelos: ranking e cache atualizados uma vez por lote
+    record_changes(
+        db.session,
+        removed=previous,
+        added=[(Quote, {**values, 'status': 'Aprovada', 'approved_at': values['approved_at'] or now}) for _, values in previous]
+              + [(Sale, row) for row in rows]
+    )
+    invalidate_after_commit(db.session, 'quotes:', 'analytics:')
+    return sales
@@ -0,0 +1,40 @@
+import time
+from datetime import datetime
+from flask import current_app
+from src.cache import cache
+from src.models.user import db
+from src.models.quote import Quote
+
+QUOTES_CACHE_PREFIX = 'quotes:'
+
+def overdue_quotes_filter(now):
+    """Cotações pendentes cuja validade já passou (usa o índice status + valid_until)"""
+    return (Quote.status == 'Pendente') & (Quote.valid_until < now)
+
+def expire_overdue_quotes(batch_size=500, now=None, pause=0.0):
+    """Marca como Expirada as cotações pendentes vencidas, em lotes; devolve o total alterado"""
+    now = now or datetime.utcnow()
+    total = 0
+    
+    while True:
+        # Um UPDATE por lote, limitado pelos ids da subconsulta: cada transação segura o
+        # lock de escrita por pouco tempo mesmo com milhares de cotações vencidas
+        batch_ids = db.select(Quote.id).where(overdue_quotes_filter(now)).limit(batch_size).scalar_subquery()
+        result = db.session.execute(
+            db.update(Quote)
+            .where(Quote.id.in_(batch_ids))
+            .values(status='Expirada', updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        total += result.rowcount
+        
+        if result.rowcount < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    
+    if total:
+        cache.invalidate(QUOTES_CACHE_PREFIX)
+        current_app.logger.info('%d cotações vencidas marcadas como Expirada', total)
+    return total
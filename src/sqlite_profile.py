@@ -0,0 +1,94 @@
+import random
+import time
+from functools import wraps
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from src.config import env_bool, env_int
+from src.extensions import db
+
+# Mensagens do SQLite quando outro processo segura o lock de escrita
+BUSY_MESSAGES = ('database is locked', 'database is busy', 'database table is locked')
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+def sqlite_pragmas_from_env():
+    """PRAGMAs aplicados a cada conexão SQLite nova"""
+    # SQLITE_CACHE_SIZE_MB: cache de páginas por conexão; SQLITE_MMAP_SIZE_MB: leitura via mmap
+    # (partilhada entre processos pelo cache do sistema); SQLITE_BUSY_TIMEOUT_MS: espera pelo lock
+    return {
+        # WAL: leitores não bloqueiam o escritor e vice-versa
+        'journal_mode': 'WAL',
+        # Em WAL, NORMAL só sincroniza no checkpoint: seguro contra corrupção, muito mais rápido
+        'synchronous': 'NORMAL',
+        'cache_size': -1024 * env_int('SQLITE_CACHE_SIZE_MB', 16),  # negativo = KiB
+        'mmap_size': 1024 * 1024 * env_int('SQLITE_MMAP_SIZE_MB', 128),
+        'busy_timeout': env_int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'foreign_keys': 'ON',
+        'temp_store': 'MEMORY',
+    }
+
+def configure_sqlite_engine(engine, pragmas=None):
+    """Aplica os PRAGMAs em cada conexão do engine (apenas SQLite em arquivo)"""
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return False
+    pragmas = pragmas or sqlite_pragmas_from_env()
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+    return True
+
+def is_busy_error(error):
+    return isinstance(error, OperationalError) and any(message in str(error.orig).lower() for message in BUSY_MESSAGES)
+
+def without_busy_retry(view):
+    """Exclui a rota da repetição automática (rotas que controlam a própria sessão ou transação)"""
+    view.busy_retry = False
+    return view
+
+def retry_on_busy(view, attempts=3, base_delay=0.05):
+    """Repete a rota quando o SQLite continua bloqueado depois do busy_timeout"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        for attempt in range(attempts):
+            try:
+                return view(*args, **kwargs)
+            except OperationalError as e:
+                if not is_busy_error(e) or attempt == attempts - 1:
+                    raise
+                # Desfaz a transação interrompida e tenta de novo com espera exponencial
+                db.session.rollback()
+                delay = base_delay * (2 ** attempt) * (1 + random.random())
+                current_app.logger.warning('SQLite ocupado em %s; nova tentativa em %.2fs', view.__name__, delay)
+                time.sleep(delay)
+    return wrapper
+
+def init_sqlite_profile(app):
+    """Ajusta os engines SQLite e repete as rotas de escrita em caso de lock"""
+    if not env_bool('SQLITE_TUNING', True):
+        return
+    
+    with app.app_context():
+        configured = [configure_sqlite_engine(engine) for engine in db.engines.values()]
+    if not any(configured):
+        return
+    
+    attempts = env_int('SQLITE_BUSY_RETRIES', 3)
+    for rule in app.url_map.iter_rules():
+        if not set(rule.methods) & set(WRITE_METHODS):
+            continue
+        view = app.view_functions[rule.endpoint]
+        # O rollback da repetição usa db.session: só vale para rotas de uma única transação nela
+        if getattr(view, 'retries_on_busy', False) or not getattr(view, 'busy_retry', True):
+            continue
+        wrapper = retry_on_busy(view, attempts)
+        wrapper.retries_on_busy = True
+        # O /api/batch desembrulha um nível para pular o @jwt_required(): mantém esse
+        # comportamento (sem repetição dentro do lote, que controla a própria transação)
+        wrapper.__wrapped__ = getattr(view, '__wrapped__', view)
+        app.view_functions[rule.endpoint] = wrapper
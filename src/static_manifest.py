@@ -0,0 +1,157 @@
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from flask import current_app, request, send_file
+from src.compression import ENCODING_SUFFIXES, add_vary, negotiate_encoding, precompress_static, static_cache_control
+
+PRECOMPRESSED_SUFFIXES = tuple(ENCODING_SUFFIXES.values())
+
+class StaticFile:
+    """Um arquivo da pasta estática (ou uma versão pré-comprimida dele)"""
+    
+    __slots__ = ('path', 'size', 'mtime', 'etag', 'mimetype', 'data', 'variants')
+    
+    def __init__(self, path, size, mtime, etag, mimetype, data):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.etag = etag
+        self.mimetype = mimetype
+        self.data = data  # None para arquivos maiores que o limite em memória
+        self.variants = {}  # codificação -> StaticFile do irmão .br/.gz
+
+class StaticManifest:
+    """Mapa em memória da pasta estática; recarregado quando os arquivos mudam"""
+    
+    def __init__(self, folder, inline_max_size=256 * 1024, check_interval=2.0, precompress=True):
+        self.folder = folder
+        self.inline_max_size = inline_max_size
+        self.check_interval = check_interval
+        self.precompress = precompress
+        self.files = {}
+        self.signature = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        self.reload()
+    
+    def scan(self):
+        """Caminho relativo -> os.stat_result de todos os arquivos da pasta"""
+        stats = {}
+        for root, _, names in os.walk(self.folder):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stats[os.path.relpath(path, self.folder).replace(os.sep, '/')] = os.stat(path)
+                except OSError:
+                    continue
+        return stats
+    
+    def load_file(self, relative_path, stat, mimetype):
+        path = os.path.join(self.folder, relative_path)
+        data = None
+        if stat.st_size <= self.inline_max_size:
+            with open(path, 'rb') as f:
+                data = f.read()
+            etag = hashlib.sha1(data).hexdigest()[:20]
+        else:
+            etag = f'{stat.st_size:x}-{int(stat.st_mtime * 1000):x}'
+        return StaticFile(path, stat.st_size, stat.st_mtime, etag, mimetype, data)
+    
+    def precompress_missing(self):
+        """Gera os irmãos .gz/.br que faltam ou estão desatualizados; True se gravou algum"""
+        try:
+            return bool(precompress_static(self.folder))
+        except OSError:
+            # Pasta somente leitura: serve os arquivos sem versão comprimida
+            self.precompress = False
+            return False
+    
+    def reload(self, stats=None):
+        # Sem passo de build do frontend no deploy: os irmãos são gerados aqui (só os novos)
+        if self.precompress and self.precompress_missing():
+            stats = None
+        stats = self.scan() if stats is None else stats
+        files = {}
+        for relative_path, stat in stats.items():
+            if relative_path.endswith(PRECOMPRESSED_SUFFIXES) or relative_path.endswith('.tmp'):
+                continue
+            mimetype = mimetypes.guess_type(relative_path)[0] or 'application/octet-stream'
+            try:
+                entry = self.load_file(relative_path, stat, mimetype)
+                for encoding, suffix in ENCODING_SUFFIXES.items():
+                    sibling = stats.get(relative_path + suffix)
+                    # Ignora versões comprimidas mais antigas que o original
+                    if sibling is not None and sibling.st_mtime >= stat.st_mtime:
+                        entry.variants[encoding] = self.load_file(relative_path + suffix, sibling, mimetype)
+            except OSError:
+                continue
+            files[relative_path] = entry
+        
+        self.files = files
+        self.signature = self.signature_of(stats)
+        self.checked_at = time.monotonic()
+    
+    @staticmethod
+    def signature_of(stats):
+        return frozenset((path, stat.st_size, stat.st_mtime_ns) for path, stat in stats.items())
+    
+    def refresh(self):
+        """Recarrega o manifesto se a pasta mudou (verificado a cada check_interval segundos)"""
+        if time.monotonic() - self.checked_at < self.check_interval:
+            return
+        with self.lock:
+            if time.monotonic() - self.checked_at < self.check_interval:
+                return
+            stats = self.scan()
+            if self.signature_of(stats) != self.signature:
+                self.reload(stats)
+                current_app.logger.info('Manifesto estático recarregado: %d arquivos', len(self.files))
+            else:
+                self.checked_at = time.monotonic()
+    
+    def lookup(self, path):
+        """Arquivo para o caminho pedido; caminhos desconhecidos caem no index.html (SPA)"""
+        self.refresh()
+        entry = self.files.get(path) if path else None
+        return entry or self.files.get('index.html')
+    
+    def serve(self, path):
+        """Resposta para o caminho pedido, a partir da memória e com suporte a 304"""
+        entry = self.lookup(path)
+        if entry is None:
+            return current_app.response_class('Not Found', status=404, mimetype='text/plain')
+        
+        selected = entry
+        encoding = negotiate_encoding(list(entry.variants)) if entry.variants else None
+        if encoding is not None:
+            selected = entry.variants[encoding]
+        
+        if selected.data is None:
+            response = send_file(selected.path, mimetype=selected.mimetype, etag=selected.etag,
+                                 last_modified=selected.mtime, conditional=True, max_age=None)
+        else:
+            # direct_passthrough: o conteúdo vai como está, sem a compressão das respostas da API
+            response = current_app.response_class(selected.data, mimetype=selected.mimetype,
+                                                  direct_passthrough=True)
+            response.set_etag(selected.etag)
+            response.last_modified = selected.mtime
+            response.make_conditional(request, accept_ranges=True, complete_length=len(selected.data))
+        
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        if entry.variants:
+            add_vary(response)
+        response.headers['Cache-Control'] = static_cache_control(entry.path)
+        return response
+
+def init_static_manifest(app):
+    """Carrega a pasta estática em memória (app.extensions['static_manifest'])"""
+    app.config.setdefault('STATIC_INLINE_MAX_SIZE', 256 * 1024)
+    app.config.setdefault('STATIC_CHECK_INTERVAL', 2.0)
+    app.config.setdefault('STATIC_PRECOMPRESS', True)
+    manifest = StaticManifest(app.static_folder, app.config['STATIC_INLINE_MAX_SIZE'],
+                              app.config['STATIC_CHECK_INTERVAL'], app.config['STATIC_PRECOMPRESS'])
+    app.extensions['static_manifest'] = manifest
+    return manifest
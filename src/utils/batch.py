@@ -0,0 +1,48 @@
+from flask import jsonify, request
+
+# Limite de ids por pedido e tamanho de cada bloco do IN (SQLite aceita no máximo 999 parâmetros)
+MAX_BATCH_IDS = 1000
+IN_CHUNK_SIZE = 500
+
+def parse_ids_arg(arg='ids'):
+    """Lê a lista de ids do parâmetro ?ids=1,2,3 (None se ausente, ValueError se inválido)"""
+    raw = request.args.get(arg)
+    if raw is None:
+        return None
+    
+    ids = []
+    seen = set()
+    for part in raw.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        value = int(part)
+        if value not in seen:
+            seen.add(value)
+            ids.append(value)
+    
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f'Máximo de {MAX_BATCH_IDS} ids por pedido')
+    return ids
+
+def get_by_ids(model, ids, chunk_size=IN_CHUNK_SIZE):
+    """Carrega vários registos com consultas IN em blocos e devolve {id: objeto}"""
+    records = {}
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        for record in model.query.filter(model.id.in_(chunk)):
+            records[record.id] = record
+    return records
+
+def batch_get_response(model):
+    """Resposta {id: registo} para ?ids=..., ou None se o parâmetro não foi enviado"""
+    try:
+        ids = parse_ids_arg()
+    except ValueError:
+        return jsonify({'error': f'Parâmetro ids inválido (lista de inteiros, máximo {MAX_BATCH_IDS})'}), 400
+    
+    if ids is None:
+        return None
+    
+    records = get_by_ids(model, ids)
+    return jsonify({str(record_id): record.to_dict() for record_id, record in records.items()})
@@ -0,0 +1,23 @@
+from flask import request
+from datetime import datetime, timezone
+
+def naive_utc(moment):
+    """datetime em UTC sem fuso, como as datas gravadas (com fuso, convertido)"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+def parse_datetime(value):
+    """Data ISO 8601 (aceita o sufixo Z) como datetime UTC sem fuso"""
+    return naive_utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+def parse_period_args(default_start=None):
+    """Lê ?start=&end= (ISO, fim exclusivo); padrão: de default_start (ou início do ano) até agora"""
+    now = datetime.utcnow()
+    start = request.args.get('start')
+    end = request.args.get('end')
+    start = parse_datetime(start) if start else (default_start or datetime(now.year, 1, 1))
+    end = parse_datetime(end) if end else now
+    if end <= start:
+        raise ValueError('end deve ser posterior a start')
+    return start, end
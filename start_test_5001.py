@@ -6,6 +6,13 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from src.main_test import app
+from src.commands import seed_default_data, sync_schema
+from src.extensions import db
 
 if __name__ == '__main__':
+    # Servidor de testes: prepara o banco antes de arrancar
+    with app.app_context():
+        sync_schema(db.engine)
+        seed_default_data()
+    # O agendador arranca no primeiro pedido, no processo filho do reloader
     app.run(host='0.0.0.0', port=5001, debug=True)
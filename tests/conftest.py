@@ -0,0 +1,61 @@
+import os
+import shutil
+import sys
+import tempfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Banco SQLite temporário: a configuração lê as variáveis de ambiente ao ser criada
+DATA_DIR = tempfile.mkdtemp(prefix='proreps-tests-')
+DATABASE_PATH = os.path.join(DATA_DIR, 'test.db')
+TEMPLATE_PATH = os.path.join(DATA_DIR, 'template.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_PATH}'
+os.environ.pop('DATABASE_REPLICA_URLS', None)
+os.environ['SCHEDULER_ENABLED'] = '0'
+
+from src.config import Config
+from src.main import create_app
+from src.cache import cache
+from src.commands import seed_default_data, sync_schema
+from src.extensions import db
+
+class TestingConfig(Config):
+    """Config de produção com depuração de consultas e sem gravar arquivos na pasta estática"""
+    
+    def __init__(self):
+        super().__init__()
+        self.TESTING = True
+        self.QUERY_DEBUG = True
+        self.STATIC_PRECOMPRESS = False
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app(TestingConfig())
+    with app.app_context():
+        sync_schema(db.engine)
+        seed_default_data()
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    # Cada teste começa de uma cópia do banco com os dados padrão
+    shutil.copy(DATABASE_PATH, TEMPLATE_PATH)
+    yield app
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+@pytest.fixture
+def client(app):
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(DATABASE_PATH + suffix):
+            os.remove(DATABASE_PATH + suffix)
+    shutil.copy(TEMPLATE_PATH, DATABASE_PATH)
+    cache.invalidate()
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post('/api/login', json={'email': 'admin@proreps.com', 'password': 'admin123'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
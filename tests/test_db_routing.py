@@ -0,0 +1,26 @@
+import time
+from src.db_routing import PRIMARY_UNTIL_COOKIE, PRIMARY_UNTIL_HEADER, replica_reads_allowed
+
+def test_writes_send_the_primary_deadline_to_the_client(client, auth_headers):
+    response = client.post('/api/customers', json={'name': 'Cliente', 'email': 'c@empresa.com'}, headers=auth_headers)
+    until = float(response.headers[PRIMARY_UNTIL_HEADER])
+    assert time.time() < until <= time.time() + 10
+    assert client.get_cookie(PRIMARY_UNTIL_COOKIE).value == response.headers[PRIMARY_UNTIL_HEADER]
+    
+    # Leituras não renovam o prazo
+    response = client.get('/api/customers', headers=auth_headers)
+    assert PRIMARY_UNTIL_HEADER not in response.headers
+
+def test_replica_reads_follow_the_deadline_from_any_worker(app):
+    def allowed(**kwargs):
+        with app.test_request_context('/api/customers', **kwargs):
+            return replica_reads_allowed()
+    
+    now = time.time()
+    assert allowed()
+    assert not allowed(headers={PRIMARY_UNTIL_HEADER: f'{now + 5}'})
+    assert not allowed(headers={'Cookie': f'{PRIMARY_UNTIL_COOKIE}={now + 5}'})
+    # Vencido, inválido ou além da janela configurada: volta às réplicas
+    assert allowed(headers={PRIMARY_UNTIL_HEADER: f'{now - 1}'})
+    assert allowed(headers={PRIMARY_UNTIL_HEADER: 'amanhã'})
+    assert allowed(headers={PRIMARY_UNTIL_HEADER: f'{now + 3600}'})
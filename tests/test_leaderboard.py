@@ -0,0 +1,43 @@
+from datetime import datetime
+from src.extensions import db
+from src.models.leaderboard import LeaderboardEntry
+from src.models.quote import Quote
+from src.services.leaderboard import backfill_leaderboard, reconcile_leaderboard
+
+def approved_days(app, representative):
+    """Dias com cotações aprovadas do representante no ranking"""
+    with app.app_context():
+        return {
+            entry.period_start: entry.quotes_approved
+            for entry in LeaderboardEntry.query.filter_by(granularity='day', representative=representative)
+            if entry.quotes_approved
+        }
+
+def test_editing_an_approved_quote_keeps_its_approval_day(app, client, auth_headers):
+    with app.app_context():
+        backfill_leaderboard()
+    assert approved_days(app, 'Ana Silva') == {datetime(2024, 9, 25): 1}
+    
+    response = client.put('/api/quotes/2', json={'title': 'Consultoria revisada'}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()['approvedAt'] == '2024-09-25T00:00:00'
+    assert approved_days(app, 'Ana Silva') == {datetime(2024, 9, 25): 1}
+    
+    with app.app_context():
+        reconcile_leaderboard(since=datetime(2024, 1, 1))
+    assert approved_days(app, 'Ana Silva') == {datetime(2024, 9, 25): 1}
+
+def test_approval_date_follows_status_changes(app, client, auth_headers):
+    response = client.put('/api/quotes/1', json={'status': 'Aprovada'}, headers=auth_headers)
+    approved_at = datetime.fromisoformat(response.get_json()['approvedAt'])
+    assert approved_days(app, 'Carlos Mendes') == {datetime(approved_at.year, approved_at.month, approved_at.day): 1}
+    
+    # Converter uma cotação já aprovada não muda a data de aprovação
+    response = client.post('/api/quotes/1/convert', json={}, headers=auth_headers)
+    assert response.status_code == 201
+    with app.app_context():
+        assert db.session.get(Quote, 1).approved_at == approved_at
+    
+    response = client.put('/api/quotes/1', json={'status': 'Rejeitada'}, headers=auth_headers)
+    assert response.get_json()['approvedAt'] is None
+    assert approved_days(app, 'Carlos Mendes') == {}
@@ -0,0 +1,42 @@
+from prometheus_client import REGISTRY
+from src.extensions import db
+from src.main import on_worker_fork
+from src.monitoring.pool import pool_status
+
+def test_worker_fork_forgets_the_master_connections(app, client):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql('SELECT 1')
+        assert pool_status(db.engine)['connectionsOpened'] >= 1
+        assert db.engine.pool.stats.connection_ages()
+        
+        master_pool = db.engine.pool
+    
+    # dispose(close=False) larga as conexões sem o evento close: sem reset ficariam na idade máxima
+    on_worker_fork(app)
+    try:
+        with app.app_context():
+            status = pool_status(db.engine)
+            assert status['connectionsOpened'] == 0
+            assert status['checkouts'] == 0
+            assert status['connectionAgeMax'] == 0
+            
+            with db.engine.connect() as connection:
+                connection.exec_driver_sql('SELECT 1')
+            assert pool_status(db.engine)['connectionsOpened'] == 1
+    finally:
+        # Aqui não houve fork: as conexões largadas ainda são deste processo
+        master_pool.dispose()
+
+def test_pool_gauges_follow_checkouts(app):
+    def gauge(name):
+        return REGISTRY.get_sample_value(name, {'bind': 'default'})
+    
+    with app.app_context():
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql('SELECT 1')
+            # Atualizados pelo próprio processo no checkout, sem depender do /api/metrics
+            assert gauge('db_pool_checked_out') == 1
+            assert gauge('db_pool_connection_age_max_seconds') >= 0
+        assert gauge('db_pool_checked_out') == 0
+        assert gauge('db_pool_overflow') == 0
@@ -0,0 +1,172 @@
+import pytest
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+from src.monitoring.queries import assert_max_queries
+from src.utils.batch import IN_CHUNK_SIZE
+
+# Orçamento de consultas SQL de cada rota dos blueprints (src/routes/) sobre os dados padrão.
+# Um teste por cenário: endpoint -> [(método, caminho, corpo JSON, status esperado, máximo de consultas)].
+# Subir um número aqui é uma decisão de revisão, não um ajuste para o teste passar.
+PERIOD = {'periodStart': '2024-01-01T00:00:00Z', 'periodEnd': '2024-12-31T23:59:59Z'}
+MANY_IDS = ','.join(str(i) for i in range(1, IN_CHUNK_SIZE + 2))
+
+BUDGETS = {
+    # auth
+    'auth.login': [('POST', '/api/login', {'email': 'admin@proreps.com', 'password': 'admin123'}, 200, 3)],
+    'auth.get_current_user': [('GET', '/api/me', None, 200, 1)],
+    'auth.change_password': [('POST', '/api/change-password', {'current_password': 'admin123', 'new_password': 'admin456'}, 200, 2)],
+    'auth.get_users': [('GET', '/api/users', None, 200, 2)],
+    'auth.create_user': [('POST', '/api/users', {'name': 'Nova Rep', 'email': 'nova@proreps.com', 'password': 'senha123', 'role': 'representante'}, 201, 8)],
+    'auth.update_user': [('PUT', '/api/users/2', {'name': 'Carlos Mendes Jr'}, 200, 8)],
+    'auth.delete_user': [('DELETE', '/api/users/5', None, 204, 7)],
+    'auth.toggle_user_status': [('POST', '/api/users/4/toggle-status', None, 200, 4)],
+    # users
+    'users.get_user': [('GET', '/api/users/2', None, 200, 2)],
+    'users.get_current_user_profile': [('GET', '/api/users/profile', None, 200, 1)],
+    'users.update_current_user_profile': [('PUT', '/api/users/profile', {'name': 'Admin'}, 200, 7)],
+    'users.change_password': [('POST', '/api/users/change-password', {'currentPassword': 'admin123', 'newPassword': 'admin456'}, 200, 2)],
+    'users.get_users_stats': [('GET', '/api/users/stats', None, 200, 6)],
+    # customers
+    'customers.get_customers': [
+        ('GET', '/api/customers', None, 200, 1),
+        ('GET', '/api/customers?ids=1,2,3', None, 200, 1),
+        # Um IN por bloco de IN_CHUNK_SIZE ids
+        ('GET', f'/api/customers?ids={MANY_IDS}', None, 200, 2),
+    ],
+    'customers.create_customer': [('POST', '/api/customers', {'name': 'Cliente Novo', 'email': 'novo@cliente.com'}, 201, 2)],
+    'customers.get_customer': [('GET', '/api/customers/1', None, 200, 1)],
+    'customers.get_customer_overview': [('GET', '/api/customers/1/overview', None, 200, 8)],
+    'customers.update_customer': [('PUT', '/api/customers/1', {'phone': '(11) 98888-7777'}, 200, 3)],
+    'customers.delete_customer': [('DELETE', '/api/customers/1', None, 409, 1)],
+    # sales
+    'sales.get_sales': [('GET', '/api/sales', None, 200, 1)],
+    'sales.create_sale': [('POST', '/api/sales', {
+        'clientId': 1, 'clientName': 'João Silva', 'product': 'Licença', 'value': 1000,
+        'representative': 'Ana Silva', 'status': 'Concluída', 'companyId': 1,
+    }, 201, 4)],
+    'sales.update_sale': [('PUT', '/api/sales/2', {'status': 'Concluída'}, 200, 4)],
+    'sales.delete_sale': [('DELETE', '/api/sales/4', None, 204, 2)],
+    # leads
+    'leads.get_leads': [
+        ('GET', '/api/leads', None, 200, 1),
+        ('GET', '/api/leads?sort=score', None, 200, 1),
+        ('GET', '/api/leads?sort=score&limit=2', None, 200, 1),
+    ],
+    'leads.create_lead': [('POST', '/api/leads', {'name': 'Lead Novo', 'email': 'lead@empresa.com', 'source': 'Website'}, 201, 4)],
+    'leads.create_leads_bulk': [('POST', '/api/leads/bulk', {'leads': [
+        {'name': 'Lead A', 'email': 'a@empresa.com'}, {'name': 'Lead B', 'email': 'b@empresa.com'},
+    ]}, 201, 5)],
+    'leads.update_lead': [('PUT', '/api/leads/1', {'status': 'Contato'}, 200, 3)],
+    'leads.delete_lead': [('DELETE', '/api/leads/1', None, 204, 3)],
+    'leads.get_lead_assignment': [('GET', '/api/leads/assignment', None, 200, 1)],
+    'leads.update_lead_assignment': [('PUT', '/api/leads/assignment/Ana Silva', {'weight': 2}, 200, 4)],
+    # quotes
+    'quotes.get_quotes': [
+        ('GET', '/api/quotes', None, 200, 1),
+        ('GET', f'/api/quotes?ids={MANY_IDS}', None, 200, 2),
+    ],
+    'quotes.create_quote': [('POST', '/api/quotes', {
+        'clientId': 1, 'clientName': 'João Silva', 'title': 'Cotação', 'value': 500,
+        'representative': 'Ana Silva', 'validUntil': '2030-01-01T00:00:00Z',
+    }, 201, 2)],
+    'quotes.get_quote': [('GET', '/api/quotes/1', None, 200, 1)],
+    'quotes.update_quote': [('PUT', '/api/quotes/1', {'status': 'Aprovada'}, 200, 4)],
+    'quotes.delete_quote': [('DELETE', '/api/quotes/3', None, 204, 2)],
+    'quotes.convert_quote': [
+        ('POST', '/api/quotes/1/convert', {}, 201, 6),
+        ('POST', '/api/quotes/1/convert', {'companyId': 1}, 201, 7),
+        ('POST', '/api/quotes/1/convert', {'companyId': 999}, 400, 1),
+    ],
+    'quotes.convert_quotes_batch': [('POST', '/api/quotes/convert', {'ids': [1, 3]}, 201, 7)],
+    'quotes.get_quotes_by_status': [('GET', '/api/quotes/status/Pendente', None, 200, 1)],
+    'quotes.get_quotes_by_client': [('GET', '/api/quotes/client/1', None, 200, 1)],
+    'quotes.get_quotes_stats': [('GET', '/api/quotes/stats', None, 200, 6)],
+    # appointments
+    'appointments.get_appointments': [('GET', '/api/appointments', None, 200, 1)],
+    'appointments.create_appointment': [('POST', '/api/appointments', {
+        'title': 'Reunião', 'representative': 'Ana Silva', 'appointmentDate': '2030-01-01T10:00:00Z', 'clientId': 1,
+    }, 201, 2)],
+    'appointments.get_appointment': [('GET', '/api/appointments/1', None, 200, 1)],
+    'appointments.update_appointment': [('PUT', '/api/appointments/1', {'status': 'Concluído'}, 200, 4)],
+    'appointments.delete_appointment': [('DELETE', '/api/appointments/1', None, 204, 2)],
+    'appointments.get_today_appointments': [('GET', '/api/appointments/today', None, 200, 1)],
+    'appointments.get_week_appointments': [('GET', '/api/appointments/week', None, 200, 1)],
+    'appointments.get_upcoming_appointments': [('GET', '/api/appointments/upcoming', None, 200, 1)],
+    'appointments.get_appointments_by_client': [('GET', '/api/appointments/client/1', None, 200, 1)],
+    'appointments.get_appointments_by_representative': [('GET', '/api/appointments/representative/Ana Silva', None, 200, 1)],
+    'appointments.get_appointments_stats': [('GET', '/api/appointments/stats', None, 200, 6)],
+    # companies
+    'companies.get_companies': [('GET', '/api/companies', None, 200, 1)],
+    'companies.create_company': [('POST', '/api/companies', {'name': 'Empresa Nova', 'commissionRate': 5}, 201, 2)],
+    'companies.get_company': [('GET', '/api/companies/1', None, 200, 1)],
+    'companies.update_company': [('PUT', '/api/companies/1', {'phone': '(11) 3333-4444'}, 200, 3)],
+    'companies.delete_company': [('DELETE', '/api/companies/3', None, 204, 2)],
+    'companies.get_active_companies': [('GET', '/api/companies/active', None, 200, 1)],
+    'companies.get_companies_by_segment': [('GET', '/api/companies/segment/Tecnologia', None, 200, 1)],
+    'companies.get_expiring_contracts': [('GET', '/api/companies/expiring-contracts', None, 200, 1)],
+    'companies.get_companies_stats': [('GET', '/api/companies/stats', None, 200, 7)],
+    # reports
+    'reports.get_reports': [('GET', '/api/reports', None, 200, 1)],
+    'reports.create_report': [('POST', '/api/reports', {
+        'title': 'Vendas 2024', 'type': 'vendas', 'generatedBy': 'Administrador', **PERIOD,
+    }, 201, 3)],
+    'reports.get_report': [('GET', '/api/reports/1', None, 200, 1)],
+    'reports.delete_report': [('DELETE', '/api/reports/1', None, 204, 2)],
+    'reports.get_dashboard_data': [('GET', '/api/reports/dashboard', None, 200, 6)],
+    'reports.generate_report': [
+        ('POST', '/api/reports/generate/vendas', PERIOD, 200, 1),
+        ('POST', '/api/reports/generate/financeiro', PERIOD, 200, 1),
+    ],
+    # batch
+    'batch.run_batch': [('POST', '/api/batch', {'requests': [
+        {'method': 'GET', 'path': '/api/sales'}, {'method': 'GET', 'path': '/api/quotes'},
+    ]}, 200, 2)],
+    # profiles
+    'profiles.get_profiles': [('GET', '/api/admin/profiles', None, 200, 1)],
+    'profiles.download_profile': [('GET', '/api/admin/profiles/inexistente.folded', None, 404, 1)],
+    # commissions
+    'commissions.get_commissions': [('GET', '/api/commissions?start=2024-01-01&end=2025-01-01', None, 200, 1)],
+    'commissions.get_commission_snapshots': [('GET', '/api/commissions/snapshots?start=2024-01-01&end=2025-01-01', None, 200, 1)],
+    'commissions.create_commission_snapshot': [('POST', '/api/commissions/snapshots', {
+        'periodStart': '2024-01-01', 'periodEnd': '2025-01-01',
+    }, 201, 3)],
+    # analytics
+    'analytics.get_revenue_series': [('GET', '/api/analytics/revenue?start=2024-01-01&end=2025-01-01', None, 200, 2)],
+    'analytics.get_revenue_forecast': [('GET', '/api/analytics/forecast', None, 200, 1)],
+    'analytics.get_conversion_funnel': [('GET', '/api/analytics/funnel?start=2024-01-01&end=2025-01-01', None, 200, 1)],
+    'analytics.get_leaderboard': [('GET', '/api/analytics/leaderboard', None, 200, 1)],
+}
+
+SCENARIOS = [
+    pytest.param(method, path, body, status, budget, id=f'{endpoint}:{method} {path[:60]}')
+    for endpoint, scenarios in BUDGETS.items()
+    for method, path, body, status, budget in scenarios
+]
+
+@pytest.mark.parametrize('method, path, body, status, budget', SCENARIOS)
+def test_route_query_budget(client, auth_headers, method, path, body, status, budget):
+    with assert_max_queries(budget):
+        response = client.open(path, method=method, json=body, headers=auth_headers)
+    assert response.status_code == status, response.get_data(as_text=True)[:500]
+
+def reachable_endpoint(app, rule, method):
+    """Endpoint que atende (caminho da regra, método): regras repetidas ficam ocultas pela primeira"""
+    path = rule.rule
+    for converter, sample in (('<int:', '1'), ('<path:', 'x'), ('<', 'x')):
+        while converter in path:
+            start = path.index(converter)
+            path = path[:start] + sample + path[path.index('>', start) + 1:]
+    try:
+        return app.url_map.bind('localhost').match(path, method=method)[0]
+    except (MethodNotAllowed, NotFound):
+        return None
+
+def test_every_route_has_a_budget(app):
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if '.' not in rule.endpoint or rule.endpoint == 'static':
+            continue
+        for method in rule.methods - {'HEAD', 'OPTIONS'}:
+            # Regras registadas por dois blueprints (ex.: /api/users em auth e users): só a primeira é alcançável
+            if rule.endpoint not in BUDGETS and reachable_endpoint(app, rule, method) == rule.endpoint:
+                missing.append(f'{method} {rule.rule} ({rule.endpoint})')
+    assert not missing, 'Rotas sem orçamento de consultas:\n' + '\n'.join(sorted(missing))
@@ -0,0 +1,12 @@
+def test_converted_sales_take_the_informed_company(client, auth_headers):
+    response = client.post('/api/quotes/convert', json={'ids': [1, 3], 'companyId': 2}, headers=auth_headers)
+    assert response.status_code == 201
+    assert [sale['companyId'] for sale in response.get_json()] == [2, 2]
+
+def test_conversion_rejects_an_unknown_company(client, auth_headers):
+    response = client.post('/api/quotes/1/convert', json={'companyId': 999}, headers=auth_headers)
+    assert response.status_code == 400
+    # Nada foi convertido
+    response = client.post('/api/quotes/1/convert', json={}, headers=auth_headers)
+    assert response.status_code == 201
+    assert response.get_json()['companyId'] is None
@@ -0,0 +1,13 @@
+def test_report_periods_are_stored_as_naive_utc(client, auth_headers):
+    response = client.post('/api/reports', json={
+        'title': 'Vendas', 'type': 'vendas', 'generatedBy': 'Administrador',
+        'periodStart': '2024-01-01T00:00:00-03:00', 'periodEnd': '2024-12-31T23:59:59Z',
+    }, headers=auth_headers)
+    assert response.status_code == 201
+    report = response.get_json()
+    assert report['periodStart'] == '2024-01-01T03:00:00'
+    assert report['periodEnd'] == '2024-12-31T23:59:59'
+    
+    # Relido do banco: o mesmo valor (sem fuso) que foi usado para gerar os dados
+    response = client.get(f"/api/reports/{report['id']}", headers=auth_headers)
+    assert response.get_json()['periodStart'] == '2024-01-01T03:00:00'